@@ -1,14 +1,12 @@
-import hashlib
-import json
-import os
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fle.commons.models.conversation import Conversation
 from fle.commons.models.message import Message
 
 from fle.agents.llm.api_factory import APIFactory
 from fle.agents.formatters.conversation_formatter_abc import ConversationFormatter
+from fle.agents.formatters.summary_cache import PrefixHashes, SummaryCache
 
 DEFAULT_INSTRUCTIONS = "Summarize the following conversation chunk maintaining key information and context. Focus on decisions made, actions taken, and important outcomes."
 
@@ -27,6 +25,8 @@ class RecursiveFormatter(ConversationFormatter):
         summary_instructions: str = DEFAULT_INSTRUCTIONS,
         truncate_entity_data: bool = True,
         summarize_history: bool = True,
+        cache_db: Optional[str] = None,
+        max_cached_summaries: int = 256,
     ):
         """
 
@@ -35,6 +35,8 @@ class RecursiveFormatter(ConversationFormatter):
         @param cache_dir:
         @param summary_instructions:
         @param truncate_entity_data: Whether we should truncate historical (stale) entity observations when summarizing.
+        @param cache_db: A SQLite file to store summaries in instead of a JSON file per summary in `cache_dir`.
+        @param max_cached_summaries: How many recently used summaries to keep in memory.
         """
         self.chunk_size = chunk_size
         self.api_factory = api_factory
@@ -46,58 +48,46 @@ class RecursiveFormatter(ConversationFormatter):
         )  # re.compile(r': \[((.|[\n])+)]",\)')
         self.summarize_history = summarize_history
 
-        # Ensure cache directory exists.
-        os.makedirs(cache_dir, exist_ok=True)
+        # Summaries are keyed by the hash of every message they cover, which is kept up to date as messages are appended
+        self.summary_cache = SummaryCache(cache_dir, cache_db, max_cached_summaries)
+        self.prefix_hashes = PrefixHashes(self._message_key)
+
+    @staticmethod
+    def _message_key(message: Message) -> Dict[str, Any]:
+        """What a message contributes to the hash of the messages summarized with it."""
+        return {
+            "role": message.role,
+            "content": message.content,
+            "metadata": message.metadata,
+        }
 
     def _get_chunk_hash(self, messages: List[Message]) -> str:
         """Generate a deterministic hash for a chunk of messages."""
-        chunk_content = json.dumps(
-            [
-                {"role": msg.role, "content": msg.content, "metadata": msg.metadata}
-                for msg in messages
-            ],
-            sort_keys=True,
-        )
-        return hashlib.sha256(chunk_content.encode()).hexdigest()
-
-    def _get_cache_path(self, chunk_hash: str) -> str:
-        """Get the file path for a cached summary."""
-        return os.path.join(self.cache_dir, f"{chunk_hash}.json")
+        return PrefixHashes(self._message_key).hash(messages)
 
     def _load_cached_summary(self, chunk_hash: str) -> Optional[Message]:
         """Load a cached summary if it exists."""
-        cache_path = self._get_cache_path(chunk_hash)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, "r") as f:
-                    data = json.load(f)
-                return Message(
-                    role="assistant",
-                    content=data["content"],
-                    metadata={
-                        "summarized": True,
-                        "summary_range": data["summary_range"],
-                    },
-                )
-            except Exception as e:
-                print(f"Error loading cached summary: {e}")
-                return None
-        return None
+        data = self.summary_cache.get(chunk_hash)
+        if data is None:
+            return None
+        return Message(
+            role="assistant",
+            content=data["content"],
+            metadata={
+                "summarized": True,
+                "summary_range": data["summary_range"],
+            },
+        )
 
     def _save_summary_cache(self, chunk_hash: str, summary: Message):
         """Save a generated summary to the cache."""
-        cache_path = self._get_cache_path(chunk_hash)
-        try:
-            with open(cache_path, "w") as f:
-                json.dump(
-                    {
-                        "content": summary.content,
-                        "summary_range": summary.metadata["summary_range"],
-                    },
-                    f,
-                )
-        except Exception as e:
-            print(f"Error saving summary cache: {e}")
+        self.summary_cache.put(
+            chunk_hash,
+            {
+                "content": summary.content,
+                "summary_range": summary.metadata["summary_range"],
+            },
+        )
 
     def _truncate_entity_data(
         self, message: Message, is_recent: bool = False
@@ -161,11 +151,13 @@ class RecursiveFormatter(ConversationFormatter):
         start_idx: int,
         end_idx: int,
         system_message: Message,
+        chunk_hash: Optional[str] = None,
     ) -> Message:
         """Summarize a chunk of messages, using cache if available."""
         # Truncate entity data before generating cache hash
         # truncated_messages = [self._truncate_entity_data(msg) for msg in messages]
-        chunk_hash = self._get_chunk_hash(messages)
+        if chunk_hash is None:
+            chunk_hash = self._get_chunk_hash(messages)
 
         cached_summary = self._load_cached_summary(chunk_hash)
         if cached_summary:
@@ -185,39 +177,42 @@ class RecursiveFormatter(ConversationFormatter):
         1. Take first chunk_size messages and summarize
         2. Take that summary and next chunk of messages, summarize together
         3. Continue until all messages are incorporated
+
+        Each summary is cached under the hash of all the messages it covers, so we only need to pick up from the
+        latest cached summary, rather than walk every chunk from the start.
         """
-        if len(messages) <= self.chunk_size:
-            return await self._summarize_chunk(
-                messages, 1, len(messages), system_message
-            )
+        self.prefix_hashes.update(messages)
 
-        # First summarize the leftmost chunk
-        left_chunk = messages[: self.chunk_size]
-        current_summary = await self._summarize_chunk(
-            left_chunk, 1, self.chunk_size, system_message
-        )
+        # The end of each chunk
+        chunk_ends = list(range(self.chunk_size, len(messages), self.chunk_size))
+        chunk_ends.append(len(messages))
 
-        # Process remaining messages in chunks
-        remaining = messages[self.chunk_size :]
-        current_end = self.chunk_size
+        # Find the latest summary we already have
+        current_summary = None
+        current_end = 0
+        for end in reversed(chunk_ends):
+            current_summary = self._load_cached_summary(self.prefix_hashes.prefix(end))
+            if current_summary:
+                current_end = end
+                break
 
-        while remaining:
-            # Take next chunk of messages
-            next_chunk_size = min(len(remaining), self.chunk_size)
-            next_chunk = remaining[:next_chunk_size]
+        for end in chunk_ends:
+            if end <= current_end:
+                continue
 
             # Combine current summary with next chunk and summarize
-            messages_to_summarize = [current_summary] + next_chunk
+            next_chunk = messages[current_end:end]
+            messages_to_summarize = (
+                [current_summary] + next_chunk if current_summary else next_chunk
+            )
             current_summary = await self._summarize_chunk(
                 messages_to_summarize,
                 1,  # Always start from 1
-                current_end + next_chunk_size,
+                end,
                 system_message,
+                chunk_hash=self.prefix_hashes.prefix(end),
             )
-
-            # Update remaining messages and current end position
-            remaining = remaining[next_chunk_size:]
-            current_end += next_chunk_size
+            current_end = end
 
         return current_summary
 
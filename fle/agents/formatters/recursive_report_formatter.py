@@ -1,7 +1,4 @@
 import copy
-import hashlib
-import json
-import os
 import re
 from typing import Any, Awaitable, Callable, Dict, List, Optional, TypedDict
 
@@ -10,6 +7,7 @@ from fle.commons.models.message import Message
 from fle.env.namespace import FactorioNamespace
 
 from fle.agents.formatters.conversation_formatter_abc import ConversationFormatter
+from fle.agents.formatters.summary_cache import PrefixHashes, SummaryCache
 
 DEFAULT_INSTRUCTIONS = """
 You are a report generating model for the game factorio. You are given a number of steps and logs an agent has executed in the game. You are also given the previous historical report. Using the previous historical report and the latest step execution logs you must generate a new report. The report must have 2 sections: EXISTING STRUCTURES and ERROR TIPS. Below are instructions for both of them
@@ -87,6 +85,8 @@ class RecursiveReportFormatter(ConversationFormatter):
         truncate_entity_data: bool = True,
         summarize_history: bool = True,
         max_chars: int = 200000,
+        cache_db: Optional[str] = None,
+        max_cached_summaries: int = 256,
     ):
         """
         @param chunk_size:
@@ -94,6 +94,8 @@ class RecursiveReportFormatter(ConversationFormatter):
         @param cache_dir:
         @param summary_instructions:
         @param truncate_entity_data: Whether we should truncate historical (stale) entity observations when summarizing.
+        @param cache_db: A SQLite file to store reports in instead of a JSON file per report in `cache_dir`.
+        @param max_cached_summaries: How many recently used reports to keep in memory.
         """
         self.llm_call = llm_call
         self.chunk_size = chunk_size
@@ -104,8 +106,9 @@ class RecursiveReportFormatter(ConversationFormatter):
         self.summarize_history = summarize_history
         self.max_chars = max_chars
 
-        # Ensure cache directory exists.
-        os.makedirs(cache_dir, exist_ok=True)
+        # Reports are keyed by the hash of every message they cover, which is kept up to date as messages are appended
+        self.summary_cache = SummaryCache(cache_dir, cache_db, max_cached_summaries)
+        self.prefix_hashes = PrefixHashes(self._message_key)
 
     def _get_conversation_length(self, messages: List[Message]) -> int:
         """Calculate total character length of all messages in conversation."""
@@ -146,42 +149,25 @@ class RecursiveReportFormatter(ConversationFormatter):
 
         return final_messages
 
+    @staticmethod
+    def _message_key(message: Message) -> Optional[Dict[str, Any]]:
+        """What a message contributes to the hash of the report covering it: only the execution logs count."""
+        if message.role != "user":
+            return None
+        return {"content": message.content}
+
     def _get_chunk_hash(self, messages: List[Message]) -> str:
         """Generate a deterministic hash for a chunk of messages."""
-        chunk_content = json.dumps(
-            [
-                {"role": msg.role, "content": msg.content, "metadata": msg.metadata}
-                for msg in messages
-            ],
-            sort_keys=True,
-        )
-        return hashlib.sha256(chunk_content.encode()).hexdigest()
-
-    def _get_cache_path(self, chunk_hash: str) -> str:
-        """Get the file path for a cached summary."""
-        return os.path.join(self.cache_dir, f"{chunk_hash}.json")
+        return PrefixHashes(self._message_key).hash(messages)
 
     def _load_cached_summary(self, chunk_hash: str) -> Optional[str]:
         """Load a cached summary if it exists."""
-        cache_path = self._get_cache_path(chunk_hash)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, "r") as f:
-                    data = json.load(f)
-                return data["content"]
-            except Exception as e:
-                print(f"Error loading cached summary: {e}")
-                return None
-        return None
+        data = self.summary_cache.get(chunk_hash)
+        return data["content"] if data else None
 
     def _save_summary_cache(self, chunk_hash: str, summary: str):
         """Save a generated summary to the cache."""
-        cache_path = self._get_cache_path(chunk_hash)
-        try:
-            with open(cache_path, "w") as f:
-                json.dump({"content": summary}, f)
-        except Exception as e:
-            print(f"Error saving summary cache: {e}")
+        self.summary_cache.put(chunk_hash, {"content": summary})
 
     def _truncate_entity_data(
         self, message: Message, is_recent: bool = False, message_index=0
@@ -238,20 +224,6 @@ class RecursiveReportFormatter(ConversationFormatter):
 
         return content
 
-    def _get_chunk_hash(self, messages: List[Message]) -> str:
-        """Generate a deterministic hash for a chunk of messages."""
-        chunk_content = json.dumps(
-            [
-                {
-                    "content": msg.content,
-                }
-                for msg in messages
-                if msg.role == "user"
-            ],
-            sort_keys=True,
-        )
-        return hashlib.sha256(chunk_content.encode()).hexdigest()
-
     async def format_conversation(
         self, conversation: Conversation, namespace: Optional[FactorioNamespace] = None
     ) -> Conversation:
@@ -302,12 +274,12 @@ class RecursiveReportFormatter(ConversationFormatter):
 
         # We turn this off
         if self.summarize_history:
+            self.prefix_hashes.update(messages)
             nr_of_messages = total_length - 1
             if nr_of_messages % self.chunk_size == 0:
                 nr_of_messages_in_report = nr_of_messages - self.chunk_size
-                messages_in_report = messages[:nr_of_messages_in_report]
                 if nr_of_messages_in_report > 0:
-                    messages_hash = self._get_chunk_hash(messages_in_report)
+                    messages_hash = self.prefix_hashes.prefix(nr_of_messages_in_report)
                     report = self._load_cached_summary(messages_hash)
                 else:
                     report = ""
@@ -316,15 +288,14 @@ class RecursiveReportFormatter(ConversationFormatter):
                     previous_report=report,
                     last_summary_step=nr_of_messages_in_report,
                 )
-                new_hash = self._get_chunk_hash(messages)
+                new_hash = self.prefix_hashes.prefix(len(messages))
                 self._save_summary_cache(new_hash, historical_report)
                 nr_of_messages_in_report = nr_of_messages
             else:
                 nr_of_messages_in_report = (
                     len(messages) // self.chunk_size
                 ) * self.chunk_size
-                messages_in_report = messages[:nr_of_messages_in_report]
-                messages_hash = self._get_chunk_hash(messages_in_report)
+                messages_hash = self.prefix_hashes.prefix(nr_of_messages_in_report)
                 historical_report = self._load_cached_summary(messages_hash)
 
             # Historical report of actions and observations
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fle.commons.models.message import Message
+
+EMPTY_HASH = hashlib.sha256(b"").hexdigest()
+
+
+def chain_hash(previous_hash: str, message_digest: str) -> str:
+    """The hash of a prefix of a conversation, given the hash of the prefix before it and the digest of its last message"""
+    return hashlib.sha256(f"{previous_hash}:{message_digest}".encode()).hexdigest()
+
+
+class PrefixHashes:
+    """
+    Rolling hashes of every prefix of a conversation.
+
+    Conversations only grow at the tail, so each update only hashes the messages appended since the last one.
+    If the last message we hashed has changed (e.g. a different conversation is being formatted), we start over.
+
+    `key` picks what a message contributes to the hash, or None to leave it out.
+    """
+
+    def __init__(self, key: Callable[[Message], Optional[Any]]):
+        self.key = key
+        self._digests: List[Optional[str]] = []
+        self._hashes: List[str] = [EMPTY_HASH]
+
+    def _digest(self, message: Message) -> Optional[str]:
+        key = self.key(message)
+        if key is None:
+            return None
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def update(self, messages: List[Message]):
+        """Hash any messages appended since the last update"""
+        known = len(self._digests)
+        if known > len(messages) or (
+            known and self._digest(messages[known - 1]) != self._digests[-1]
+        ):
+            self._digests = []
+            self._hashes = [EMPTY_HASH]
+            known = 0
+
+        for message in messages[known:]:
+            digest = self._digest(message)
+            self._digests.append(digest)
+            self._hashes.append(
+                self._hashes[-1]
+                if digest is None
+                else chain_hash(self._hashes[-1], digest)
+            )
+
+    def prefix(self, length: int) -> str:
+        """The hash of the first `length` messages of the last update"""
+        return self._hashes[length]
+
+    def hash(self, messages: List[Message]) -> str:
+        """The hash of all of `messages`"""
+        self.update(messages)
+        return self._hashes[len(messages)]
+
+
+class SummaryCache:
+    """
+    Conversation summaries keyed by the hash of the messages they summarize.
+
+    Recently used summaries are kept in memory (up to `max_entries`). Behind that, summaries are stored in a SQLite
+    file at `db_path`, which can be shared by several processes, or, without one, as a JSON file per summary in
+    `cache_dir`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = ".conversation_cache",
+        db_path: Optional[str] = None,
+        max_entries: int = 256,
+    ):
+        self.cache_dir = cache_dir
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if db_path:
+            if db_path != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        elif cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _remember(self, key: str, summary: Dict[str, Any]):
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_cache_path(self, key: str) -> str:
+        """Get the file path for a cached summary."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The summary stored under `key`, if any"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        try:
+            if self._conn is not None:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT summary FROM summaries WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is None:
+                    return None
+                summary = json.loads(row[0])
+            elif self.cache_dir:
+                cache_path = self._get_cache_path(key)
+                if not os.path.exists(cache_path):
+                    return None
+                with open(cache_path, "r") as f:
+                    summary = json.load(f)
+            else:
+                return None
+        except Exception as e:
+            print(f"Error loading cached summary: {e}")
+            return None
+
+        self._remember(key, summary)
+        return summary
+
+    def put(self, key: str, summary: Dict[str, Any]):
+        """Store a summary under `key`"""
+        self._remember(key, summary)
+        try:
+            if self._conn is not None:
+                with self._lock:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)",
+                        (key, json.dumps(summary)),
+                    )
+                    self._conn.commit()
+            elif self.cache_dir:
+                with open(self._get_cache_path(key), "w") as f:
+                    json.dump(summary, f)
+        except Exception as e:
+            print(f"Error saving summary cache: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
@@ -2,6 +2,11 @@
 
 # API and core functionality
 from fle.agents.llm.api_factory import APIFactory
+from fle.agents.llm.rate_limiter import (
+    RateLimiter,
+    set_rate_limit,
+    set_rate_limits_from_env,
+)
 
 # Parsing utilities
 from fle.agents.llm.parsing import Policy, PolicyMeta, PythonParser
@@ -28,6 +33,9 @@ from fle.agents.llm.utils import (
 __all__ = [
     # API
     "APIFactory",
+    "RateLimiter",
+    "set_rate_limit",
+    "set_rate_limits_from_env",
     # Parsing
     "Policy",
     "PolicyMeta",
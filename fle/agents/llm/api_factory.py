@@ -1,11 +1,19 @@
 import asyncio
 import os
+import threading
+import weakref
+from typing import Any, Dict
 
 import anthropic
 from openai import AsyncOpenAI, OpenAI
 from tenacity import retry, wait_exponential
 
 from fle.agents.llm.metrics import timing_tracker, track_timing_async
+from fle.agents.llm.rate_limiter import (
+    estimate_tokens,
+    get_rate_limiter,
+    response_tokens,
+)
 from fle.agents.llm.utils import (
     format_messages_for_anthropic,
     format_messages_for_openai,
@@ -23,6 +31,58 @@ class NoRetryAsyncOpenAI(AsyncOpenAI):
         super().__init__(**kwargs)
 
 
+# Base URL and API key variable of each provider with an OpenAI compatible API
+OPENAI_COMPATIBLE_PROVIDERS = {
+    "open_router": ("https://openrouter.ai/api/v1", "OPEN_ROUTER_API_KEY"),
+    "deepseek": ("https://api.deepseek.com", "DEEPSEEK_API_KEY"),
+    "gemini": (
+        "https://generativelanguage.googleapis.com/v1beta/openai/",
+        "GEMINI_API_KEY",
+    ),
+    "together": ("https://api.together.xyz/v1", "TOGETHER_API_KEY"),
+    "openai": (None, "OPENAI_API_KEY"),
+}
+
+# Clients are reused across calls so their connections are kept alive, rather than opening (and TLS handshaking)
+# a new one for every generation. Async clients are bound to the event loop they were first used on, so there
+# is one set per loop, dropped along with the loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_sync_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _async_client(provider: str):
+    """Get the shared async client of a provider for the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        if provider not in clients:
+            if provider == "anthropic":
+                clients[provider] = anthropic.AsyncAnthropic(
+                    max_retries=0, api_key=os.getenv("ANTHROPIC_API_KEY")
+                )
+            else:
+                base_url, api_key_variable = OPENAI_COMPATIBLE_PROVIDERS[provider]
+                clients[provider] = NoRetryAsyncOpenAI(
+                    base_url=base_url, api_key=os.getenv(api_key_variable)
+                )
+        return clients[provider]
+
+
+def _sync_client(provider: str):
+    """Get the shared synchronous client of a provider"""
+    with _clients_lock:
+        if provider not in _sync_clients:
+            if provider == "anthropic":
+                _sync_clients[provider] = anthropic.Anthropic()
+            else:
+                base_url, api_key_variable = OPENAI_COMPATIBLE_PROVIDERS[provider]
+                _sync_clients[provider] = OpenAI(
+                    base_url=base_url, api_key=os.getenv(api_key_variable)
+                )
+        return _sync_clients[provider]
+
+
 class APIFactory:
     # Models that support image input
     MODELS_WITH_IMAGE_SUPPORT = [
@@ -75,6 +135,22 @@ class APIFactory:
     @track_timing_async("llm_api_call")
     @retry(wait=wait_exponential(multiplier=2, min=2, max=15))
     async def acall(self, *args, **kwargs):
+        # Wait for the model's rate limit (see `set_rate_limit`), if it has one, rather than bursting into 429s
+        limiter = get_rate_limiter(kwargs.get("model", self.model))
+        if not limiter:
+            return await self._acall(*args, **kwargs)
+
+        estimated_tokens = estimate_tokens(
+            kwargs.get("messages", []), kwargs.get("max_tokens", 256)
+        )
+        await limiter.acquire(estimated_tokens)
+        response = await self._acall(*args, **kwargs)
+        actual_tokens = response_tokens(response)
+        if actual_tokens is not None:
+            limiter.settle(estimated_tokens, actual_tokens)
+        return response
+
+    async def _acall(self, *args, **kwargs):
         max_tokens = kwargs.get("max_tokens", 2000)
         model_to_use = kwargs.get("model", self.model)
         messages = kwargs.get("messages", [])
@@ -92,10 +168,7 @@ class APIFactory:
             async with timing_tracker.track_async(
                 "open_router_api_call", model=model_to_use, llm=True
             ):
-                client = NoRetryAsyncOpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=os.getenv("OPEN_ROUTER_API_KEY"),
-                )
+                client = _async_client("open_router")
                 response = await client.chat.completions.create(
                     model=model_to_use.replace("open-router", "").strip("-"),
                     max_tokens=kwargs.get("max_tokens", 256),
@@ -160,12 +233,8 @@ class APIFactory:
                     raise RuntimeError("No system message!!")
 
                 try:
-                    client = anthropic.Anthropic(
-                        max_retries=0, api_key=os.getenv("ANTHROPIC_API_KEY")
-                    )
-                    # Use asyncio.to_thread for CPU-bound operations
-                    response = await asyncio.to_thread(
-                        client.messages.create,
+                    client = _async_client("anthropic")
+                    response = await client.messages.create(
                         temperature=kwargs.get("temperature", 0.7),
                         max_tokens=max_tokens,
                         model=model_to_use,
@@ -188,10 +257,7 @@ class APIFactory:
             async with timing_tracker.track_async(
                 "deepseek_api_call", model=model_to_use, llm=True
             ):
-                client = NoRetryAsyncOpenAI(
-                    api_key=os.getenv("DEEPSEEK_API_KEY"),
-                    base_url="https://api.deepseek.com",
-                )
+                client = _async_client("deepseek")
                 try:
                     response = await client.chat.completions.create(
                         model=model_to_use,
@@ -219,10 +285,7 @@ class APIFactory:
             async with timing_tracker.track_async(
                 "gemini_api_call", model=model_to_use, llm=True
             ):
-                client = NoRetryAsyncOpenAI(
-                    api_key=os.getenv("GEMINI_API_KEY"),
-                    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-                )
+                client = _async_client("gemini")
                 response = await client.chat.completions.create(
                     model=model_to_use,
                     max_tokens=kwargs.get("max_tokens", 256),
@@ -242,10 +305,7 @@ class APIFactory:
             async with timing_tracker.track_async(
                 "together_api_call", model=model_to_use, llm=True
             ):
-                client = NoRetryAsyncOpenAI(
-                    api_key=os.getenv("TOGETHER_API_KEY"),
-                    base_url="https://api.together.xyz/v1",
-                )
+                client = _async_client("together")
                 return await client.chat.completions.create(
                     model=model_to_use,
                     max_tokens=kwargs.get("max_tokens", 256),
@@ -266,7 +326,7 @@ class APIFactory:
             async with timing_tracker.track_async(
                 "o1_mini_api_call", model=model_to_use, llm=True
             ):
-                client = NoRetryAsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                client = _async_client("openai")
                 # replace `max_tokens` with `max_completion_tokens` for OpenAI API
                 if "max_tokens" in kwargs:
                     kwargs.pop("max_tokens")
@@ -315,7 +375,7 @@ class APIFactory:
                 "openai_api_call", model=model_to_use, llm=True
             ):
                 try:
-                    client = NoRetryAsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                    client = _async_client("openai")
                     assert "messages" in kwargs, (
                         "You must provide a list of messages to the model."
                     )
@@ -355,7 +415,7 @@ class APIFactory:
                 except Exception as e:
                     print(e)
                     try:
-                        client = NoRetryAsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                        client = _async_client("openai")
                         assert "messages" in kwargs, (
                             "You must provide a list of messages to the model."
                         )
@@ -401,6 +461,21 @@ class APIFactory:
                         raise
 
     def call(self, *args, **kwargs):
+        limiter = get_rate_limiter(kwargs.get("model", self.model))
+        if not limiter:
+            return self._call(*args, **kwargs)
+
+        estimated_tokens = estimate_tokens(
+            kwargs.get("messages", []), kwargs.get("max_tokens", 1500)
+        )
+        limiter.acquire_sync(estimated_tokens)
+        response = self._call(*args, **kwargs)
+        actual_tokens = response_tokens(response)
+        if actual_tokens is not None:
+            limiter.settle(estimated_tokens, actual_tokens)
+        return response
+
+    def _call(self, *args, **kwargs):
         # For the synchronous version, we should also implement image support,
         # but I'll leave this method unchanged as the focus is on the async version.
         # The same pattern would be applied here as in acall.
@@ -460,7 +535,7 @@ class APIFactory:
                 )
 
             try:
-                client = anthropic.Anthropic()
+                client = _sync_client("anthropic")
                 response = client.messages.create(
                     temperature=kwargs.get("temperature", 0.7),
                     max_tokens=max_tokens,
@@ -481,10 +556,7 @@ class APIFactory:
                     "Deepseek models do not support image inputs, but images were provided."
                 )
 
-            client = OpenAI(
-                api_key=os.getenv("DEEPSEEK_API_KEY"),
-                base_url="https://api.deepseek.com",
-            )
+            client = _sync_client("deepseek")
             response = client.chat.completions.create(
                 *args,
                 **kwargs,
@@ -502,7 +574,7 @@ class APIFactory:
             if has_images:
                 raise ValueError("Claude o1-mini model does not support image inputs.")
 
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = _sync_client("openai")
             # replace `max_tokens` with `max_completion_tokens` for OpenAI API
             if "max_tokens" in kwargs:
                 kwargs.pop("max_tokens")
@@ -511,7 +583,7 @@ class APIFactory:
                 *args, n=self.beam, **kwargs, stream=False
             )
         else:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = _sync_client("openai")
             assert "messages" in kwargs, (
                 "You must provide a list of messages to the model."
             )
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except (
+    ImportError
+):  # Not available on Windows, where limits can't be shared between processes
+    fcntl = None
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests and tokens per minute to an LLM provider.
+
+    Each bucket holds up to a minute's allowance and refills continuously, so bursts are allowed up to that
+    allowance and then smoothed out. A limiter is safe to share between coroutines and threads. Give it a
+    `shared_path` to also share the allowance with other processes on this machine, through a locked state file.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        shared_path: Optional[str] = None,
+    ):
+        self.capacity: Dict[str, float] = {}
+        if requests_per_minute:
+            self.capacity["requests"] = requests_per_minute
+        if tokens_per_minute:
+            self.capacity["tokens"] = tokens_per_minute
+        if shared_path and fcntl is None:
+            raise ValueError("Sharing rate limits between processes needs fcntl")
+
+        self.shared_path = shared_path
+        self._lock = threading.Lock()
+        self._state = self._full_state()
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until a request of about `tokens` tokens is allowed, and take it from the allowance"""
+        while (wait := self._try_take(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: int = 0):
+        """Like `acquire`, for synchronous callers"""
+        while (wait := self._try_take(tokens)) > 0:
+            time.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token allowance once a response reports how many tokens the request really used"""
+        if "tokens" not in self.capacity:
+            return
+        with self._locked_state() as state:
+            state["levels"]["tokens"] += estimated_tokens - actual_tokens
+
+    def _try_take(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if the buckets hold enough, returning 0, or else how long to wait"""
+        # A request larger than the whole allowance could never go through, so it just waits for a full bucket
+        cost = {
+            name: min(tokens if name == "tokens" else 1, capacity)
+            for name, capacity in self.capacity.items()
+        }
+        with self._locked_state() as state:
+            now = time.time()
+            elapsed = max(0.0, now - state["updated"])
+            state["updated"] = now
+            wait = 0.0
+            for name, capacity in self.capacity.items():
+                level = min(capacity, state["levels"][name] + elapsed * capacity / 60)
+                state["levels"][name] = level
+                wait = max(wait, (cost[name] - level) * 60 / capacity)
+
+            if wait <= 0:
+                for name in self.capacity:
+                    state["levels"][name] -= cost[name]
+            return wait
+
+    def _full_state(self) -> Dict[str, Any]:
+        return {"levels": dict(self.capacity), "updated": time.time()}
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            if not self.shared_path:
+                yield self._state
+                return
+
+            fd = os.open(self.shared_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                with os.fdopen(os.dup(fd), "r+") as file:
+                    content = file.read()
+                    state = json.loads(content) if content else self._full_state()
+                    # Limits may have been changed since the file was written
+                    for name, capacity in self.capacity.items():
+                        state["levels"].setdefault(name, capacity)
+                    yield state
+                    file.seek(0)
+                    file.truncate()
+                    json.dump(state, file)
+            finally:
+                os.close(fd)
+
+
+# Limiters by model name (or part of one), shared by every APIFactory in this process
+_rate_limiters: Dict[str, RateLimiter] = {}
+# Whether the limits in FLE_RATE_LIMITS have been read yet (see `set_rate_limits_from_env`)
+_env_limits_loaded = False
+
+
+def set_rate_limit(
+    model: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    shared_path: Optional[str] = None,
+) -> RateLimiter:
+    """
+    Limit the requests / tokens per minute sent to a model, across every caller in this process.
+    `model` also matches any model name containing it, e.g. 'claude-3-5-sonnet' matches 'claude-3-5-sonnet-20241022'.
+    Pass `shared_path` to share the limit with other processes using the same path.
+    """
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute, shared_path)
+    _rate_limiters[model] = limiter
+    return limiter
+
+
+def set_rate_limits_from_env(variable: str = "FLE_RATE_LIMITS"):
+    """
+    Set the rate limits configured in an environment variable, as JSON mapping model names to `set_rate_limit`
+    arguments, e.g. '{"claude-3-5-sonnet": {"requests_per_minute": 50, "tokens_per_minute": 80000}}'.
+    Limits already set with `set_rate_limit` are kept.
+    """
+    global _env_limits_loaded
+    _env_limits_loaded = True
+    limits = os.getenv(variable)
+    if not limits:
+        return
+    for model, limit in json.loads(limits).items():
+        if model not in _rate_limiters:
+            set_rate_limit(model, **limit)
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """Get the limiter for a model: an exact match, else the most specific one whose name it contains"""
+    if not _env_limits_loaded:
+        set_rate_limits_from_env()
+    if model in _rate_limiters:
+        return _rate_limiters[model]
+    matches = [name for name in _rate_limiters if name in model]
+    if not matches:
+        return None
+    return _rate_limiters[max(matches, key=len)]
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int = 0) -> int:
+    """Rough token count of a request (~4 characters per token), to reserve before the real count is known"""
+    characters = 0
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(
+                part.get("text", "") if isinstance(part, dict) else str(part)
+                for part in content
+            )
+        characters += len(str(content))
+    return characters // 4 + max_tokens
+
+
+def response_tokens(response) -> Optional[int]:
+    """Total tokens used according to an OpenAI or Anthropic response, if it says"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    if getattr(usage, "total_tokens", None) is not None:
+        return usage.total_tokens
+    if getattr(usage, "input_tokens", None) is not None:
+        return usage.input_tokens + (usage.output_tokens or 0)
+    return None
@@ -1,7 +1,9 @@
+import asyncio
 import json
 import logging
 import math
 import os
+import queue
 import random
 import sqlite3
 import statistics
@@ -9,11 +11,11 @@ import threading
 from abc import ABC
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg2
 import tenacity
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
 from psycopg2.pool import ThreadedConnectionPool
 from tenacity import retry_if_exception_type, wait_exponential, wait_random_exponential
 
@@ -25,8 +27,52 @@ from fle.commons.models.program import Program
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PROGRAM_COLUMNS = (
+    "code, value, visits, parent_id, state_json, conversation_json, "
+    "completion_token_usage, prompt_token_usage, token_usage, response, "
+    "holdout_value, raw_reward, version, version_description, model, meta, "
+    "achievements_json, instance, depth, advantage, ticks, timing_metrics_json"
+)
+
+
+def program_row(program: Program) -> tuple:
+    """The values of a program for the PROGRAM_COLUMNS of a new row"""
+    return (
+        program.code,
+        program.value,
+        0,  # Assuming visits is initially set to 0
+        program.parent_id,
+        program.state.to_raw() if program.state else None,
+        json.dumps(program.conversation.dict()),
+        program.completion_token_usage,
+        program.prompt_token_usage,
+        program.token_usage,
+        program.response,
+        program.holdout_value,
+        program.raw_reward,
+        program.version,
+        program.version_description,
+        program.model,
+        json.dumps(program.meta),
+        json.dumps(program.achievements),
+        program.instance,
+        program.depth / 2,
+        program.advantage,
+        program.ticks,
+        json.dumps(program.timing_metrics) if program.timing_metrics else None,
+    )
+
 
 class DBClient(ABC):
+    """
+    Programs are written behind the callers' backs: `create_program` and `update_program` queue their write, and
+    a writer thread commits everything queued so far in a single transaction. Callers that don't need the result
+    straight away can use `queue_program` / `queue_update`, and await the future they return later (or never).
+    """
+
+    # Most writes to commit in one transaction
+    write_batch_size = 64
+
     def __init__(
         self,
         max_conversation_length: int = 20,
@@ -44,6 +90,8 @@ class DBClient(ABC):
         self.max_connections = max_connections
         self._lock = threading.Lock()
         self.db_config = db_config
+        self._writes = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
 
     async def initialize(self):
         """Initialize the connection pool"""
@@ -150,59 +198,134 @@ class DBClient(ABC):
         wait=wait_random_exponential(multiplier=1, min=4, max=10),
     )
     async def create_program(self, program: Program) -> Program:
-        """Create a new program, now with connection management"""
-        try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO programs (code, value, visits, parent_id, state_json, conversation_json, 
-                                           completion_token_usage, prompt_token_usage, token_usage, response, 
-                                           holdout_value, raw_reward, version, version_description, model, meta, 
-                                           achievements_json, instance, depth, advantage, ticks, timing_metrics_json)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id, created_at
-                    """,
-                        (
-                            program.code,
-                            program.value,
-                            0,
-                            program.parent_id,
-                            program.state.to_raw() if program.state else None,
-                            json.dumps(program.conversation.dict()),
-                            program.completion_token_usage,
-                            program.prompt_token_usage,
-                            program.token_usage,
-                            program.response,
-                            program.holdout_value,
-                            program.raw_reward,
-                            program.version,
-                            program.version_description,
-                            program.model,
-                            json.dumps(program.meta),
-                            json.dumps(program.achievements),
-                            program.instance,
-                            program.depth / 2,
-                            program.advantage,
-                            program.ticks,
-                            json.dumps(program.timing_metrics)
-                            if program.timing_metrics
-                            else None,
-                        ),
-                    )
+        """Create a new program, returning it with its id and creation time once it has been committed"""
+        return await self.queue_program(program)
 
-                    id, created_at = cur.fetchone()
-                    conn.commit()
-                    program.id = id
-                    program.created_at = created_at
-                    return program
-        except Exception as e:
-            conn.rollback()
-            print(f"Error creating program: {e}")
-            raise e
+    def queue_program(self, program: Program) -> "asyncio.Future[Program]":
+        """
+        Queue a new program to be inserted with the next batch of writes.
+        The returned future resolves to the program, with its id and creation time, once it has been committed.
+        """
+        return self._queue_write("create", program)
+
+    def queue_update(
+        self, program_id: int, updates: Dict[str, Any]
+    ) -> "asyncio.Future[Program]":
+        """Queue an update to a program, like `update_program`, without waiting for it"""
+        return self._queue_write("update", (program_id, dict(updates)))
+
+    async def flush(self):
+        """Wait until every write queued so far has been committed"""
+        if self._writer is not None:
+            await self._queue_write("flush", None)
+
+    def _queue_write(self, kind: str, payload: Any) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="db-writer", daemon=True
+                )
+                self._writer.start()
+        self._writes.put((kind, payload, loop, future))
+        return future
+
+    def _write_loop(self):
+        while True:
+            writes = [self._writes.get()]
+            while len(writes) < self.write_batch_size:
+                try:
+                    writes.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(write is None for write in writes)
+            writes = [write for write in writes if write is not None]
+
+            if not writes:
+                return
+            try:
+                results = self._commit_writes(writes)
+            except Exception:
+                # Something in the batch failed, so commit them one at a time to only fail the bad ones
+                results = []
+                for write in writes:
+                    try:
+                        results.extend(self._commit_writes([write]))
+                    except Exception as e:
+                        print(f"Error writing program: {e}")
+                        results.append(e)
+
+            for (_, _, loop, future), result in zip(writes, results):
+                _resolve_threadsafe(loop, future, result)
+            if stop:
+                return
+
+    def _commit_writes(self, writes: List[Tuple]) -> List[Any]:
+        """Commit a batch of writes in one transaction, returning their results in order"""
+        with self.get_connection() as conn:
+            try:
+                cur = conn.cursor()
+                creates = [
+                    payload for kind, payload, _, _ in writes if kind == "create"
+                ]
+                created = iter(self._insert_programs(cur, creates) if creates else [])
+                results = []
+                for kind, payload, _, _ in writes:
+                    if kind == "create":
+                        results.append(next(created))
+                    elif kind == "update":
+                        results.append(self._update_program(cur, *payload))
+                    else:
+                        results.append(None)
+                conn.commit()
+                return results
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _insert_programs(self, cur, programs: List[Program]) -> List[Program]:
+        """Insert programs, setting their ids and creation times"""
+        rows = execute_values(
+            cur,
+            f"INSERT INTO programs ({PROGRAM_COLUMNS}) VALUES %s RETURNING id, created_at",
+            [program_row(program) for program in programs],
+            page_size=len(programs),
+            fetch=True,
+        )
+        for program, (id, created_at) in zip(programs, rows):
+            program.id = id
+            program.created_at = created_at
+        return programs
+
+    def _update_program(self, cur, program_id: int, updates: Dict[str, Any]) -> Program:
+        # Handle timing_metrics separately since it needs to be JSON serialized
+        timing_metrics = updates.pop("timing_metrics", None)
+        if timing_metrics is not None:
+            updates["timing_metrics_json"] = json.dumps(timing_metrics)
+
+        set_clauses = [f"{k} = %s" for k in updates.keys()]
+        values = list(updates.values())
+
+        cur.execute(
+            f"""
+            UPDATE programs
+            SET {", ".join(set_clauses)}
+            WHERE id = %s
+            RETURNING *
+        """,
+            values + [program_id],
+        )
+        row = cur.fetchone()
+        return Program.from_row(dict(zip([desc[0] for desc in cur.description], row)))
 
     async def cleanup(self):
         """Clean up database resources"""
+        if self._writer is not None:
+            await self.flush()
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
         if self._pool is not None:
             with self._lock:
                 if self._pool is not None:
@@ -397,36 +520,8 @@ class DBClient(ABC):
             raise e
 
     async def update_program(self, program_id: int, updates: Dict[str, Any]) -> Program:
-        """Update program with proper connection management"""
-        try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    # Handle timing_metrics separately since it needs to be JSON serialized
-                    timing_metrics = updates.pop("timing_metrics", None)
-                    if timing_metrics is not None:
-                        updates["timing_metrics_json"] = json.dumps(timing_metrics)
-
-                    set_clauses = [f"{k} = %s" for k in updates.keys()]
-                    values = list(updates.values())
-
-                    cur.execute(
-                        f"""
-                        UPDATE programs
-                        SET {", ".join(set_clauses)}
-                        WHERE id = %s
-                        RETURNING *
-                    """,
-                        values + [program_id],
-                    )
-
-                    conn.commit()
-                    row = cur.fetchone()
-                    return Program.from_row(
-                        dict(zip([desc[0] for desc in cur.description], row))
-                    )
-        except Exception as e:
-            print(f"Error updating program: {e}")
-            raise e
+        """Update a program, returning it once the update has been committed"""
+        return await self.queue_update(program_id, updates)
 
     async def get_resume_state(
         self, resume_version, process_id, agent_idx=-1
@@ -466,6 +561,23 @@ class DBClient(ABC):
             return None, None, None, None
 
 
+def _resolve_threadsafe(
+    loop: asyncio.AbstractEventLoop, future: asyncio.Future, result
+):
+    def resolve():
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+    try:
+        loop.call_soon_threadsafe(resolve)
+    except RuntimeError:
+        pass  # The loop has been closed, so nothing is waiting for the result
+
+
 class PostgresDBClient(DBClient):
     def __init__(
         self,
@@ -528,26 +640,35 @@ class SQLliteDBClient(DBClient):
             max_conversation_length, min_connections, max_connections, **db_config
         )
         self.database_file = self.db_config.get("database_file")
+        # A single connection, kept open, shared by the event loop and the writer thread
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.RLock()
 
     async def initialize(self):
-        """Initialize the connection pool"""
-        if self._pool is None:
-            async with self._lock:
-                if self._pool is None:  # Double check pattern
-                    self._pool = ThreadedConnectionPool(
-                        self.min_connections, self.max_connections, **self.db_config
-                    )
+        """Open the connection"""
+        with self.get_connection():
+            pass
 
     @contextmanager
     def get_connection(self):
-        """Context manager for SQLite database connections"""
-        conn = None
-        try:
-            conn = sqlite3.connect(self.database_file)
-            yield conn
-        finally:
-            if conn:
-                conn.close()
+        """Context manager for the SQLite database connection, which only one thread can use at a time"""
+        with self._conn_lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(
+                    self.database_file, timeout=30, check_same_thread=False
+                )
+                # Readers (e.g. other processes) no longer block writers, and commits needn't wait for a full sync
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            yield self._conn
+
+    async def cleanup(self):
+        """Clean up database resources"""
+        await super().cleanup()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     @tenacity.retry(
         retry=retry_if_exception_type(
@@ -598,92 +719,58 @@ class SQLliteDBClient(DBClient):
             if not results:
                 print(f"No valid programs found for version {resume_version}")
                 return None, None, None, None
-            resulting_program_dict = dict(
-                zip([desc[0] for desc in cur.description], results[0])
-            )
-            # make meta, state_json achievements_json and conversation_json table a dict
-            resulting_program_dict["meta"] = json.loads(resulting_program_dict["meta"])
-            resulting_program_dict["achievements_json"] = json.loads(
-                resulting_program_dict["achievements_json"]
-            )
-            resulting_program_dict["conversation_json"] = json.loads(
-                resulting_program_dict["conversation_json"]
-            )
-            resulting_program_dict["state_json"] = json.loads(
-                resulting_program_dict["state_json"]
-            )
             # Choose a program to resume from
-            program = Program.from_row(resulting_program_dict)
+            program = _program_from_sqlite_row(
+                dict(zip([desc[0] for desc in cur.description], results[0]))
+            )
             return program.state, program.conversation, program.id, program.depth
 
         except Exception as e:
             print(f"Error getting resume state: {e}")
             return None, None, None, None
 
-    @tenacity.retry(
-        retry=retry_if_exception_type(
-            (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.DatabaseError)
-        ),
-        wait=wait_random_exponential(multiplier=1, min=4, max=10),
-    )
-    async def create_program(self, program: Program) -> Program:
-        """Create a new program, now with connection management"""
-        try:
-            with self.get_connection() as conn:
-                cur = conn.cursor()
+    def _insert_programs(self, cur, programs: List[Program]) -> List[Program]:
+        """Insert programs, setting their ids and creation times"""
+        for program in programs:
+            cur.execute(
+                f"INSERT INTO programs ({PROGRAM_COLUMNS}) VALUES ({', '.join('?' * 22)})",
+                program_row(program),
+            )
+            program.id = cur.lastrowid
 
-                # Insert the program data
-                cur.execute(
-                    """
-                    INSERT INTO programs (code, value, visits, parent_id, state_json, conversation_json, 
-                                          completion_token_usage, prompt_token_usage, token_usage, response, 
-                                          holdout_value, raw_reward, version, version_description, model, meta, 
-                                          achievements_json, instance, depth, advantage, ticks, timing_metrics_json)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        program.code,
-                        program.value,
-                        0,  # Assuming visits is initially set to 0
-                        program.parent_id,
-                        program.state.to_raw() if program.state else None,
-                        json.dumps(program.conversation.dict()),
-                        program.completion_token_usage,
-                        program.prompt_token_usage,
-                        program.token_usage,
-                        program.response,
-                        program.holdout_value,
-                        program.raw_reward,
-                        program.version,
-                        program.version_description,
-                        program.model,
-                        json.dumps(program.meta),
-                        json.dumps(program.achievements),
-                        program.instance,
-                        program.depth / 2,
-                        program.advantage,
-                        program.ticks,
-                        json.dumps(program.timing_metrics)
-                        if program.timing_metrics
-                        else None,
-                    ),
-                )
+        ids = [program.id for program in programs]
+        cur.execute(
+            f"SELECT id, created_at FROM programs WHERE id IN ({', '.join('?' * len(ids))})",
+            ids,
+        )
+        created_at = dict(cur.fetchall())
+        for program in programs:
+            program.created_at = created_at[program.id]
+        return programs
+
+    def _update_program(self, cur, program_id: int, updates: Dict[str, Any]) -> Program:
+        timing_metrics = updates.pop("timing_metrics", None)
+        if timing_metrics is not None:
+            updates["timing_metrics_json"] = json.dumps(timing_metrics)
+
+        set_clauses = [f"{k} = ?" for k in updates.keys()]
+        cur.execute(
+            f"UPDATE programs SET {', '.join(set_clauses)} WHERE id = ?",
+            list(updates.values()) + [program_id],
+        )
+        cur.execute("SELECT * FROM programs WHERE id = ?", (program_id,))
+        row = cur.fetchone()
+        return _program_from_sqlite_row(
+            dict(zip([desc[0] for desc in cur.description], row))
+        )
 
-                # Get the last inserted row ID
-                program.id = cur.lastrowid
 
-                # Retrieve the created_at timestamp
-                cur.execute(
-                    "SELECT created_at FROM programs WHERE id = ?", (program.id,)
-                )
-                program.created_at = cur.fetchone()[0]
-                conn.commit()
-                # Return the updated program object
-                return program
-        except Exception as e:
-            conn.rollback()
-            print(f"Error creating program: {e}")
-            raise e
+def _program_from_sqlite_row(row: Dict[str, Any]) -> Program:
+    """SQLite stores the JSON columns as text, so parse them before building the program"""
+    for column in ("meta", "achievements_json", "conversation_json", "state_json"):
+        if row[column]:
+            row[column] = json.loads(row[column])
+    return Program.from_row(row)
 
 
 def create_default_sqlite_db(db_file: str) -> None:
@@ -1,13 +1,20 @@
+import base64
+import hashlib
 import json
 import pickle
 import time
+import zlib
 from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fle.commons.models.research_state import ResearchState
 from fle.commons.models.technology_state import TechnologyState
 
+# Entity fields that describe an entity, but aren't restored by `load_entity_state`.
+# They are left out of the content hash, so they don't make unchanged entities look different.
+UNRESTORED_ENTITY_FIELDS = ("entity_number", "status", "warnings", "health")
+
 
 @dataclass
 class GameState:
@@ -55,6 +62,7 @@ class GameState:
     @classmethod
     def from_instance(cls, instance) -> "GameState":
         """Capture current game state from Factorio instances"""
+        tick = instance.get_tick()
         entities = instance.first_namespace._save_entity_state(
             compress=True, encode=True
         )
@@ -62,6 +70,30 @@ class GameState:
         # Get research state
         research_state = instance.first_namespace._save_research_state()
 
+        # Get inventories for all players
+        inventories = [
+            namespace.inspect_inventory() for namespace in instance.namespaces
+        ]
+        return cls._capture(instance, tick, entities, research_state, inventories)
+
+    @classmethod
+    def from_observation(cls, instance, observation: Dict[str, Any]) -> "GameState":
+        """
+        Capture current game state from what `_observe(entity_state=True)` returned,
+        rather than fetching each part from the game again
+        """
+        return cls._capture(
+            instance,
+            observation["tick"],
+            observation["entity_state"],
+            observation["research"],
+            observation["inventories"],
+        )
+
+    @classmethod
+    def _capture(
+        cls, instance, tick: int, entities: str, research_state, inventories
+    ) -> "GameState":
         # Filter and pickle only serializable variables
         namespaces = []
         for namespace in instance.namespaces:
@@ -71,19 +103,89 @@ class GameState:
             else:
                 namespaces.append(bytes())
 
-        # Get inventories for all players
-        inventories = [
-            namespace.inspect_inventory() for namespace in instance.namespaces
-        ]
         agent_messages = [namespace.get_messages() for namespace in instance.namespaces]
 
-        return cls(
+        state = cls(
             entities=entities,
             inventories=inventories,
             namespaces=namespaces,
             research=research_state,
             agent_messages=agent_messages,
         )
+        # The game holds exactly this state, so resetting straight back to it needn't reload anything
+        instance.track_game_state(state, tick)
+        return state
+
+    def entity_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the entities in this state keyed by a hash of their contents.
+        Two states share a key exactly when restoring either would produce the same entity.
+        """
+        if getattr(self, "_entity_index", None) is None:
+            index = {}
+            for entity in decode_entities(self.entities):
+                key = entity_hash(entity)
+                # Identical entities (e.g. items on the ground) get distinct keys
+                while key in index:
+                    key += "+"
+                index[key] = entity
+            self._entity_index = index
+        return self._entity_index
+
+    def same_as(self, other: "GameState") -> bool:
+        """Whether restoring `other` would produce the same game as restoring this state"""
+        if other is self:
+            return True
+
+        def inventories(state):
+            # Inventories are dicts once a state has been through `to_raw`
+            return [
+                getattr(inventory, "__dict__", inventory)
+                for inventory in state.inventories
+            ]
+
+        return (
+            self.entities == other.entities
+            and inventories(self) == inventories(other)
+            and self.research == other.research
+        )
+
+    def entity_changes(
+        self, current: "GameState"
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Compare the entities of this state with those of `current`, which the game holds.
+        Returns the entities to remove from the game (stale) and those to load into it (missing) to restore this state.
+        """
+        target = self.entity_index()
+        loaded = current.entity_index()
+        stale = [entity for key, entity in loaded.items() if key not in target]
+        # Characters are never removed, so they are always reloaded to move them back into place
+        missing = [
+            entity
+            for key, entity in target.items()
+            if key not in loaded or is_character(entity)
+        ]
+        return stale, missing
+
+    def content_hash(self) -> str:
+        """
+        Hash of everything that restoring this state restores, i.e. not its timestamp.
+        States with the same hash produce the same game, so they can share evaluation results.
+        """
+        data = {
+            "entities": self.entities,
+            "inventories": [
+                getattr(inventory, "__dict__", inventory)
+                for inventory in self.inventories
+            ],
+            "research": asdict(self.research) if self.research else None,
+            "namespaces": [ns.hex() if ns else "" for ns in self.namespaces],
+            "agent_messages": self.agent_messages,
+        }
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True, default=str).encode()
+        ).hexdigest()
 
     def __repr__(self):
         readable_namespaces = [pickle.loads(namespace) for namespace in self.namespaces]
@@ -223,6 +325,34 @@ class GameState:
                 instance.persistent_vars.update(restored_vars)
 
 
+def encode_entities(entities: List[Dict[str, Any]], compress: bool = True) -> str:
+    """Encode saved entities as a base64 string, compressed by default, as stored in `GameState.entities`"""
+    encoded = json.dumps(entities).encode()
+    if compress:
+        encoded = zlib.compress(encoded)
+    return base64.b64encode(encoded).decode()
+
+
+def decode_entities(entities: str) -> List[Dict[str, Any]]:
+    """Inverse of `encode_entities`"""
+    if not entities:
+        return []
+    decoded = json.loads(zlib.decompress(base64.b64decode(entities)))
+    # An empty Lua table can be serialised as an object
+    return list(decoded.values()) if isinstance(decoded, dict) else decoded
+
+
+def is_character(entity: Dict[str, Any]) -> bool:
+    """Whether a saved entity is a character. Names are quoted in states saved before tools answered in JSON."""
+    return str(entity.get("name", "")).strip('"') == "character"
+
+
+def entity_hash(entity: Dict[str, Any]) -> str:
+    """Hash the parts of a serialised entity that `load_entity_state` restores"""
+    content = {k: v for k, v in entity.items() if k not in UNRESTORED_ENTITY_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
 def filter_serializable_vars(vars_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Filter dictionary to only include serializable items"""
     return {key: value for key, value in vars_dict.items() if is_serializable(value)}
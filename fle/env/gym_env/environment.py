@@ -1,8 +1,7 @@
-import time
 import gym
 import numpy as np
 from gym import spaces
-from typing import Dict, Optional, Tuple, Any
+from typing import Callable, Collection, Dict, List, Optional, Tuple, Any
 import pickle
 import datetime
 import string
@@ -10,10 +9,12 @@ import string
 from fle.env import FactorioInstance
 from fle.commons.models.game_state import GameState
 from fle.env.gym_env.action import Action
+from fle.env.utils.lazy_dict import LazyDict
 from fle.commons.models.achievements import ProductionFlows
 from fle.env.utils.profits import get_achievements
 from fle.agents import Response, TaskResponse
 from fle.env.gym_env.observation import (
+    EntityObservation,
     Observation,
     GameInfo,
     AgentMessage,
@@ -23,6 +24,9 @@ from fle.eval.tasks import TaskABC
 # need to do this since gym doesn't work with numpy>=2.0 otherwise.
 np.bool8 = np.dtype(np.bool)
 
+# Fields that can be computed lazily (see `lazy_fields`)
+LAZY_FIELDS = ("entities", "serialized_functions", "output_game_state")
+
 
 class AllCharText(gym.spaces.Text):
     def __init__(self, max_length: int):
@@ -203,13 +207,30 @@ class FactorioGymEnv(gym.Env):
         task: Optional[TaskABC] = None,
         value_accrual_time: int = 10,
         error_penalty: float = 10.0,
+        lazy_fields: Collection[str] = (),
     ):
+        """
+        Args:
+            lazy_fields: Observation fields (`entities`, `serialized_functions`) and info fields (`output_game_state`)
+                that `step` only computes when they are first read, and at most once per step (any of `LAZY_FIELDS`).
+                The game keeps running in the meantime, so a lazy field describes the game when it is read rather
+                than when the step ended, and reading it after the next step or reset raises an error.
+                With any lazy fields, `step` returns the observation and info as `LazyDict`s.
+                Fields not listed (by default, all of them) are fetched eagerly, in the same round trip as the rest
+                of the observation.
+        """
         super().__init__()
 
         self.instance = instance
         self.task = task
         self.value_accrual_time = value_accrual_time
         self.error_penalty = error_penalty
+        unknown = set(lazy_fields) - set(LAZY_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown lazy fields {sorted(unknown)}, expected any of {LAZY_FIELDS}"
+            )
+        self.lazy_fields = frozenset(lazy_fields)
 
         # Define action space - a dictionary containing agent index and code
         self.action_space = spaces.Dict(
@@ -256,32 +277,50 @@ class FactorioGymEnv(gym.Env):
         # Track last message timestamp for each agent
         self.last_message_timestamps = {i: 0.0 for i in range(instance.num_agents)}
         self._last_production_flows = {}
+        # Incremented whenever the game may change, so that lazy fields can't be read from a later state
+        self._steps = 0
 
     def get_observation(
-        self, agent_idx: int = 0, response: Optional[Response] = None
+        self,
+        agent_idx: int = 0,
+        response: Optional[Response] = None,
+        observed: Optional[Dict[str, Any]] = None,
+        deferred: Collection[str] = (),
     ) -> Observation:
-        """Convert the current game state into a gym observation"""
+        """
+        Convert the current game state into a gym observation
+
+        Args:
+            agent_idx: The agent to observe the game as
+            response: The response to the last action, if any
+            observed: What `_observe` returned for this agent, if already fetched
+            deferred: Fields (`entities`, `serialized_functions`) to leave empty, for the caller to fill in lazily
+        """
         namespace = self.instance.namespaces[agent_idx]
+        # Fetch entities, inventory, research, ticks and flows in a single round trip
+        if observed is None:
+            observed = namespace._observe()
+
         # Get entity observations
-        entities = namespace.get_entities()
-        entity_obs = [str(e) for e in entities]
+        entity_obs = []
+        if "entities" not in deferred:
+            entity_obs = [EntityObservation(e) for e in observed["entities"]]
 
         # Get inventory observations
-        inventory_obs = namespace.inspect_inventory()
+        inventory_obs = observed["inventories"][agent_idx]
 
         # Get research observations
-        research_obs = namespace._save_research_state()
+        research_obs = observed["research"]
 
         # Get game info
         game_info = GameInfo(
-            tick=self.instance.get_elapsed_ticks(),
-            time=self.instance.get_elapsed_ticks() / 60,
+            tick=observed["elapsed_ticks"],
+            time=observed["elapsed_ticks"] / 60,
             speed=self.instance._speed,
         )
 
         # Get flows
-        flows = namespace._get_production_stats()
-        flows_obs = ProductionFlows.from_dict(flows)
+        flows_obs = ProductionFlows.from_dict(observed["production_stats"])
 
         # Get messages
         messages = namespace.get_messages()
@@ -313,10 +352,8 @@ class FactorioGymEnv(gym.Env):
 
         # Get serialized functions
         serialized_functions = []
-        for func in namespace.get_functions():
-            serialized_functions.append(
-                {"name": func.name, "pickled_function": pickle.dumps(func).hex()}
-            )
+        if "serialized_functions" not in deferred:
+            serialized_functions = _serialize_functions(namespace.get_functions())
 
         observation = Observation(
             raw_text=response.response if response else "",
@@ -357,6 +394,7 @@ class FactorioGymEnv(gym.Env):
         agent_idx = action["agent_idx"]
         code = action["code"]
         game_state_raw = action["game_state"]
+        self._steps += 1
         if game_state_raw:
             self.reset_instance(GameState.parse_raw(game_state_raw))
 
@@ -366,11 +404,14 @@ class FactorioGymEnv(gym.Env):
             start_production_flows = ProductionFlows.from_dict(
                 self._last_production_flows[agent_idx]
             )
+            initial_score, _ = namespace.score()
         else:
+            # Score and flows together, without the (expensive) entities and research
+            observed = namespace._observe(entities=False, research=False)
             start_production_flows = ProductionFlows.from_dict(
-                namespace._get_production_stats()
+                observed["production_stats"]
             )
-        initial_score, _ = namespace.score()
+            initial_score = observed["score"]
 
         # Execute the action
         score, eval_time, result = self.instance.eval(
@@ -385,14 +426,13 @@ class FactorioGymEnv(gym.Env):
             reward = -self.error_penalty
         else:
             # Wait for value accrual
-            time.sleep(self.value_accrual_time)
+            self.instance.wait(self.value_accrual_time)
             reward = score - initial_score
         reward = float(reward)  # Ensure reward is always a float
 
         # Get task verification if task exists
         task_response = task_success = None
         terminated = truncated = False
-        output_game_state = GameState.from_instance(self.instance)
         if self.task:
             # First get the raw verification
             task_success = self.task.verify(reward, self.instance, step_statistics={})
@@ -402,8 +442,15 @@ class FactorioGymEnv(gym.Env):
             )
             terminated = task_success.success
 
+        # Everything observed after the step comes from a single round trip, bar the lazy fields.
+        # It's taken after verify, which may wait out a holdout period first.
+        observed = namespace._observe(
+            entities="entities" not in self.lazy_fields,
+            entity_state="output_game_state" not in self.lazy_fields,
+        )
+
         # Get post-execution flows and calculate achievements
-        current_flows = ProductionFlows.from_dict(namespace._get_production_stats())
+        current_flows = ProductionFlows.from_dict(observed["production_stats"])
         achievements = get_achievements(
             start_production_flows.__dict__, current_flows.__dict__
         )
@@ -417,7 +464,7 @@ class FactorioGymEnv(gym.Env):
             score=reward,
             achievements=achievements,
             step=0,
-            ticks=self.instance.get_elapsed_ticks(),
+            ticks=observed["elapsed_ticks"],
             flows=start_production_flows.get_new_flows(current_flows),
             response=task_response if task_response else result,
             task=task_success if task_success else TaskResponse(success=False, meta={}),
@@ -426,21 +473,59 @@ class FactorioGymEnv(gym.Env):
         )
 
         # Get observation for the acting agent
-        observation = self.get_observation(agent_idx, response)
+        deferred = self.lazy_fields & {"entities", "serialized_functions"}
+        observation = self.get_observation(agent_idx, response, observed, deferred)
+        observation_dict = observation.to_dict()
+        if deferred:
+            observation_dict = LazyDict(observation_dict)
+        if "entities" in deferred:
+            observation_dict.defer(
+                "entities",
+                self._until_next_step(
+                    lambda: [EntityObservation(e) for e in namespace.get_entities()]
+                ),
+            )
+        if "serialized_functions" in deferred:
+            functions = namespace.get_functions()
+            observation_dict.defer(
+                "serialized_functions", lambda: _serialize_functions(functions)
+            )
 
         # Get additional info
         info = {
             "error_occurred": error_occurred,
             "result": result,
-            "ticks": self.instance.get_elapsed_ticks(),
+            "ticks": observed["elapsed_ticks"],
             "flows": response.flows,
             "agent_idx": agent_idx,
             "last_message_timestamp": self.last_message_timestamps[agent_idx],
             "task_verification": task_response,
-            "output_game_state": output_game_state,
         }
+        if "output_game_state" in self.lazy_fields:
+            info = LazyDict(info)
+            info.defer(
+                "output_game_state",
+                self._until_next_step(lambda: GameState.from_instance(self.instance)),
+            )
+        else:
+            info["output_game_state"] = GameState.from_observation(
+                self.instance, observed
+            )
 
-        return observation.to_dict(), reward, terminated, truncated, info
+        return observation_dict, reward, terminated, truncated, info
+
+    def _until_next_step(self, compute: Callable[[], Any]) -> Callable[[], Any]:
+        """Guard a lazy field that reads the game, so it fails rather than describe a later state"""
+        step = self._steps
+
+        def guarded():
+            if self._steps != step:
+                raise RuntimeError(
+                    "Lazy observation fields must be read before the next step or reset"
+                )
+            return compute()
+
+        return guarded
 
     def reset_instance(self, state: Optional[GameState] = None) -> None:
         """Reset the Factorio instance to a given state or initial state.
@@ -463,6 +548,7 @@ class FactorioGymEnv(gym.Env):
         if options is None:
             options = {}
         game_state = options.get("game_state")
+        self._steps += 1
         self.reset_instance(game_state)
 
         self.initial_score, _ = self.instance.namespaces[0].score()
@@ -476,3 +562,10 @@ class FactorioGymEnv(gym.Env):
     def close(self):
         """Clean up resources"""
         self.instance.cleanup()
+
+
+def _serialize_functions(functions) -> List[Dict[str, str]]:
+    return [
+        {"name": func.name, "pickled_function": pickle.dumps(func).hex()}
+        for func in functions
+    ]
@@ -9,6 +9,19 @@ from fle.agents import TaskResponse
 from fle.env.entities import Inventory
 
 
+class EntityObservation(str):
+    """The text of an entity in an observation, which also keeps the entity it describes, so that it can be formatted
+    from its fields instead of by parsing the text. It pickles as plain text."""
+
+    def __new__(cls, entity: Any):
+        observation = super().__new__(cls, str(entity))
+        observation.entity = entity
+        return observation
+
+    def __reduce__(self):
+        return str, (str(self),)
+
+
 @dataclass
 class GameInfo:
     """Represents game timing and speed information"""
@@ -32,7 +45,8 @@ class Observation:
     """Complete observation of the game state"""
 
     raw_text: str
-    entities: List[str]  # Changed from List[Union[Entity, EntityGroup]] to List[str]
+    # Changed from List[Union[Entity, EntityGroup]] to List[str] (see EntityObservation)
+    entities: List[str]
     inventory: Inventory
     research: ResearchState
     game_info: GameInfo
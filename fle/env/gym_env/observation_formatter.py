@@ -2,8 +2,15 @@ from dataclasses import dataclass
 import pickle
 import re
 
-from fle.env.gym_env.observation import Observation
-from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+from fle.env.entities import Dimensions, EntityCore, Position, TileDimensions
+from fle.env.game_types import Prototype
+from fle.env.gym_env.observation import EntityObservation, Observation
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_name_pattern = re.compile(r"\bname\s*=\s*'?([A-Za-z0-9_-]+)'?")
+_group_pattern = re.compile(r"^\s*([A-Za-z]+Group)\(")
 
 
 @dataclass
@@ -169,132 +176,180 @@ class BasicObservationFormatter:
 
         return "### Inventory\n" + "\n".join(item_strs)
 
+    # Formatted entities by their text, which includes the entity's name, position and state, so an entity that hasn't
+    # changed since the last step isn't formatted again
+    _entity_cache: Dict[str, Tuple[Optional[str], str]] = {}
+    max_cached_entities = 10000
+
+    @staticmethod
+    def clean_entity_string(entity_str: str) -> str:
+        """Clean and format an entity string for better readability"""
+        # Remove class references and unnecessary information
+        entity_str = entity_str.replace("class 'env.src.entities.", "")
+        entity_str = entity_str.replace("'>", "")
+
+        # Split into key-value pairs, being careful with nested structures
+        parts = []
+        current_part = []
+        bracket_level = 0
+        quote_level = 0
+
+        for char in entity_str:
+            if char == "[":
+                bracket_level += 1
+            elif char == "]":
+                bracket_level -= 1
+            elif char == "'":
+                quote_level = 1 - quote_level
+            elif char == "(":
+                bracket_level += 1
+            elif char == ")":
+                bracket_level -= 1
+
+            if char == " " and bracket_level == 0 and quote_level == 0:
+                if current_part:
+                    parts.append("".join(current_part))
+                    current_part = []
+            else:
+                current_part.append(char)
+
+        if current_part:
+            parts.append("".join(current_part))
+
+        # Process each part
+        formatted_parts = []
+        for part in parts:
+            if "=" in part:
+                key, value = part.split("=", 1)
+                key = key.strip()
+                value = value.strip()
+
+                # Clean up the value
+                if "Position" in value:
+                    # Extract x and y coordinates
+                    x_match = re.search(r"x=([\d.]+)", value)
+                    y_match = re.search(r"y=([\d.]+)", value)
+                    if x_match and y_match:
+                        x = float(x_match.group(1))
+                        y = float(y_match.group(1))
+                        value = f"({x:.1f}, {y:.1f})"
+                elif "Dimensions" in value:
+                    # Extract width and height
+                    w_match = re.search(r"width=([\d.]+)", value)
+                    h_match = re.search(r"height=([\d.]+)", value)
+                    if w_match and h_match:
+                        w = float(w_match.group(1))
+                        h = float(h_match.group(1))
+                        value = f"({w:.1f}, {h:.1f})"
+                elif "TileDimensions" in value:
+                    # Extract tile width and height
+                    w_match = re.search(r"tile_width=([\d.]+)", value)
+                    h_match = re.search(r"tile_height=([\d.]+)", value)
+                    if w_match and h_match:
+                        w = float(w_match.group(1))
+                        h = float(h_match.group(1))
+                        value = f"({w:.1f}, {h:.1f})"
+                elif "Prototype" in value:
+                    # Convert "<Prototype.Boiler: ...>" to "Prototype.Boiler"
+                    proto_match = re.search(r"<Prototype\.([^:>]+)[:>]?", value)
+                    if proto_match:
+                        value = f"Prototype.{proto_match.group(1)}"
+                    else:
+                        # Fallback: use the part after 'Prototype.' if present
+                        alt_match = re.search(r"Prototype\.([A-Za-z0-9_-]+)", value)
+                        if alt_match:
+                            value = f"Prototype.{alt_match.group(1)}"
+
+                # Format numbers consistently
+                if isinstance(value, str):
+                    # Try to convert to float if it's a number
+                    try:
+                        num = float(value)
+                        value = f"{num:.1f}"
+                    except ValueError:
+                        pass
+
+                # Remove any double commas
+                value = re.sub(r",\s*,", ",", value)
+
+                formatted_parts.append(f"{key}={value}")
+            else:
+                formatted_parts.append(part)
+
+        return ", ".join(formatted_parts)
+
     @staticmethod
-    def format_entities(entities: List[str]) -> str:
+    def format_entity_value(value: Any) -> str:
+        """Format a single entity field the same way `clean_entity_string` cleans it up"""
+        if isinstance(value, Position):
+            return f"({value.x:.1f}, {value.y:.1f})"
+        if isinstance(value, Dimensions):
+            return f"({value.width:.1f}, {value.height:.1f})"
+        if isinstance(value, TileDimensions):
+            return f"({value.tile_width:.1f}, {value.tile_height:.1f})"
+        if isinstance(value, Prototype):
+            return f"Prototype.{value.name}"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f"{value:.1f}"
+        return repr(value)
+
+    @classmethod
+    def format_entity(cls, entity: Union[str, EntityCore]) -> Tuple[Optional[str], str]:
+        """
+        Get the type of an entity and its formatted description.
+        Entities are formatted straight from their fields where possible, falling back to cleaning up their text (e.g.
+        for groups, or observations that only have the text).
+        """
+        if isinstance(entity, EntityObservation):
+            entity = entity.entity
+
+        if isinstance(entity, EntityCore) and type(entity).__str__ is BaseModel.__str__:
+            return entity.name, ", ".join(
+                f"{key}={cls.format_entity_value(value)}"
+                for key, value in entity.__repr_args__()
+                if key is not None
+            )
+
+        entity_str = str(entity)
+        # Extract entity type using regex (handles both quoted and unquoted values)
+        type_match = None
+        # Try to get name first
+        n = _name_pattern.search(entity_str)
+        if n:
+            type_match = n.group(1)
+        # Fallback: recognise special group objects like PipeGroup(...)
+        if not type_match:
+            g = _group_pattern.match(entity_str)
+            if g:
+                type_match = g.group(1)  # e.g., PipeGroup, ElectricityGroup
+
+        if not type_match:
+            return None, entity_str
+        return type_match, cls.clean_entity_string(entity_str)
+
+    @classmethod
+    def format_entities(cls, entities: List[Union[str, EntityCore]]) -> str:
         """Format entity information"""
         if not entities:
             return "### Entities\nNone found"
 
-        def clean_entity_string(entity_str: str) -> str:
-            """Clean and format an entity string for better readability"""
-            # Remove class references and unnecessary information
-            entity_str = entity_str.replace("class 'env.src.entities.", "")
-            entity_str = entity_str.replace("'>", "")
-
-            # Split into key-value pairs, being careful with nested structures
-            parts = []
-            current_part = []
-            bracket_level = 0
-            quote_level = 0
-
-            for char in entity_str:
-                if char == "[":
-                    bracket_level += 1
-                elif char == "]":
-                    bracket_level -= 1
-                elif char == "'":
-                    quote_level = 1 - quote_level
-                elif char == "(":
-                    bracket_level += 1
-                elif char == ")":
-                    bracket_level -= 1
-
-                if char == " " and bracket_level == 0 and quote_level == 0:
-                    if current_part:
-                        parts.append("".join(current_part))
-                        current_part = []
-                else:
-                    current_part.append(char)
-
-            if current_part:
-                parts.append("".join(current_part))
-
-            # Process each part
-            formatted_parts = []
-            for part in parts:
-                if "=" in part:
-                    key, value = part.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-
-                    # Clean up the value
-                    if "Position" in value:
-                        # Extract x and y coordinates
-                        x_match = re.search(r"x=([\d.]+)", value)
-                        y_match = re.search(r"y=([\d.]+)", value)
-                        if x_match and y_match:
-                            x = float(x_match.group(1))
-                            y = float(y_match.group(1))
-                            value = f"({x:.1f}, {y:.1f})"
-                    elif "Dimensions" in value:
-                        # Extract width and height
-                        w_match = re.search(r"width=([\d.]+)", value)
-                        h_match = re.search(r"height=([\d.]+)", value)
-                        if w_match and h_match:
-                            w = float(w_match.group(1))
-                            h = float(h_match.group(1))
-                            value = f"({w:.1f}, {h:.1f})"
-                    elif "TileDimensions" in value:
-                        # Extract tile width and height
-                        w_match = re.search(r"tile_width=([\d.]+)", value)
-                        h_match = re.search(r"tile_height=([\d.]+)", value)
-                        if w_match and h_match:
-                            w = float(w_match.group(1))
-                            h = float(h_match.group(1))
-                            value = f"({w:.1f}, {h:.1f})"
-                    elif "Prototype" in value:
-                        # Convert "<Prototype.Boiler: ...>" to "Prototype.Boiler"
-                        proto_match = re.search(r"<Prototype\.([^:>]+)[:>]?", value)
-                        if proto_match:
-                            value = f"Prototype.{proto_match.group(1)}"
-                        else:
-                            # Fallback: use the part after 'Prototype.' if present
-                            alt_match = re.search(r"Prototype\.([A-Za-z0-9_-]+)", value)
-                            if alt_match:
-                                value = f"Prototype.{alt_match.group(1)}"
-
-                    # Format numbers consistently
-                    if isinstance(value, str):
-                        # Try to convert to float if it's a number
-                        try:
-                            num = float(value)
-                            value = f"{num:.1f}"
-                        except ValueError:
-                            pass
-
-                    # Remove any double commas
-                    value = re.sub(r",\s*,", ",", value)
-
-                    formatted_parts.append(f"{key}={value}")
-                else:
-                    formatted_parts.append(part)
-
-            return ", ".join(formatted_parts)
+        if len(cls._entity_cache) > cls.max_cached_entities:
+            cls._entity_cache.clear()
 
         # Group entities by type
         entity_groups = {}
-        name_pattern = re.compile(r"\bname\s*=\s*'?([A-Za-z0-9_-]+)'?")
-        group_pattern = re.compile(r"^\s*([A-Za-z]+Group)\(")
-
-        for entity_str in entities:
-            # Extract entity type using regex (handles both quoted and unquoted values)
-            type_match = None
-            # Try to get name first
-            n = name_pattern.search(entity_str)
-            if n:
-                type_match = n.group(1)
-            # Fallback: recognise special group objects like PipeGroup(...)
-            if not type_match:
-                g = group_pattern.match(entity_str)
-                if g:
-                    type_match = g.group(1)  # e.g., PipeGroup, ElectricityGroup
-
-            if type_match:
-                if type_match not in entity_groups:
-                    entity_groups[type_match] = []
-                # Clean the entity string before adding to group
-                cleaned_str = clean_entity_string(entity_str)
-                entity_groups[type_match].append(cleaned_str)
+        for entity in entities:
+            entity_str = str(entity)
+            cached = cls._entity_cache.get(entity_str)
+            if cached is None:
+                cached = cls.format_entity(entity)
+                cls._entity_cache[entity_str] = cached
+            entity_type, cleaned_str = cached
+
+            if entity_type:
+                if entity_type not in entity_groups:
+                    entity_groups[entity_type] = []
+                entity_groups[entity_type].append(cleaned_str)
             else:
                 # Skip entities we cannot categorise but keep a console warning for debugging
                 print(
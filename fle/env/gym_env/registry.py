@@ -1,9 +1,11 @@
 import gym
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
 from fle.env.gym_env.environment import FactorioGymEnv
+from fle.env.gym_env.vector_env import FactorioVecEnv
 from fle.eval.tasks import TaskFactory
 from fle.env import FactorioInstance
 from fle.commons.cluster_ips import get_local_container_ips
@@ -123,8 +125,16 @@ class FactorioGymRegistry:
 _registry = FactorioGymRegistry()
 
 
-def make_factorio_env(env_spec: GymEnvironmentSpec) -> FactorioGymEnv:
-    """Factory function to create a Factorio gym environment"""
+def make_factorio_env(
+    env_spec: GymEnvironmentSpec, instance_idx: int = 0
+) -> FactorioGymEnv:
+    """
+    Factory function to create a Factorio gym environment
+
+    Args:
+        env_spec: The registered environment to create
+        instance_idx: Which of the local Factorio containers to run it on
+    """
 
     # Create task from the task definition
     task = TaskFactory.create_task(env_spec.task_config_path)
@@ -133,13 +143,15 @@ def make_factorio_env(env_spec: GymEnvironmentSpec) -> FactorioGymEnv:
     # Note: This assumes you have containers available
     try:
         ips, udp_ports, tcp_ports = get_local_container_ips()
-        if len(tcp_ports) == 0:
-            raise RuntimeError("No Factorio containers available")
+        if len(tcp_ports) <= instance_idx:
+            raise RuntimeError(
+                f"No Factorio container {instance_idx} available ({len(tcp_ports)} running)"
+            )
 
-        # Use the first available container
         instance = FactorioInstance(
-            address=ips[0],
-            container_id=0,  # Use first container
+            address=ips[instance_idx],
+            tcp_port=tcp_ports[instance_idx],
+            container_id=instance_idx,
             num_agents=env_spec.num_agents,
         )
         instance.speed(10)
@@ -194,6 +206,23 @@ def make(env_id: str, **kwargs) -> FactorioGymEnv:
     return gym.make(env_id, **kwargs)
 
 
+def make_vec(env_id: str, num_envs: int, **kwargs) -> FactorioVecEnv:
+    """
+    Create a vectorised environment running `env_id` on the first `num_envs` local Factorio containers.
+    The sub-environments are connected and set up concurrently, as task setup takes a while on each server.
+    """
+    with ThreadPoolExecutor(max_workers=num_envs) as executor:
+        envs = list(
+            executor.map(
+                lambda instance_idx: gym.make(
+                    env_id, instance_idx=instance_idx, **kwargs
+                ),
+                range(num_envs),
+            )
+        )
+    return FactorioVecEnv(envs)
+
+
 # Example usage and documentation
 if __name__ == "__main__":
     # List all available environments
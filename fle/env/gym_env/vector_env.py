@@ -0,0 +1,190 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import gym
+import numpy as np
+
+from fle.env.gym_env.action import Action
+from fle.env.utils.lazy_dict import LazyDict
+
+
+class FactorioVecEnv(gym.vector.VectorEnv):
+    """
+    Vectorised Factorio environment, stepping one FactorioGymEnv per Factorio server concurrently.
+
+    Each sub-environment runs in its own worker thread, so a batch of programs takes about as long as the
+    slowest of them rather than their sum. Sub-environments that terminate or truncate are reset straight
+    away, following the gym `VectorEnv` conventions: their last observation and info are returned in
+    `infos["final_observation"]` and `infos["final_info"]`.
+
+    Observations are returned as a dict of tuples (one element per sub-environment), and infos as a dict of
+    object arrays with `_<key>` masks. Both are only gathered when a key is read, so lazy fields stay lazy.
+
+    `*_wait` calls raise a TimeoutError if the sub-environments haven't all finished within `timeout` seconds
+    (`default_timeout` unless given). The ones still running have to finish before the next call can start.
+    """
+
+    def __init__(
+        self,
+        envs: Sequence[gym.Env],
+        max_workers: Optional[int] = None,
+        default_timeout: Optional[float] = 600,
+    ):
+        self.envs = list(envs)
+        if not self.envs:
+            raise ValueError("FactorioVecEnv needs at least one environment")
+
+        super().__init__(
+            num_envs=len(self.envs),
+            observation_space=self.envs[0].observation_space,
+            action_space=self.envs[0].action_space,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.num_envs,
+            thread_name_prefix="factorio-vec-env",
+        )
+        self._futures: List[Future] = []
+        self.default_timeout = default_timeout
+
+    def reset_async(
+        self,
+        seed: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        self._check_idle()
+        self._futures = [
+            self._executor.submit(env.reset, options=options) for env in self.envs
+        ]
+
+    def reset_wait(
+        self,
+        timeout: Optional[float] = None,
+        seed: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Tuple], Dict[str, np.ndarray]]:
+        observations, infos = zip(*self._collect(timeout))
+        return _batch_observations(observations), _batch_infos(infos)
+
+    def step_async(self, actions: Sequence[Action]):
+        """
+        Start executing one action in each sub-environment.
+        The `agent_idx` of each action refers to the agents of its own sub-environment.
+        """
+        self._check_idle()
+        if len(actions) != self.num_envs:
+            raise ValueError(
+                f"Expected {self.num_envs} actions, one per environment, got {len(actions)}"
+            )
+        self._futures = [
+            self._executor.submit(_step_and_autoreset, env, action)
+            for env, action in zip(self.envs, actions)
+        ]
+
+    def step_wait(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[Dict[str, Tuple], np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        observations, rewards, terminateds, truncateds, infos = zip(
+            *self._collect(timeout)
+        )
+        return (
+            _batch_observations(observations),
+            np.array(rewards, dtype=np.float64),
+            np.array(terminateds, dtype=np.bool_),
+            np.array(truncateds, dtype=np.bool_),
+            _batch_infos(infos),
+        )
+
+    def call_async(self, name: str, *args, **kwargs):
+        self._check_idle()
+        self._futures = [
+            self._executor.submit(_call, env, name, *args, **kwargs)
+            for env in self.envs
+        ]
+
+    def call_wait(self, timeout: Optional[float] = None) -> tuple:
+        return tuple(self._collect(timeout))
+
+    def set_attr(self, name: str, values: Any):
+        if not isinstance(values, (list, tuple)):
+            values = [values] * self.num_envs
+        if len(values) != self.num_envs:
+            raise ValueError(
+                f"Expected {self.num_envs} values, one per environment, got {len(values)}"
+            )
+        for env, value in zip(self.envs, values):
+            setattr(env, name, value)
+
+    def close_extras(self, **kwargs):
+        # Steps already running are left to finish, as closing an instance mid-step leaves its server busy
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        for env in self.envs:
+            env.close()
+
+    def _check_idle(self):
+        if any(not future.done() for future in self._futures):
+            raise RuntimeError(
+                "Previous call is still running, wait for it before starting another"
+            )
+
+    def _collect(self, timeout: Optional[float]) -> List[Any]:
+        futures, self._futures = self._futures, []
+        if not futures:
+            raise RuntimeError("Nothing to wait for, call reset_async/step_async first")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        _, running = wait(futures, timeout=timeout)
+        if running:
+            # Keep the futures, so that no new call starts while these environments are busy
+            self._futures = futures
+            stuck = [i for i, future in enumerate(futures) if future in running]
+            raise TimeoutError(
+                f"Environments {stuck} did not finish within {timeout} seconds"
+            )
+        return [future.result() for future in futures]
+
+
+def _step_and_autoreset(env: gym.Env, action: Action):
+    observation, reward, terminated, truncated, info = env.step(action)
+    if terminated or truncated:
+        # The lazy fields of the last step must be read before the reset changes the game under them
+        final_observation, final_info = dict(observation), dict(info)
+        observation, info = env.reset()
+        info = LazyDict(info)
+        info["final_observation"] = final_observation
+        info["final_info"] = final_info
+    return observation, reward, terminated, truncated, info
+
+
+def _call(env: gym.Env, name: str, *args, **kwargs):
+    attribute = getattr(env, name)
+    if callable(attribute):
+        return attribute(*args, **kwargs)
+    return attribute
+
+
+def _batch_observations(observations: Sequence[Dict[str, Any]]) -> LazyDict:
+    batched = LazyDict()
+    for key in observations[0].keys():
+        batched.defer(
+            key,
+            lambda key=key: tuple(observation[key] for observation in observations),
+        )
+    return batched
+
+
+def _batch_infos(infos: Sequence[Dict[str, Any]]) -> LazyDict:
+    def gather(key):
+        values = np.empty(len(infos), dtype=object)
+        for i, info in enumerate(infos):
+            if key in info:
+                values[i] = info[key]
+        return values
+
+    batched = LazyDict()
+    keys = dict.fromkeys(key for info in infos for key in info.keys())
+    for key in keys:
+        batched.defer(key, lambda key=key: gather(key))
+        batched[f"_{key}"] = np.array([key in info for info in infos])
+    return batched
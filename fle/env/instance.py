@@ -1,4 +1,6 @@
+import asyncio
 import atexit
+import base64
 import enum
 import functools
 import importlib
@@ -11,11 +13,14 @@ import threading
 import time
 import traceback
 import types
-from concurrent.futures import TimeoutError
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 from timeit import default_timer as timer
 from typing_extensions import Optional, List, Dict, Any, Tuple
 import uuid
+import zlib
+from collections import OrderedDict
 
 from dotenv import load_dotenv
 from slpp import slpp as lua
@@ -27,8 +32,10 @@ from fle.env.lua_manager import LuaScriptManager
 from fle.env.namespace import FactorioNamespace
 from fle.env.utils.rcon import _lua2python, _get_dir
 from fle.commons.models.research_state import ResearchState
-from factorio_rcon import RCONClient
-from fle.commons.models.game_state import GameState
+from fle.env.utils.pipelined_rcon import PipelinedRCONClient
+from fle.env.utils.deadline import abandonable, deadline
+from fle.env.utils.spatial_index import SpatialEntityIndex
+from fle.commons.models.game_state import GameState, encode_entities
 from fle.env.utils.controller_loader.system_prompt_generator import (
     SystemPromptGenerator,
 )
@@ -90,6 +97,15 @@ class FactorioTransaction:
 class FactorioInstance:
     namespace_class = FactorioNamespace
     _cleanup_registered = False  # Only register cleanup once per process
+    # How many ticks a captured game state is trusted for when resetting back to it. Machines keep running, so
+    # anything above 0 makes resets an approximation: contents and flows may have drifted from the state.
+    state_reuse_tick_tolerance = 0
+    # Snapshots stored in each server, by (address, tcp_port), shared by every instance connected to it
+    _snapshot_pools: Dict[Tuple[str, int], "OrderedDict[str, GameState]"] = {}
+    # How many snapshots each server keeps before the least recently restored are dropped
+    max_snapshots = 16
+    # Seconds past its timeout before `async_eval` gives up on a program that doesn't stop
+    eval_grace_period = 5
 
     def __init__(
         self,
@@ -101,6 +117,7 @@ class FactorioInstance:
         all_technologies_researched=True,
         peaceful=True,
         num_agents=1,
+        accelerated=False,
         **kwargs,
     ):
         self.id = str(uuid.uuid4())[:8]
@@ -110,10 +127,20 @@ class FactorioInstance:
         self.rcon_client, self.address = self.connect_to_server(address, tcp_port)
         self.all_technologies_researched = all_technologies_researched
         self.fast = fast
+        # Run sleeps and value accrual by advancing ticks at full speed, rather than waiting in real time
+        self.accelerated = accelerated
         self._speed = 1
         self._ticks_elapsed = 0
         self._is_initialised = False
 
+        # The game state we know the game holds, so that resets to it can be skipped or done as a delta
+        self._state_version = 0
+        self._tracked_state: Optional[GameState] = None
+        self._tracked_tick = 0
+        self._tracked_version = -1
+        # Entities found by the last unfiltered `get_entities`, shared by all tools and agents
+        self.entity_index = SpatialEntityIndex()
+
         self.peaceful = peaceful
         self.namespaces = [self.namespace_class(self, i) for i in range(num_agents)]
 
@@ -170,6 +197,10 @@ class FactorioInstance:
     def is_multiagent(self):
         return self.num_agents > 1
 
+    async def async_reset(self, game_state: Optional[GameState] = None):
+        """Like `reset`, but without blocking the event loop, so that many instances can reset at once"""
+        await asyncio.to_thread(self.reset, game_state)
+
     def reset(self, game_state: Optional[GameState] = None):
         # Reset the namespace (clear variables, functions etc)
         assert not game_state or len(game_state.inventories) == self.num_agents, (
@@ -195,16 +226,26 @@ class FactorioInstance:
                     )
                 )
         else:
-            # Reset the game instance with the correct player's inventory and messages if multiagent
-            self._reset(game_state.inventories)
-
-            # Load entities into the game
-            self.first_namespace._load_entity_state(
-                game_state.entities, decompress=True
-            )
+            current_state = self._get_tracked_game_state()
+            if current_state is not None and current_state.same_as(game_state):
+                # The game is already in this state - only the statistics need resetting
+                self.begin_transaction()
+                self.add_command(
+                    "/sc global.alerts = {}; global.actions.reset_production_stats()",
+                    raw=True,
+                )
+                self.execute_transaction()
+                self._reset_static_achievement_counters()
+            elif self._restore_snapshot(game_state):
+                # The game stored this state, and has reset to it in a single command
+                pass
+            else:
+                # Reset the game instance with the correct player's inventory and messages if multiagent
+                # and load the entities into the game
+                self._restore_entities(game_state, current_state)
 
-            # Load research state into the game
-            self.first_namespace._load_research_state(game_state.research)
+                # Load research state into the game
+                self.first_namespace._load_research_state(game_state.research)
 
             # Load messages for each agent
             if game_state.agent_messages:
@@ -229,6 +270,118 @@ class FactorioInstance:
         self.add_command("/sc rendering.clear()", raw=True)
         self.execute_transaction()
 
+        self.track_game_state(game_state)
+
+    def _restore_entities(
+        self, game_state: GameState, current_state: Optional[GameState] = None
+    ):
+        """
+        Load the entities of `game_state` into the game. If we know the game currently holds `current_state`,
+        only entities that differ between the two are removed and recreated.
+        """
+        if current_state is None:
+            self._reset(game_state.inventories)
+            self.first_namespace._load_entity_state(
+                game_state.entities, decompress=True
+            )
+            return
+
+        stale, missing = game_state.entity_changes(current_state)
+
+        self._reset(game_state.inventories, clear_entities=False)
+        if stale:
+            self.controllers["clear_entities"].remove(stale)
+        if missing:
+            self.first_namespace._load_entity_state(
+                encode_entities(missing), decompress=True
+            )
+
+    @property
+    def snapshots(self) -> "OrderedDict[str, GameState]":
+        """Snapshots stored in the server this instance is connected to, from least to most recently used"""
+        return FactorioInstance._snapshot_pools.setdefault(
+            (self.address, self.tcp_port), OrderedDict()
+        )
+
+    def add_snapshot(self, name: str, game_state: GameState):
+        """
+        Store `game_state` in the game as `name`, so that resetting to it is a single command (see `snapshots.lua`).
+        This is worth it for states that are reset to again and again, like the start of a task.
+        Each server keeps `max_snapshots`, dropping the least recently used beyond that.
+        """
+        from fle.env.tools.admin.load_research_state.client import raw_research_state
+
+        entities = b""
+        if game_state.entities:
+            entities = zlib.decompress(base64.b64decode(game_state.entities))
+        inventories = [
+            json.dumps(dict(inventory.items())).encode()
+            for inventory in game_state.inventories
+        ]
+        research = (
+            raw_research_state(game_state.research) if game_state.research else None
+        )
+        response = self.rcon_client.send_command(
+            "/sc rcon.print(global.actions.store_snapshot("
+            f"{lua.encode(name)}, {lua.encode(entities)}, {lua.encode(inventories)}, {lua.encode(research)}))"
+        )
+        if response != "ok":
+            raise Exception(f"Could not store snapshot {name}: {response}")
+
+        snapshots = self.snapshots
+        snapshots[name] = game_state
+        snapshots.move_to_end(name)
+        while len(snapshots) > self.max_snapshots:
+            dropped, _ = snapshots.popitem(last=False)
+            self.rcon_client.send_command(
+                f"/sc global.actions.drop_snapshot({lua.encode(dropped)})"
+            )
+
+    def _restore_snapshot(self, game_state: GameState) -> bool:
+        """Reset the game to `game_state` from a stored snapshot of it, if there is one"""
+        snapshots = self.snapshots
+        for name, snapshot in snapshots.items():
+            if snapshot is game_state or snapshot.same_as(game_state):
+                break
+        else:
+            return False
+
+        command = (
+            f"/sc rcon.print(global.actions.restore_snapshot({lua.encode(name)}, "
+            f"{lua.encode(self.all_technologies_researched)}))"
+        )
+        response = self.rcon_client.send_command(command)
+        if response == "missing":
+            # The server has lost it since (e.g. it was restarted), so store it again
+            self.add_snapshot(name, snapshot)
+            response = self.rcon_client.send_command(command)
+        if response != "ok":
+            raise Exception(f"Could not restore snapshot {name}: {response}")
+
+        snapshots.move_to_end(name)
+        return True
+
+    def get_tick(self) -> int:
+        response = self.rcon_client.send_command("/sc rcon.print(game.tick)")
+        return int(response) if response else 0
+
+    def track_game_state(self, game_state: Optional[GameState], tick: int = None):
+        """
+        Record that the game currently holds `game_state` (as of `tick`). This stays valid until a tool
+        that isn't read-only is called, a transaction is executed, or `state_reuse_tick_tolerance` ticks pass.
+        """
+        self._tracked_state = game_state
+        self._tracked_tick = tick if tick is not None else self.get_tick()
+        self._tracked_version = self._state_version
+
+    def _get_tracked_game_state(self) -> Optional[GameState]:
+        if self._tracked_state is None or self._tracked_version != self._state_version:
+            return None
+        if self.get_tick() - self._tracked_tick > self.state_reuse_tick_tolerance:
+            # Machines have been running, so entity contents may have moved on
+            return None
+        return self._tracked_state
+
     def set_inventory(self, inventory: Dict[str, Any], agent_idx: int = 0):
         self.begin_transaction()
         self.add_command("clear_inventory", agent_idx + 1)
@@ -253,6 +406,28 @@ class FactorioInstance:
     def get_speed(self):
         return self._speed
 
+    def advance_ticks(self, ticks: int) -> int:
+        """Advance the game by `ticks` ticks as fast as the server can run, blocking until done"""
+        return self.controllers["sleep"].advance_ticks(ticks)
+
+    def wait(self, seconds: float):
+        """
+        Let the game run for `seconds` of real time at the current game speed.
+        In accelerated mode the same number of ticks is advanced as fast as possible instead.
+        """
+        if self.accelerated:
+            self.advance_ticks(int(seconds * 60 * self._speed))
+        else:
+            time.sleep(seconds)
+
+    async def async_get_elapsed_ticks(self):
+        response = await self.rcon_client.async_send_command(
+            "/sc rcon.print(global.elapsed_ticks or 0)"
+        )
+        if not response:
+            return 0
+        return int(response)
+
     def get_elapsed_ticks(self):
         response = self.rcon_client.send_command(
             "/sc rcon.print(global.elapsed_ticks or 0)"
@@ -286,11 +461,13 @@ class FactorioInstance:
 
     def connect_to_server(self, address, tcp_port):
         try:
-            rcon_client = RCONClient(address, tcp_port, "factorio")  #'quai2eeha3Lae7v')
+            rcon_client = PipelinedRCONClient(
+                address, tcp_port, "factorio"
+            )  #'quai2eeha3Lae7v')
             address = address
         except ConnectionError as e:
             print(e)
-            rcon_client = RCONClient("localhost", tcp_port, "factorio")
+            rcon_client = PipelinedRCONClient("localhost", tcp_port, "factorio")
             address = "localhost"
 
         try:
@@ -333,6 +510,9 @@ class FactorioInstance:
                 except Exception as e:
                     print(f"Error in pre-tool hook for {tool_name}: {e}")
 
+                if not original_callable.read_only:
+                    self._state_version += 1
+
                 # Execute the original callable
                 result = original_callable(*args, **kwargs)
 
@@ -414,22 +594,62 @@ class FactorioInstance:
     def eval_with_error(self, expr, agent_idx=0, timeout=60):
         """Evaluate an expression with a timeout, and return the result without error handling"""
 
+        # SIGALRM can only be used on the main thread, but it is the only way to interrupt code that
+        # never yields to the interpreter (e.g. a tight loop inside a user-defined function).
+        # Elsewhere we rely on the cooperative deadline checked between statements and RCON calls.
+        use_alarm = threading.current_thread() is threading.main_thread()
+
         def handler(signum, frame):
             raise TimeoutError()
 
-        signal.signal(signal.SIGALRM, handler)
-        signal.alarm(timeout)
+        if use_alarm:
+            signal.signal(signal.SIGALRM, handler)
+            signal.alarm(timeout)
 
         try:
-            return self.namespaces[agent_idx].eval_with_timeout(expr)
+            with deadline(timeout):
+                return self.namespaces[agent_idx].eval_with_timeout(expr)
         finally:
-            signal.alarm(0)
+            if use_alarm:
+                signal.alarm(0)
+
+    async def async_eval(self, expr, agent_idx=0, timeout=60):
+        """
+        Like `eval`, but runs the program in a worker thread so that the event loop stays free.
+        SIGALRM isn't available off the main thread, so timeouts rely on the deadline checked in every loop and
+        RCON call. Code that never reaches a check (e.g. a blocking call into a C library) is given up on
+        `eval_grace_period` seconds after the timeout. Its daemon thread is left to finish on its own, but every
+        deadline check and RCON call it makes from then on fails, so it can't act on the game any more.
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        abandoned = threading.Event()
+
+        def resolve(outcome):
+            if not result.done():
+                result.set_result(outcome)
+
+        def run():
+            with abandonable(abandoned):
+                outcome = self.eval(expr, agent_idx, timeout)
+            try:
+                loop.call_soon_threadsafe(resolve, outcome)
+            except RuntimeError:
+                pass  # The event loop has already closed
+
+        # A thread of its own, so that an evaluation that never returns can't hold up later ones
+        threading.Thread(target=run, name="fle-eval", daemon=True).start()
+        try:
+            return await asyncio.wait_for(result, timeout + self.eval_grace_period)
+        except asyncio.TimeoutError:
+            abandoned.set()
+            return -1, "", "Error: Evaluation timed out"
 
     def eval(self, expr, agent_idx=0, timeout=60):
         "Evaluate several lines of input, returning the result of the last line with a timeout"
         try:
             return self.eval_with_error(expr, agent_idx, timeout)
-        except TimeoutError:
+        except (TimeoutError, FutureTimeoutError):
             return -1, "", "Error: Evaluation timed out"
         except Exception as e:
             message = e.args[0].replace("\\n", "")
@@ -623,7 +843,7 @@ class FactorioInstance:
         self.add_command("/sc global.elapsed_ticks = 0", raw=True)
         self.execute_transaction()
 
-    def _reset(self, inventories: List[Dict[str, Any]]):
+    def _reset(self, inventories: List[Dict[str, Any]], clear_entities: bool = True):
         self.begin_transaction()
         self.add_command(
             "/sc global.alerts = {}; game.reset_game_state(); global.actions.reset_production_stats(); global.actions.regenerate_resources(1)",
@@ -643,15 +863,25 @@ class FactorioInstance:
         self.add_command("/sc global.actions.clear_walking_queue()", raw=True)
         for i in range(self.num_agents):
             player_index = i + 1
-            self.add_command(
-                f"/sc global.actions.clear_entities({player_index})", raw=True
-            )
+            if clear_entities:
+                self.add_command(
+                    f"/sc global.actions.clear_entities({player_index})", raw=True
+                )
+            else:
+                # Keep the factory, but still empty the character for its new inventory
+                self.add_command(
+                    f"/sc global.agent_characters[{player_index}].clear_items_inside()",
+                    raw=True,
+                )
             inventory_items = {k: v for k, v in inventories[i].items()}
             inventory_items_json = json.dumps(inventory_items)
             self.add_command(
                 f"/sc global.actions.initialise_inventory({player_index}, '{inventory_items_json}')",
                 raw=True,
             )
+        if clear_entities:
+            # Start the resource index over along with the map, as `restore_snapshot` does
+            self.add_command("/sc resource_index.clear()", raw=True)
 
         if self.all_technologies_researched:
             self.add_command(
@@ -665,27 +895,35 @@ class FactorioInstance:
 
     def _execute_transaction(self) -> Dict[str, Any]:
         start = timer()
-        rcon_commands = {}
+        keys, futures = [], []
         for idx, (command, parameters, is_raw) in enumerate(
             self.current_transaction.get_commands()
         ):
-            if is_raw:
-                rcon_commands[f"{idx}_{command}"] = command
-            else:
-                script = self._get_command(
-                    command, parameters=parameters, measured=False
-                )
-                rcon_commands[f"{idx}_{command}"] = script
-
-        lua_responses = self.rcon_client.send_commands(rcon_commands)
+            keys.append(f"{idx}_{command}")
+            futures.append(self.submit(command, *parameters, raw=is_raw))
 
+        # All commands are already on the wire, so we only wait for the slowest reply
         results = {}
-        for command, response in lua_responses.items():
-            results[command] = _lua2python(command, response, start=start)
+        for key, future in zip(keys, futures):
+            results[key] = _lua2python(key, future.result(), start=start)
 
         self.current_transaction.clear()
         return results
 
+    def submit(self, command: str, *parameters, raw=False) -> Future:
+        """
+        Send a Lua command (or raw RCON command if `raw`) without waiting for the reply.
+        Independent commands submitted back-to-back are pipelined over the same connection,
+        and the replies are matched back to their futures by request id.
+        :return: A future resolving to the raw RCON response
+        """
+        script = (
+            command
+            if raw
+            else self._get_command(command, parameters=list(parameters), measured=False)
+        )
+        return self.rcon_client.submit(script)
+
     def begin_transaction(self):
         if not hasattr(self, "current_transaction"):
             self.current_transaction = FactorioTransaction()
@@ -700,6 +938,7 @@ class FactorioInstance:
         self.current_transaction.add_command(command, *parameters, raw=raw)
 
     def execute_transaction(self) -> Dict[str, Any]:
+        self._state_version += 1
         return self._execute_transaction()
 
     def initialise(self, fast=True):
@@ -724,6 +963,9 @@ class FactorioInstance:
             "recipe_fluid_connection_mappings",
             "serialize",
             "production_score",
+            "resource_index",
+            "pending_actions",
+            "snapshots",
             "initialise_inventory",
         ]
         if self.peaceful:
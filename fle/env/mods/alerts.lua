@@ -1,5 +1,48 @@
 global.alerts = {}
 
+-- Player entities are checked for issues in shards, so that each tick checks a slice of them and every entity is
+-- checked once per SCAN_INTERVAL ticks, rather than all of them on one tick.
+-- The list of entities is kept up to date from entity events. Entities that scripts create or destroy without raising
+-- an event are caught when the number of player entities changes, which rebuilds the list.
+-- Kept outside `global`, so it isn't written into saves; it is rebuilt after a reload.
+local SCAN_INTERVAL = 60
+
+alert_scanner = {
+    entities = nil,
+    next_index = 1,
+    -- Neighbour searches by entity unit number, cleared whenever entities are built or removed
+    neighbours = {}
+}
+
+-- Search around an entity with a search that only depends on what is built there (its key must include
+-- any positions it uses), reusing the result until entities are next built or removed
+local function find_near(entity, key, filter)
+    local unit_number = entity.unit_number
+    if not unit_number then
+        return entity.surface.find_entities_filtered(filter)
+    end
+
+    local cache = alert_scanner.neighbours[unit_number]
+    if not cache then
+        cache = {}
+        alert_scanner.neighbours[unit_number] = cache
+    end
+    local found = cache[key]
+    if found then
+        for _, neighbour in pairs(found) do
+            if not neighbour.valid then
+                found = nil
+                break
+            end
+        end
+    end
+    if not found then
+        found = entity.surface.find_entities_filtered(filter)
+        cache[key] = found
+    end
+    return found
+end
+
 -- Define a function to check if the transport belt is blocked
 function is_transport_belt_blocked(entity)
     if entity.type == "transport-belt" then
@@ -16,9 +59,9 @@ function is_transport_belt_blocked(entity)
         local dx = direction_vector[entity.direction].x
         local dy = direction_vector[entity.direction].y
         local next_position = {x = entity.position.x + dx, y = entity.position.y + dy}
-        local next_entities = entity.surface.find_entities_filtered {
+        local next_entities = find_near(entity, "next:" .. next_position.x .. "," .. next_position.y, {
             area = {{next_position.x - 0.5, next_position.y - 0.5}, {next_position.x + 0.5, next_position.y + 0.5}},
-        }
+        })
 
         local has_sink = false
         for _, next_entity in ipairs(next_entities) do
@@ -188,10 +231,10 @@ function has_output_space(entity)
             type = "item-entity"
         }
 
-        local destination_entity = entity.surface.find_entities_filtered{
+        local destination_entity = find_near(entity, "drop:" .. drop_position.x .. "," .. drop_position.y, {
             position = drop_position,
             type = {"container", "transport-belt", "underground-belt", "splitter"}
-        }[1]
+        })[1]
 
         if #items_on_ground >= 1 then
             return false
@@ -306,10 +349,11 @@ function get_issues(entity)
             local rounded_x = round_to_half(entity.drop_position.x)
             local rounded_y = round_to_half(entity.drop_position.y)
 
-            local destination_entity = entity.surface.find_entities_filtered{
-                position = entity.drop_position,
+            local drop_position = entity.drop_position
+            local destination_entity = find_near(entity, "drop_sink:" .. drop_position.x .. "," .. drop_position.y, {
+                position = drop_position,
                 type = {"container", "transport-belt", "underground-belt", "splitter", "furnace"}
-            }[1]
+            })[1]
 
             if destination_entity then
                 if destination_entity.type == "container" then
@@ -395,31 +439,88 @@ function round_to_half(number)
 end
 
 
--- Define a function to be called every tick
+local function count_player_entities()
+    local count = 0
+    for _, surface in pairs(game.surfaces) do
+        count = count + surface.count_entities_filtered({force = "player"})
+    end
+    return count
+end
+
+local function rebuild_entities()
+    local entities = {}
+    for _, surface in pairs(game.surfaces) do
+        for _, entity in pairs(surface.find_entities_filtered({force = "player"})) do
+            table.insert(entities, entity)
+        end
+    end
+    alert_scanner.entities = entities
+    alert_scanner.neighbours = {}
+end
+
+-- Drop entities that have gone, and rebuild the list if entities appeared or went without us seeing it
+local function start_scan()
+    local entities = {}
+    for _, entity in ipairs(alert_scanner.entities or {}) do
+        if entity.valid then
+            table.insert(entities, entity)
+        end
+    end
+    alert_scanner.entities = entities
+    if #entities ~= count_player_entities() then
+        rebuild_entities()
+    end
+    alert_scanner.next_index = 1
+end
+
+local function check_entity(entity, tick)
+    local position = entity.position
+    local entity_key = entity.name .. "_" .. position.x .. "_" .. position.y
+    -- An alert that is already raised is kept as it is until it is collected, so there is no need to check again
+    if global.alerts[entity_key] then
+        return
+    end
+
+    local issues = get_issues(entity)
+    if #issues > 0 then
+        local name = '"'..entity.name:gsub(" ", "_")..'"'
+        global.alerts[entity_key] = {
+            position = position,
+            issues = issues,
+            entity_name = name,
+            tick = tick
+        }
+    end
+end
+
+-- Define a function to be called every tick, checking the next shard of entities
 local function on_tick(event)
-    -- Run the check every 60 ticks (1 second)
-    if event.tick % 60 == 0 then
-        for _, surface in pairs(game.surfaces) do
-            local entities = surface.find_entities_filtered({force = "player"})
-            for _, entity in pairs(entities) do
-                local issues = get_issues(entity)
-
-                if #issues > 0 then
-                    local position = entity.position
-                    local entity_key = entity.name .. "_" .. position.x .. "_" .. position.y
-                    local name = '"'..entity.name:gsub(" ", "_")..'"'
-                    if not global.alerts[entity_key] then
-                        global.alerts[entity_key] = {
-                            position = position,
-                            issues = issues,
-                            entity_name = name,
-                            tick = event.tick
-                        }
-                    end
-                end
-            end
+    if not alert_scanner.entities or event.tick % SCAN_INTERVAL == 0 then
+        start_scan()
+    end
+
+    local entities = alert_scanner.entities
+    local shard_size = math.ceil(#entities / SCAN_INTERVAL)
+    local last_index = math.min(alert_scanner.next_index + shard_size - 1, #entities)
+    for i = alert_scanner.next_index, last_index do
+        local entity = entities[i]
+        if entity.valid then
+            check_entity(entity, event.tick)
         end
     end
+    alert_scanner.next_index = last_index + 1
+end
+
+entity_change_listeners.alerts = function(event)
+    alert_scanner.neighbours = {}
+    local entity = event.created_entity or event.entity
+    local built = event.name == defines.events.on_built_entity
+        or event.name == defines.events.on_robot_built_entity
+        or event.name == defines.events.script_raised_built
+        or event.name == defines.events.script_raised_revive
+    if built and alert_scanner.entities and entity and entity.valid and entity.force.name == "player" then
+        table.insert(alert_scanner.entities, entity)
+    end
 end
 
 -- Define a function to get alerts older than the number of seconds
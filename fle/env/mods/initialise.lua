@@ -399,6 +399,33 @@ script.on_event(defines.events.on_tick, function(event)
   end
 end)
 
+-- Count changes to the set of entities, so that clients can tell when cached entity searches are stale.
+-- Tools that create or destroy entities without raising events are tracked on the client instead.
+global.entity_change_counter = global.entity_change_counter or 0
+
+-- Only one handler can be registered per event, so other scripts follow these changes by adding a listener here
+entity_change_listeners = entity_change_listeners or {}
+
+local function on_entity_changed(event)
+  global.entity_change_counter = (global.entity_change_counter or 0) + 1
+  for _, listener in pairs(entity_change_listeners) do
+    listener(event)
+  end
+end
+
+script.on_event({
+  defines.events.on_built_entity,
+  defines.events.on_robot_built_entity,
+  defines.events.script_raised_built,
+  defines.events.script_raised_revive,
+  defines.events.on_player_mined_entity,
+  defines.events.on_robot_mined_entity,
+  defines.events.on_entity_died,
+  defines.events.script_raised_destroy,
+  defines.events.on_player_rotated_entity,
+  defines.events.on_entity_settings_pasted,
+}, on_entity_changed)
+
 function abort(message)
     local msg = tostring(message):gsub(" ", "_")
     rcon.print(msg)
@@ -0,0 +1,65 @@
+-- Actions that finish on a later tick when the game isn't in fast mode: walking, harvesting, crafting and placing.
+-- Each is given an id when it is queued, and whatever finishes it (usually a tick handler) marks it done, so clients
+-- can wait on one cheap status check instead of polling each tool's own queue with fixed sleeps.
+-- Only the latest action of each kind is kept per player, as starting another replaces the last one (e.g. a new walk
+-- clears the walking queue). Finishing a replaced action has no effect.
+
+global.pending_actions = global.pending_actions or {}
+global.next_pending_action_id = global.next_pending_action_id or 0
+
+pending_actions = {}
+
+-- Register an action of `kind` for the player, replacing their last one, and return its id
+function pending_actions.start(player_index, kind)
+    global.next_pending_action_id = global.next_pending_action_id + 1
+    local id = global.next_pending_action_id
+
+    local actions = global.pending_actions[player_index]
+    if not actions then
+        actions = {}
+        global.pending_actions[player_index] = actions
+    end
+    actions[kind] = {id = id, status = "pending", started = game.tick}
+    return id
+end
+
+-- Mark an action as "done", "failed" (with an error message) or "cancelled"
+function pending_actions.finish(id, status, message)
+    if not id then return end
+    for _, actions in pairs(global.pending_actions) do
+        for _, action in pairs(actions) do
+            if action.id == id then
+                if action.status == "pending" then
+                    action.status = status or "done"
+                    action.message = message
+                    action.finished = game.tick
+                end
+                return
+            end
+        end
+    end
+end
+
+-- The latest action of `kind` for the player, or nil if they haven't started one
+function pending_actions.get(player_index, kind)
+    local actions = global.pending_actions[player_index]
+    return actions and actions[kind]
+end
+
+-- Crafting finishes in the character's own crafting queue, which raises no event for characters without a player,
+-- so check on pending crafts every other tick
+if not global.fast then
+    script.on_nth_tick(2, function(event)
+        for player_index, actions in pairs(global.pending_actions) do
+            local action = actions.craft
+            if action and action.status == "pending" then
+                local character = global.agent_characters[player_index]
+                if not character or not character.valid then
+                    pending_actions.finish(action.id, "failed", "character is no longer valid")
+                elseif character.crafting_queue_size == 0 then
+                    pending_actions.finish(action.id, "done")
+                end
+            end
+        end
+    end)
+end
@@ -309,8 +309,34 @@ global.actions.generate_price_list = function(param)
   return price_list
 end
 
+--[[The price list only depends on the loaded prototypes, so we compute it once and keep it in global.
+    It is regenerated when the mod configuration changes, or after production_score.invalidate_price_list()]]
+local price_list_signature = function()
+  local parts = {}
+  for name, version in pairs (game.active_mods) do
+    table.insert(parts, name .. "@" .. version)
+  end
+  table.sort(parts)
+  table.insert(parts, #game.item_prototypes .. "/" .. #game.fluid_prototypes .. "/" .. #game.recipe_prototypes)
+  return table.concat(parts, ";")
+end
+
+production_score.get_price_list = function()
+  local signature = price_list_signature()
+  if not global.price_list or global.price_list_signature ~= signature then
+    global.price_list = global.actions.generate_price_list()
+    global.price_list_signature = signature
+  end
+  return global.price_list
+end
+
+production_score.invalidate_price_list = function()
+  global.price_list = nil
+  global.price_list_signature = nil
+end
+
 production_score.get_production_scores = function(price_list)
-  local price_list = price_list or global.actions.generate_price_list()
+  local price_list = price_list or production_score.get_price_list()
   local scores = {}
   for k, force in pairs (game.forces) do
     local score = 0
@@ -331,6 +357,9 @@ production_score.get_production_scores = function(price_list)
   return scores
 end
 
+-- Reloading this script may change how prices are computed, so never reuse a previous list
+production_score.invalidate_price_list()
+
 local scores = production_score.get_production_scores()
 if scores then
     global.initial_score = scores
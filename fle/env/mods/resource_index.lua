@@ -0,0 +1,273 @@
+-- Resources (ores, trees and water) indexed by surface and chunk, so that `nearest`, `get_resource_patch` and
+-- `nearest_buildable` don't rescan the map on every call.
+-- Each kind of resource in a chunk is indexed the first time a search reaches it. Resources that deplete or are
+-- mined are dropped as they go, and anything removed without an event is dropped when a search finds it missing.
+-- Nothing is added as it is created, so the index is cleared whenever resources are regenerated, the map is reset
+-- (`FactorioInstance._reset`, `restore_snapshot`) or `load_entity_state` recreates trees or resources.
+-- The index is kept outside `global`, so it isn't written into saves; it is rebuilt on demand after a reload.
+
+local CHUNK_SIZE = 32
+local floor = math.floor
+local ceil = math.ceil
+local abs = math.abs
+
+resource_index = {surfaces = {}}
+
+-- Buckets are named after the resource, except for trees ("wood") and water tiles ("water")
+local function kind_of(name)
+    if name == "wood" then
+        return "tree"
+    elseif name == "water" then
+        return "water"
+    end
+    return "resource"
+end
+
+local function position_key(x, y)
+    return x .. "," .. y
+end
+
+local function get_chunk(surface, cx, cy)
+    local chunks = resource_index.surfaces[surface.index]
+    if not chunks then
+        chunks = {}
+        resource_index.surfaces[surface.index] = chunks
+    end
+    local column = chunks[cx]
+    if not column then
+        column = {}
+        chunks[cx] = column
+    end
+    local chunk = column[cy]
+    if not chunk then
+        chunk = {indexed = {}, buckets = {}}
+        column[cy] = chunk
+    end
+    return chunk
+end
+
+local function add_entry(chunk, bucket_name, name, position)
+    local bucket = chunk.buckets[bucket_name]
+    if not bucket then
+        bucket = {}
+        chunk.buckets[bucket_name] = bucket
+    end
+    bucket[position_key(position.x, position.y)] = {name = name, x = position.x, y = position.y}
+end
+
+-- Get a chunk with this kind of resource indexed, indexing it first if needed.
+-- Chunks that haven't been generated yet have nothing to index (nil), and are indexed once they are.
+local function get_indexed_chunk(surface, cx, cy, kind)
+    local chunk = get_chunk(surface, cx, cy)
+    if chunk.indexed[kind] then
+        return chunk
+    end
+    if not surface.is_chunk_generated({cx, cy}) then
+        return nil
+    end
+
+    local area = {{cx * CHUNK_SIZE, cy * CHUNK_SIZE}, {(cx + 1) * CHUNK_SIZE, (cy + 1) * CHUNK_SIZE}}
+    if kind == "water" then
+        for _, tile in pairs(surface.find_tiles_filtered{area = area, name = "water"}) do
+            add_entry(chunk, "water", "water", tile.position)
+        end
+    else
+        for _, entity in pairs(surface.find_entities_filtered{area = area, type = kind}) do
+            -- The area search also catches entities from neighbouring chunks that overlap this one
+            local position = entity.position
+            if floor(position.x / CHUNK_SIZE) == cx and floor(position.y / CHUNK_SIZE) == cy then
+                add_entry(chunk, kind == "tree" and "wood" or entity.name, entity.name, position)
+            end
+        end
+    end
+    chunk.indexed[kind] = true
+    return chunk
+end
+
+local function get_bucket(surface, cx, cy, name)
+    local chunk = get_indexed_chunk(surface, cx, cy, kind_of(name))
+    return chunk and chunk.buckets[name]
+end
+
+local function remove_entry(surface, bucket_name, x, y)
+    local chunks = resource_index.surfaces[surface.index]
+    local column = chunks and chunks[floor(x / CHUNK_SIZE)]
+    local chunk = column and column[floor(y / CHUNK_SIZE)]
+    local bucket = chunk and chunk.buckets[bucket_name]
+    if bucket then
+        bucket[position_key(x, y)] = nil
+    end
+end
+
+local function is_present(surface, bucket_name, entry)
+    if bucket_name == "water" then
+        return surface.get_tile(entry.x, entry.y).name == "water"
+    end
+    local entity = surface.find_entity(entry.name, {entry.x, entry.y})
+    return entity ~= nil and entity.valid
+end
+
+-- The resource entry of `name` at exactly this position, if any
+local function entry_at(surface, name, x, y)
+    local bucket = get_bucket(surface, floor(x / CHUNK_SIZE), floor(y / CHUNK_SIZE), name)
+    return bucket and bucket[position_key(x, y)]
+end
+
+-- The chunks at Chebyshev distance `ring` from chunk (cx, cy)
+local function ring_chunks(cx, cy, ring)
+    if ring == 0 then
+        return {{cx, cy}}
+    end
+    local chunks = {}
+    for x = cx - ring, cx + ring do
+        table.insert(chunks, {x, cy - ring})
+        table.insert(chunks, {x, cy + ring})
+    end
+    for y = cy - ring + 1, cy + ring - 1 do
+        table.insert(chunks, {cx - ring, y})
+        table.insert(chunks, {cx + ring, y})
+    end
+    return chunks
+end
+
+-- Get the closest resource of this name (or "wood", or "water") to `position`, no more than `max_distance` tiles
+-- away along either axis. Chunks are searched in rings outward from the position, stopping as soon as no chunk
+-- further out can hold anything closer.
+-- Returns the entry ({name, x, y}), or nil if there is none.
+function resource_index.nearest(surface, position, name, max_distance)
+    local pcx, pcy = floor(position.x / CHUNK_SIZE), floor(position.y / CHUNK_SIZE)
+    local max_ring = ceil(max_distance / CHUNK_SIZE) + 1
+
+    while true do
+        local closest, closest_distance
+        for ring = 0, max_ring do
+            -- Every tile in this ring is at least (ring - 1) whole chunks away from the position
+            if closest and ring > 0 and ((ring - 1) * CHUNK_SIZE) ^ 2 > closest_distance then
+                break
+            end
+            for _, chunk in ipairs(ring_chunks(pcx, pcy, ring)) do
+                local bucket = get_bucket(surface, chunk[1], chunk[2], name)
+                if bucket then
+                    for _, entry in pairs(bucket) do
+                        local dx, dy = entry.x - position.x, entry.y - position.y
+                        if abs(dx) <= max_distance and abs(dy) <= max_distance then
+                            local distance = dx * dx + dy * dy
+                            if not closest or distance < closest_distance then
+                                closest, closest_distance = entry, distance
+                            end
+                        end
+                    end
+                end
+            end
+        end
+
+        if not closest or is_present(surface, name, closest) then
+            return closest
+        end
+        -- Removed without an event we saw, so drop it and search again
+        remove_entry(surface, name, closest.x, closest.y)
+    end
+end
+
+-- Get the connected patch of resource `name` closest to `position`, starting no more than `radius` tiles away.
+-- Neighbours are found in the index, and the (changing) amounts are read with a single search over the patch.
+-- Returns {tiles = list of entries, amount = total amount}, or nil if there is no such resource nearby.
+function resource_index.patch(surface, position, name, radius)
+    while true do
+        local start = resource_index.nearest(surface, position, name, radius)
+        if not start or (start.x - position.x) ^ 2 + (start.y - position.y) ^ 2 > radius ^ 2 then
+            return nil
+        end
+
+        local visited = {[position_key(start.x, start.y)] = start}
+        local tiles = {start}
+        local left, top, right, bottom = start.x, start.y, start.x, start.y
+        local head = 1
+        while head <= #tiles do
+            local tile = tiles[head]
+            head = head + 1
+            for dx = -1, 1 do
+                for dy = -1, 1 do
+                    local x, y = tile.x + dx, tile.y + dy
+                    local key = position_key(x, y)
+                    if not visited[key] then
+                        local neighbour = entry_at(surface, name, x, y)
+                        if neighbour then
+                            visited[key] = neighbour
+                            table.insert(tiles, neighbour)
+                            left, top = math.min(left, x), math.min(top, y)
+                            right, bottom = math.max(right, x), math.max(bottom, y)
+                        end
+                    end
+                end
+            end
+        end
+
+        local amounts = {}
+        for _, entity in pairs(surface.find_entities_filtered{
+            area = {{left - 0.5, top - 0.5}, {right + 0.5, bottom + 0.5}},
+            name = name
+        }) do
+            amounts[position_key(entity.position.x, entity.position.y)] = entity.amount
+        end
+
+        local amount, stale = 0, false
+        for key, tile in pairs(visited) do
+            if amounts[key] then
+                amount = amount + amounts[key]
+            else
+                remove_entry(surface, name, tile.x, tile.y)
+                stale = true
+            end
+        end
+        -- If any tile had gone, the patch may have been split, so walk it again
+        if not stale then
+            return {tiles = tiles, amount = amount}
+        end
+    end
+end
+
+-- Get every resource entity (not trees or water) in a chunk, as entries ({name, x, y})
+function resource_index.resources_in_chunk(surface, cx, cy)
+    local resources = {}
+    local chunk = get_indexed_chunk(surface, cx, cy, "resource")
+    if not chunk then
+        return resources
+    end
+    for name, bucket in pairs(chunk.buckets) do
+        if kind_of(name) == "resource" then
+            for _, entry in pairs(bucket) do
+                table.insert(resources, entry)
+            end
+        end
+    end
+    return resources
+end
+
+function resource_index.on_entity_removed(entity)
+    if entity.type == "resource" then
+        remove_entry(entity.surface, entity.name, entity.position.x, entity.position.y)
+    elseif entity.type == "tree" then
+        remove_entry(entity.surface, "wood", entity.position.x, entity.position.y)
+    end
+end
+
+-- Forget everything indexed on a surface (or all of them), e.g. after its resources have been regenerated
+function resource_index.clear(surface)
+    if surface then
+        resource_index.surfaces[surface.index] = nil
+    else
+        resource_index.surfaces = {}
+    end
+end
+
+script.on_event(defines.events.on_resource_depleted, function(event)
+    resource_index.on_entity_removed(event.entity)
+end)
+
+-- Mined trees and ores (built entities are never resources)
+entity_change_listeners.resource_index = function(event)
+    if event.entity and event.entity.valid then
+        resource_index.on_entity_removed(event.entity)
+    end
+end
@@ -0,0 +1,57 @@
+-- Game states kept in the game by name, so that resetting to one is a single command rather than resetting the game
+-- and then sending every entity, inventory and technology over again (see `FactorioInstance.add_snapshot`).
+-- Each snapshot holds the entity JSON accepted by `load_entity_state`, an inventory JSON per agent and, optionally,
+-- a research state accepted by `load_research_state`.
+
+global.snapshots = global.snapshots or {}
+
+global.actions.store_snapshot = function(name, entities_json, inventories_json, research_state)
+    global.snapshots[name] = {
+        entities = entities_json,
+        inventories = inventories_json,
+        research = research_state
+    }
+    return "ok"
+end
+
+global.actions.drop_snapshot = function(name)
+    global.snapshots[name] = nil
+    return "ok"
+end
+
+-- Reset the game the same way as `FactorioInstance._reset`, then load the snapshot into it.
+-- Returns "missing" if there is no snapshot by this name (e.g. the server was restarted).
+global.actions.restore_snapshot = function(name, research_all_technologies)
+    local snapshot = global.snapshots[name]
+    if not snapshot then
+        return "missing"
+    end
+
+    global.alerts = {}
+    game.reset_game_state()
+    global.actions.reset_production_stats()
+    global.actions.regenerate_resources(1)
+    for player_index, _ in pairs(snapshot.inventories) do
+        global.actions.regenerate_resources(player_index)
+    end
+
+    global.actions.clear_walking_queue()
+    for player_index, inventory_json in pairs(snapshot.inventories) do
+        global.actions.clear_entities(player_index)
+        global.actions.initialise_inventory(player_index, inventory_json)
+    end
+    resource_index.clear()
+    if research_all_technologies then
+        global.agent_characters[1].force.research_all_technologies()
+    end
+    global.crafted_items = {}
+    global.harvested_items = {}
+    global.elapsed_ticks = 0
+
+    global.actions.load_entity_state(1, snapshot.entities)
+    if snapshot.research then
+        global.actions.load_research_state(1, snapshot.research)
+    end
+    rendering.clear()
+    return "ok"
+end
@@ -1,4 +1,5 @@
 import ast
+import asyncio
 import builtins
 import inspect
 import math
@@ -16,6 +17,7 @@ from fle.env import entities as ent
 
 from fle.env.entities import Entity
 from fle.env.exceptions.hinting_name_error import get_value_type_str
+from fle.env.utils.deadline import CHECK_DEADLINE_BUILTIN, check_deadline, no_deadline
 from fle.env.game_types import (
     Prototype,
     RecipeName,
@@ -124,6 +126,10 @@ class FactorioNamespace:
         # We capture prints in order of them being run
         self.execution_trace = True
 
+        # Compile each top-level statement once and run it natively, rather than interpreting the program
+        # node by node. Turned off automatically when `capture_whole_output` is on.
+        self.compiled_execution = True
+
         # Available objects that the agent can interact with
         self.Prototype = Prototype
         self.Resource = Resource
@@ -253,6 +259,14 @@ class FactorioNamespace:
             ):
                 self[attr] = None
 
+    async def _async_call(self, tool_name: str, *args, **kwargs):
+        """
+        Call a tool (e.g. `await namespace._async_call("score")`) without blocking the event loop.
+        Tools issue several dependent RCON calls, so they run in a worker thread. Their commands
+        are pipelined over the shared connection, so calls on many instances overlap.
+        """
+        return await asyncio.to_thread(getattr(self, tool_name), *args, **kwargs)
+
     def __getitem__(self, key):
         if key not in dir(self) or key.startswith("__"):
             raise KeyError(key)
@@ -262,6 +276,11 @@ class FactorioNamespace:
         setattr(self, key, value)
 
     def log(self, *arg):
+        # Attribute the log to the line of the program being run, even when called from deep inside it
+        line = _program_line(traceback.walk_stack(sys._getframe()))
+        if line is not None:
+            self.line_value = line
+
         if self.execution_trace:
             self.log_counter += 1  # Increment counter
             self.logging_results[self.log_counter] = [
@@ -352,6 +371,58 @@ class FactorioNamespace:
                 node.body[subnode_idx] = self._change_print_to_log(subnode)
         return node
 
+    def execute_compiled(self, node, eval_dict, rebind: List[SerializableFunction]):
+        """
+        Compile a top-level statement and execute it natively, then persist the variables it bound.
+        Only the names the statement can bind are updated, rather than rescanning the whole namespace.
+        :param rebind: Persisted functions, whose globals need refreshing when variables change.
+        """
+        self.line_value = node.lineno
+        node = _ProgramInstrumenter().visit(node)
+
+        if isinstance(node, ast.FunctionDef):
+            # Keeps the annotation handling that SerializableFunction relies on
+            self.execute_node(node, eval_dict)
+            rebind.append(eval_dict[node.name])
+            for func in rebind:
+                func.bind(self)
+            return True
+
+        names = _bound_names(node)
+        expected_keys = len(eval_dict) + len(names - eval_dict.keys())
+
+        exec(compile(ast.Module([node], type_ignores=[]), "file", "exec"), eval_dict)
+
+        if len(eval_dict) > expected_keys:
+            # Something (e.g. a function using `global`) bound a name we couldn't see statically
+            names |= eval_dict.keys() - self.persistent_vars.keys() - set(dir(self))
+
+        persisted = False
+        for name in names:
+            if name not in eval_dict or name.startswith("_"):
+                continue
+            value = eval_dict[name]
+            if (
+                isinstance(value, types.FunctionType)
+                and value.__code__.co_filename == "file"
+            ):
+                # The program keeps calling the function itself, later programs the persisted copy
+                serialized_func = SerializableFunction(
+                    _with_argument_annotations(value), self
+                )
+                self.persistent_vars[name] = serialized_func
+                setattr(self, name, serialized_func)
+                rebind.append(serialized_func)
+            else:
+                self.persistent_vars[name] = wrap_for_serialization(value)
+                setattr(self, name, value)
+            persisted = True
+
+        if persisted:
+            for func in rebind:
+                func.bind(self)
+        return True
+
     def execute_body(self, body, eval_dict, parent_node=None):
         """Execute a sequence of nodes while maintaining line numbers"""
         for n in body:
@@ -405,6 +476,9 @@ class FactorioNamespace:
             except Exception:
                 return ast.unparse(annotation)
 
+        # Cooperative timeout check, so that long programs can be stopped on any thread
+        check_deadline()
+
         if hasattr(node, "lineno"):
             self.line_value = node.lineno
 
@@ -518,6 +592,8 @@ class FactorioNamespace:
 
             function_namespace = {**self.essential_builtins, **eval_dict}
 
+            # The function body runs natively, so check the deadline in its loops
+            node = _ProgramInstrumenter().visit(node)
             wrapped_node = ast.Module([node], type_ignores=[])
             compiled = compile(wrapped_node, "file", "exec")
             exec(compiled, function_namespace)
@@ -727,19 +803,35 @@ class FactorioNamespace:
         }
 
         # Bind any SerializableFunction objects
+        functions = []
         for key, value in eval_dict.items():
             if isinstance(value, SerializableFunction):
                 eval_dict[key] = value.bind(self)
+                functions.append(value)
+
+        compiled = self.compiled_execution and not self.capture_whole_output
 
         last_successful_state = None
 
         # Execute the expression
         for index, node in enumerate(tree.body):
             try:
+                if compiled:
+                    # Variables are only persisted once a statement succeeds, so there is nothing to roll back
+                    self.execute_compiled(node, eval_dict, rebind=functions)
+                    continue
+
                 node = self._change_print_to_log(node)
+                # Parts of the statement still run natively (e.g. comprehensions), so they need deadline checks too
+                node = _ProgramInstrumenter().visit(node)
                 self.execute_node(node, eval_dict)
                 last_successful_state = dict(self.persistent_vars)
             except (Exception, NameError) as e:
+                if compiled:
+                    line = _program_line(traceback.walk_tb(e.__traceback__))
+                    if line is not None:
+                        self.line_value = line
+
                 self._sequential_exception_count += 1
                 error_traceback = traceback.format_exc()
                 error_lines = self._extract_error_lines(expr, error_traceback)
@@ -782,7 +874,9 @@ class FactorioNamespace:
                 if isinstance(value, SerializableFunction):
                     eval_dict[key] = value.bind(self)
 
-        score, goal = self.score()
+        # The program may have stopped because it ran out of time, so don't hold scoring to its deadline
+        with no_deadline():
+            score, goal = self.score()
         result_output = parse_result_into_str(self.logging_results)
 
         # if had_error:
@@ -797,6 +891,102 @@ class FactorioNamespace:
         pass
 
 
+class _ProgramInstrumenter(ast.NodeTransformer):
+    """
+    Prepare a statement to be compiled as a whole: route `print` to `log`, and check the
+    evaluation deadline on every loop iteration, including in function bodies and comprehensions.
+    Statements are only instrumented once, so they can be visited again (e.g. by `execute_node`).
+    """
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id == "print":
+            node.func = ast.copy_location(ast.Name(id="log", ctx=ast.Load()), node.func)
+        return node
+
+    @staticmethod
+    def _check(node):
+        check = ast.Call(
+            func=ast.Name(id=CHECK_DEADLINE_BUILTIN, ctx=ast.Load()),
+            args=[],
+            keywords=[],
+        )
+        return ast.fix_missing_locations(ast.copy_location(check, node))
+
+    def _visit_loop(self, node):
+        self.generic_visit(node)
+        if not getattr(node, "_checks_deadline", False):
+            node.body.insert(0, ast.copy_location(ast.Expr(self._check(node)), node))
+            node._checks_deadline = True
+        return node
+
+    visit_For = visit_AsyncFor = visit_While = _visit_loop
+
+    def visit_comprehension(self, node):
+        self.generic_visit(node)
+        if not getattr(node, "_checks_deadline", False):
+            # `check_deadline()` returns None, so this condition never filters anything out
+            check = ast.Compare(
+                left=self._check(node.iter),
+                ops=[ast.Is()],
+                comparators=[ast.Constant(value=None)],
+            )
+            node.ifs.insert(
+                0, ast.fix_missing_locations(ast.copy_location(check, node.iter))
+            )
+            node._checks_deadline = True
+        return node
+
+
+def _bound_names(node) -> Set[str]:
+    """Names a statement binds in the global scope (nested functions and comprehensions have their own)"""
+    names = set()
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(current.name)
+            if current is not node:
+                continue
+        elif isinstance(
+            current,
+            (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp),
+        ):
+            continue
+        elif isinstance(current, ast.Name) and isinstance(
+            current.ctx, (ast.Store, ast.Del)
+        ):
+            names.add(current.id)
+        elif isinstance(current, (ast.Import, ast.ImportFrom)):
+            for alias in current.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(current, ast.ExceptHandler) and current.name:
+            names.add(current.name)
+        pending.extend(ast.iter_child_nodes(current))
+    return names
+
+
+def _program_line(frames) -> Optional[int]:
+    """Line of the agent's program being run, given the (frame, line) pairs of a stack or traceback"""
+    line = None
+    for frame, lineno in frames:
+        if frame.f_code.co_filename == "file" and frame.f_code.co_name == "<module>":
+            line = lineno
+    return line
+
+
+def _with_argument_annotations(func):
+    """Store a function's annotations the way SerializableFunction expects, as `execute_node` does"""
+    annotations = dict(func.__annotations__)
+    if "args" in annotations and annotations.keys() <= {"return", "args"}:
+        return func
+    func.__annotations__ = {
+        "return": annotations.pop("return", None),
+        "args": annotations,
+    }
+    return func
+
+
 def wrap_for_serialization(value):
     """Wrap values that need special serialization handling"""
     if isinstance(value, types.FunctionType):
@@ -0,0 +1,36 @@
+import time
+from typing import Dict, Optional
+
+from fle.env.tools import Tool
+
+
+class AwaitAction(Tool):
+    read_only = True
+
+    def __init__(self, connection, game_state):
+        super().__init__(connection, game_state)
+
+    def __call__(self, kind: str, timeout: Optional[float] = 60) -> Dict:
+        """
+        Wait for the latest action of `kind` ("walk", "harvest", "craft" or "place") that the player queued
+        outside of fast mode to finish.
+        The game marks actions as finished from the tick that finishes them (see `pending_actions.lua`),
+        so this checks once a tick instead of sleeping for a fixed time between checks of each tool's queue.
+        :param kind: Kind of action to wait for.
+        :param timeout: Seconds to wait for before giving up, or None to wait as long as it takes.
+        :return: The action's status - "done", "failed" (with a "message"), "cancelled", "none" if the player
+        hasn't queued one, or "pending" if it timed out - and how many ticks it took.
+        """
+        start = time.monotonic()
+        while True:
+            response, elapsed = self.execute(self.player_index, kind)
+            if not isinstance(response, dict) or not response:
+                raise Exception(
+                    f"Could not get the status of the last {kind}", response
+                )
+
+            if response.get("status") != "pending":
+                return response
+            if timeout is not None and time.monotonic() - start > timeout:
+                return response
+            time.sleep(1 / 60)
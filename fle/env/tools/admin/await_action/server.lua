@@ -0,0 +1,13 @@
+-- Get the status of the latest action of `kind` that the player queued, as recorded in `pending_actions`
+global.actions.await_action = function(player_index, kind)
+    local action = pending_actions.get(player_index, kind)
+    if not action then
+        return {status = "none"}
+    end
+    return {
+        id = action.id,
+        status = action.status,
+        message = action.message,
+        ticks = (action.finished or game.tick) - action.started
+    }
+end
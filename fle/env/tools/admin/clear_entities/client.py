@@ -1,3 +1,6 @@
+import json
+from typing import Dict, List
+
 from fle.env.tools.init import Init
 
 
@@ -8,3 +11,15 @@ class ClearEntities(Init):
     def __call__(self, *args, **kwargs):
         response, time_elapsed = self.execute(self.player_index)
         return response
+
+    def remove(self, entities: List[Dict]) -> int:
+        """
+        Remove specific entities, as serialised by `save_entity_state`, leaving everything else in place.
+        :param entities: Entity states to remove. Characters are never removed.
+        :return: Number of entities removed
+        """
+        # A long bracket string, so that the JSON doesn't need escaping for Lua
+        entities_json = f"[==[{json.dumps(entities)}]==]"
+        command = f"/sc rcon.print(global.actions.remove_entities({self.player_index}, {entities_json}))"
+        response = self.connection.rcon_client.send_command(command)
+        return int(response) if response else 0
@@ -62,4 +62,26 @@ global.actions.clear_entities = function(player_index)
     reset_character_inventory(player)
     player.force.reset()
     return 1
-end
\ No newline at end of file
+end
+
+-- Remove only the given entities (as serialised by save_entity_state), leaving the rest of the factory untouched
+global.actions.remove_entities = function(player_index, stored_json_data)
+    local player = global.agent_characters[player_index]
+    local surface = player.surface
+    local removed = 0
+
+    for _, state in pairs(game.json_to_table(stored_json_data)) do
+        local name = string.gsub(state.name, '"', '')
+        if name ~= "character" then
+            local position = {x = tonumber(state.position.x), y = tonumber(state.position.y)}
+            local entities = surface.find_entities_filtered{position = position, name = name}
+            for _, entity in pairs(entities) do
+                if entity.valid and entity ~= player then
+                    entity.destroy()
+                    removed = removed + 1
+                end
+            end
+        end
+    end
+    return removed
+end
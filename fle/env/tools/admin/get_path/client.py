@@ -1,4 +1,5 @@
 import json
+import time
 from typing import List
 
 from fle.env.entities import Position
@@ -40,6 +41,7 @@ class GetPath(Tool):
                 elif path["status"] == "busy":
                     raise Exception("Pathfinder is busy, try again later")
 
+                time.sleep(wait_time)
                 wait_time *= 2  # Exponential backoff
 
             raise Exception(f"Path request timed out after {max_attempts} attempts")
@@ -48,3 +50,18 @@ class GetPath(Tool):
             raise ConnectionError(
                 f"Could not get path with handle {path_handle}"
             ) from e
+
+    def wait_for(self, path_handle: int, timeout: float = 5) -> str:
+        """
+        Wait for a path request to finish, without fetching the path itself.
+        The game records the result as soon as the pathfinder finishes (`on_script_path_request_finished`),
+        so this checks once a tick instead of sleeping for a fixed time up front.
+        :return: "success", "not_found", "busy" or "invalid_request", or "pending" if it timed out.
+        """
+        command = f"/sc rcon.print(global.actions.get_path_status({int(path_handle)}))"
+        start = time.monotonic()
+        while True:
+            status = self.connection.rcon_client.send_command(command)
+            if status != "pending" or time.monotonic() - start > timeout:
+                return status
+            time.sleep(1 / 60)
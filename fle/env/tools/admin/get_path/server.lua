@@ -35,4 +35,19 @@ global.actions.get_path = function(request_id)
             waypoints = waypoints
         })
     end
-end
\ No newline at end of file
+end
+
+-- Get the status of a path request, as recorded by the on_script_path_request_finished handler
+global.actions.get_path_status = function(request_id)
+    if not global.path_requests or not global.path_requests[request_id] then
+        return "invalid_request"
+    end
+
+    local path = global.paths[request_id]
+    if path == nil then
+        return "pending"
+    elseif type(path) == "table" then
+        return "success"
+    end
+    return path
+end
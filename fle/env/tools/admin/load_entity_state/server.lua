@@ -11,6 +11,7 @@ global.actions.load_entity_state = function(player, stored_json_data)
     local created_entities = {}
     local stored_data = game.json_to_table(stored_json_data)
     local character_states = {}
+    local recreated_resources = false
     -- First pass: Create all non-character entities and store character states
     for _, state in pairs(stored_data) do
         local name = unquote_string(state.name)
@@ -56,6 +57,9 @@ global.actions.load_entity_state = function(player, stored_json_data)
                     entity = entity,
                     state = state
                 }
+                if entity.type == "tree" or entity.type == "resource" then
+                    recreated_resources = true
+                end
             end
         end
     end
@@ -285,5 +289,10 @@ global.actions.load_entity_state = function(player, stored_json_data)
         end
     end
 
+    -- Chunks that were already indexed won't see the new trees or resources otherwise
+    if recreated_resources then
+        resource_index.clear(surface)
+    end
+
     return true
 end
\ No newline at end of file
@@ -20,26 +20,28 @@ class LoadResearchState(Tool):
         if not state:
             return False
 
-        # Convert our dataclass structure back to raw dict for Lua
-        raw_state = {
-            "technologies": {
-                name: {
-                    "name": tech.name,
-                    "researched": tech.researched,
-                    "enabled": tech.enabled,
-                    # "visible": tech.visible,
-                    "level": tech.level,
-                    "research_unit_count": tech.research_unit_count,
-                    "research_unit_energy": tech.research_unit_energy,
-                    "prerequisites": tech.prerequisites,
-                    "ingredients": tech.ingredients,
-                }
-                for name, tech in state.technologies.items()
-            },
-            "current_research": state.current_research,
-            "research_progress": state.research_progress,
-            "research_queue": state.research_queue,
-            "progress": state.progress,
-        }
-
-        return self.execute(self.player_index, raw_state)
+        return self.execute(self.player_index, raw_research_state(state))
+
+
+def raw_research_state(state: ResearchState) -> dict:
+    """Convert our dataclass structure back to the raw dict that `load_research_state` takes"""
+    return {
+        "technologies": {
+            name: {
+                "name": tech.name,
+                "researched": tech.researched,
+                "enabled": tech.enabled,
+                # "visible": tech.visible,
+                "level": tech.level,
+                "research_unit_count": tech.research_unit_count,
+                "research_unit_energy": tech.research_unit_energy,
+                "prerequisites": tech.prerequisites,
+                "ingredients": tech.ingredients,
+            }
+            for name, tech in state.technologies.items()
+        },
+        "current_research": state.current_research,
+        "research_progress": state.research_progress,
+        "research_queue": state.research_queue,
+        "progress": state.progress,
+    }
@@ -0,0 +1,73 @@
+from typing import Any, Dict
+
+from fle.commons.models.game_state import encode_entities
+from fle.env import Inventory
+from fle.env.tools import Tool
+from fle.env.tools.admin.save_research_state.client import parse_research_state
+from fle.env.tools.agent.get_entities.client import GetEntities
+
+
+class Observe(Tool):
+    json_response = True
+    read_only = True
+
+    def __init__(self, connection, game_state):
+        super().__init__(connection, game_state)
+        self.get_entities = GetEntities(connection, game_state)
+
+    def __call__(
+        self,
+        entities: bool = True,
+        research: bool = True,
+        entity_state: bool = False,
+        radius: float = 1000,
+    ) -> Dict[str, Any]:
+        """
+        Get everything observed around a step in a single round trip, rather than calling each tool in turn.
+        :param entities: Include the entities around the player, as `get_entities` returns them.
+        :param research: Include the research state, as `_save_research_state` returns it.
+        :param entity_state: Include the entity state, as `_save_entity_state(compress=True, encode=True)` returns it.
+        :param radius: Radius around the player to get entities within.
+        :return: A dict of `tick`, `elapsed_ticks`, `score`, `production_stats` and `inventories` (of every agent),
+            plus `entities`, `research` and `entity_state` if requested.
+        """
+        response, _ = self.execute(
+            self.player_index, radius, entities, research, entity_state
+        )
+
+        if not isinstance(response, dict):
+            raise Exception("Could not observe the game", response)
+
+        score = response["score"]
+        if self.game_state.instance.initial_score:
+            score -= self.game_state.instance.initial_score
+
+        # Empty Lua tables don't say whether they are lists or dicts
+        production_stats = {
+            key: value or {} for key, value in response["production_stats"].items()
+        }
+        production_stats["crafted"] = production_stats.get("crafted") or []
+
+        observation = {
+            "tick": int(response["tick"]),
+            "elapsed_ticks": int(response["elapsed_ticks"]),
+            "score": score,
+            "production_stats": production_stats,
+            "inventories": [
+                Inventory(**inventory) if inventory else Inventory()
+                for inventory in response["inventories"]
+            ],
+        }
+
+        if entities:
+            observation["entities"] = self.get_entities._deserialize_entities(
+                response.get("entities") or [], set()
+            )
+        if research:
+            observation["research"] = parse_research_state(response["research"])
+        if entity_state:
+            observation["entity_state"] = encode_entities(
+                response.get("entity_state") or [], compress=True
+            )
+
+        return observation
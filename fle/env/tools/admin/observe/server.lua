@@ -0,0 +1,31 @@
+-- Everything the gym environment looks at around a step, gathered in a single call.
+-- Each part is only collected if asked for, as entities and the entity state are the expensive ones.
+global.actions.observe = function(player_index, radius, include_entities, include_research, include_entity_state)
+    local scores = production_score.get_production_scores()
+    local observation = {
+        tick = game.tick,
+        elapsed_ticks = global.elapsed_ticks or 0,
+        score = scores["player"] - global.initial_score["player"],
+        production_stats = global.actions.production_stats(player_index),
+        inventories = {}
+    }
+
+    for _, character in pairs(global.agent_characters) do
+        local inventory = character.get_main_inventory()
+        table.insert(observation.inventories, inventory and inventory.valid and inventory.get_contents() or {})
+    end
+
+    if include_entities then
+        observation.entities = global.actions.get_entities(player_index, radius, "[]")
+    end
+
+    if include_research then
+        observation.research = global.actions.save_research_state(player_index)
+    end
+
+    if include_entity_state then
+        observation.entity_state = global.actions.save_entity_state(player_index, 500, false, false, true)
+    end
+
+    return observation
+end
@@ -30,6 +30,7 @@ global.actions.regenerate_resources2 = function(player_index)
       end
     end
     surface.regenerate_entity(non_infinites)
+    resource_index.clear(surface)
     for _, e in pairs(surface.find_entities_filtered{type="mining-drill"}) do
         e.update_connections()
     end
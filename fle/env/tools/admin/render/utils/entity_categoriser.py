@@ -4,11 +4,32 @@ from fle.env.game_types import Prototype
 class EntityCategoriser:
     """Handles the categorisation of Factorio entities based on their types"""
 
+    # The category of a Prototype never changes, so it is only worked out once
+    _prototype_categories = {}
+
     @staticmethod
     def get_entity_category(entity) -> str:
         """
         Determine category for an entity based on its class hierarchy or Prototype
 
+        Args:
+            entity: An Entity instance, a dictionary with 'name' key, or a Prototype enum
+
+        Returns:
+            String representing the entity category
+        """
+        if isinstance(entity, Prototype):
+            categories = EntityCategoriser._prototype_categories
+            if entity not in categories:
+                categories[entity] = EntityCategoriser._categorise(entity)
+            return categories[entity]
+        return EntityCategoriser._categorise(entity)
+
+    @staticmethod
+    def _categorise(entity) -> str:
+        """
+        Determine category for an entity based on its class hierarchy or Prototype
+
         Args:
             entity: An Entity instance, a dictionary with 'name' key, or a Prototype enum
 
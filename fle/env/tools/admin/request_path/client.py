@@ -1,3 +1,5 @@
+from typing import List
+
 from fle.env.entities import Position
 from fle.env.tools import Tool
 
@@ -47,3 +49,47 @@ class RequestPath(Tool):
 
         except Exception as e:
             raise Exception(f"Could not get path from {start} to {finish}", e)
+
+    def request_many(
+        self,
+        start: Position,
+        finish: Position,
+        entity_sizes: List[float],
+        allow_paths_through_own_entities=False,
+        radius=0.5,
+        resolution=0,
+    ) -> List[int]:
+        """
+        Request paths from start to finish for several entity sizes at once, so that the game
+        computes them concurrently. The requests share a single round trip.
+        :return: The path handles, in the same order as `entity_sizes`.
+        """
+        assert isinstance(start, Position), "Start position must be a Position object"
+        assert isinstance(finish, Position), "Finish position must be a Position object"
+
+        start_x, start_y = self.get_position(start)
+        futures = [
+            self.submit(
+                self.player_index,
+                start_x,
+                start_y,
+                finish.x,
+                finish.y,
+                radius,
+                allow_paths_through_own_entities,
+                entity_size,
+                resolution,
+            )
+            for entity_size in entity_sizes
+        ]
+
+        path_handles = []
+        for future in futures:
+            response, _ = future.result()
+            if response is None or response == {} or isinstance(response, str):
+                raise Exception(
+                    f"Could not get path from {start} to {finish}",
+                    Exception("Could not request path (request_path)", response),
+                )
+            path_handles.append(int(response))
+        return path_handles
@@ -1,12 +1,13 @@
-import base64
-import json
-import zlib
 from typing import Dict, List, Union
 
+from fle.commons.models.game_state import encode_entities
 from fle.env.tools import Tool
 
 
 class SaveEntityState(Tool):
+    json_response = True
+    read_only = True
+
     def __init__(self, *args):
         super().__init__(*args)
 
@@ -39,10 +40,6 @@ class SaveEntityState(Tool):
         )
 
         if encode:
-            encoded_string = json.dumps(entities).encode()
-            if compress:
-                encoded_string = zlib.compress(encoded_string)
-
-            return base64.b64encode(encoded_string).decode()
+            return encode_entities(entities, compress)
 
         return entities
@@ -1,9 +1,13 @@
+from typing import Dict
+
 from fle.commons.models.research_state import ResearchState
 from fle.commons.models.technology_state import TechnologyState
 from fle.env.tools import Tool
 
 
 class SaveResearchState(Tool):
+    read_only = True
+
     def __init__(self, connection, game_state):
         super().__init__(connection, game_state)
 
@@ -20,35 +24,44 @@ class SaveResearchState(Tool):
             raise Exception(f"Could not save research state: {state}")
 
         try:
-            # Convert the raw state into our dataclass structure
-            technologies = {}
-            if "technologies" in state:
-                technologies = {
-                    name: TechnologyState(
-                        name=tech["name"],
-                        researched=tech["researched"],
-                        enabled=tech["enabled"],
-                        level=tech["level"],
-                        research_unit_count=tech["research_unit_count"],
-                        research_unit_energy=tech["research_unit_energy"],
-                        prerequisites=[x for x in tech["prerequisites"].values()],
-                        ingredients=[
-                            {x["name"]: x["amount"]}
-                            for x in tech["ingredients"].values()
-                        ],
-                    )
-                    for name, tech in state["technologies"].items()
-                }
-            return ResearchState(
-                technologies=technologies,
-                current_research=state["current_research"]
-                if "current_research" in state
-                else None,
-                research_progress=state["research_progress"],
-                research_queue=[x for x in state["research_queue"].values()],
-                progress=state["progress"] if "progress" in state else None,
-            )
-
+            return parse_research_state(state)
         except Exception as e:
             print(f"Could not save technologies: {e}")
             raise e
+
+
+def parse_research_state(state: Dict) -> ResearchState:
+    """
+    Convert the raw research state from the server into our dataclass structure.
+    Lists arrive as Lua-style dicts from `dump`, or as lists from `game.table_to_json`.
+    """
+
+    def values(collection):
+        return list(collection.values()) if isinstance(collection, dict) else collection
+
+    technologies = {}
+    if "technologies" in state:
+        technologies = {
+            name: TechnologyState(
+                name=tech["name"],
+                researched=tech["researched"],
+                enabled=tech["enabled"],
+                level=tech["level"],
+                research_unit_count=tech["research_unit_count"],
+                research_unit_energy=tech["research_unit_energy"],
+                prerequisites=values(tech["prerequisites"]),
+                ingredients=[
+                    {x["name"]: x["amount"]} for x in values(tech["ingredients"])
+                ],
+            )
+            for name, tech in state["technologies"].items()
+        }
+    return ResearchState(
+        technologies=technologies,
+        current_research=state["current_research"]
+        if "current_research" in state
+        else None,
+        research_progress=state["research_progress"],
+        research_queue=values(state["research_queue"]),
+        progress=state["progress"] if "progress" in state else None,
+    )
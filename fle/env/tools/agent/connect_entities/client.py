@@ -1,4 +1,3 @@
-from time import sleep
 from typing import Union, Optional, List, Dict, cast, Set
 
 import numpy
@@ -399,16 +398,19 @@ class ConnectEntities(Tool):
         """Attempt to find a path between two positions"""
         entity_sizes = [1.5, 1, 0.5, 0.25]  # Ordered from largest to smallest
 
-        for size in entity_sizes:
-            path_handle = self.request_path(
-                finish=target_pos,
-                start=source_pos,
-                allow_paths_through_own_entities=allow_paths_through_own,
-                radius=pathing_radius,
-                entity_size=size,
-            )
+        # Request all the sizes up front so the game paths them concurrently, then try them in order
+        path_handles = self.request_path.request_many(
+            finish=target_pos,
+            start=source_pos,
+            entity_sizes=entity_sizes,
+            allow_paths_through_own_entities=allow_paths_through_own,
+            radius=pathing_radius,
+        )
 
-            sleep(0.05)  # Allow pathing system time to compute
+        for i, path_handle in enumerate(path_handles):
+            status = self.get_path.wait_for(path_handle)
+            if status != "success" and i < len(path_handles) - 1:
+                continue
 
             response, _ = self.execute(
                 self.player_index,
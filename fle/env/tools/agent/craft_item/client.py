@@ -1,14 +1,12 @@
-from time import sleep
-
 from fle.env.game_types import Prototype
-from fle.env.tools.agent.inspect_inventory.client import InspectInventory
+from fle.env.tools.admin.await_action.client import AwaitAction
 from fle.env.tools import Tool
 
 
 class CraftItem(Tool):
     def __init__(self, connection, game_state):
         super().__init__(connection, game_state)
-        self.inspect_inventory = InspectInventory(connection, game_state)
+        self.await_action = AwaitAction(connection, game_state)
 
     def __call__(self, entity: Prototype, quantity: int = 1) -> int:
         """
@@ -23,10 +21,6 @@ class CraftItem(Tool):
         else:
             name = entity
 
-        count_in_inventory = 0
-        if not self.game_state.instance.fast:
-            count_in_inventory = self.inspect_inventory()[entity]
-
         success, elapsed = self.execute(self.player_index, name, quantity)
         if success != {} and isinstance(success, str):
             if success is None:
@@ -37,15 +31,8 @@ class CraftItem(Tool):
                 result = self.get_error_message(success)
                 raise Exception(result)
 
+        # If `fast` is turned off - we need to wait for the character to finish crafting
         if not self.game_state.instance.fast:
-            sleep(0.5)
-            attempt = 0
-            max_attempts = 10
-            while (
-                self.inspect_inventory()[entity] - count_in_inventory < quantity
-                and attempt < max_attempts
-            ):
-                sleep(0.5)
-                attempt += 1
+            self.await_action("craft")
 
         return success
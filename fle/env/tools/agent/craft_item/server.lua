@@ -202,6 +202,10 @@ global.actions.craft_item = function(player_index, entity, count)
     end
 
     if total_crafted >= count or (not global.fast and total_crafted > 0) then
+        if not global.fast then
+            -- Finished by the pending_actions tick handler once the character's crafting queue empties
+            pending_actions.start(player_index, "craft")
+        end
         return count
     elseif total_crafted > 0 then
         error(string.format("\"Successfully crafted %dx but failed to craft %dx %s because %s\"",
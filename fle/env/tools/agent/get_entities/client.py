@@ -1,7 +1,8 @@
+import json
 from time import sleep
-from typing import List, Set, Union
+from typing import Dict, List, Optional, Set, Union
 from fle.env.entities import Position, Entity, EntityGroup
-from fle.env.game_types import Prototype
+from fle.env.game_types import Prototype, prototype_by_name
 from fle.env.tools.agent.connect_entities.groupable_entities import (
     agglomerate_groupable_entities,
 )
@@ -9,6 +10,9 @@ from fle.env.tools import Tool
 
 
 class GetEntities(Tool):
+    json_response = True
+    read_only = True
+
     def __init__(self, connection, game_state):
         super().__init__(connection, game_state)
 
@@ -39,17 +43,48 @@ class GetEntities(Tool):
                 else "[]"
             )
 
-            # We need to add a small 50ms sleep to ensure that the entities have updated after previous actions
-            sleep(0.05)
-
-            if position is None:
-                response, time_elapsed = self.execute(
-                    self.player_index, radius, entity_names
-                )
-            else:
+            # Answer from the last entity search if nothing has changed in the game since. Tools that change the
+            # game bump the instance's state version, in which case the index can't answer and isn't probed.
+            index = self.game_state.instance.entity_index
+            names = {entity.value[0] for entity in entities}
+            response = None
+            if (
+                index.version is not None
+                and index.version[0] == self.game_state.instance._state_version
+            ):
+                version = self._get_version()
+                if version:
+                    area = self._search_area(version, position, radius)
+                    response = index.query(area, names, version["tick"], version["key"])
+
+            if response is None:
+                # We need to add a small 50ms sleep to ensure that the entities have updated after previous actions
+                sleep(0.05)
+
+                # The version comes back with the entities, to cache them without another round trip
                 response, time_elapsed = self.execute(
-                    self.player_index, radius, entity_names, position.x, position.y
+                    self.player_index,
+                    radius,
+                    entity_names,
+                    position.x if position else None,
+                    position.y if position else None,
+                    True,
                 )
+                if isinstance(response, dict) and "entities" in response:
+                    version = self._version_key(response["version"])
+                    response = response["entities"]
+                    if isinstance(response, dict):
+                        # An empty Lua table is encoded as an empty object
+                        response = list(response.values())
+
+                    # Only unfiltered searches are cached, so that any later query in the area can be answered
+                    if not entities:
+                        index.update(
+                            response,
+                            self._search_area(version, position, radius),
+                            version["tick"],
+                            version["key"],
+                        )
 
             if not response:
                 return []
@@ -59,107 +94,132 @@ class GetEntities(Tool):
             ):  # or (isinstance(response, dict) and not response):
                 raise Exception("Could not get entities", response)
 
-            entities_list = []
-            for raw_entity_data in response:
-                if isinstance(raw_entity_data, list):
-                    continue
-
-                entity_data = self.clean_response(raw_entity_data)
-                # Find the matching Prototype
-                matching_prototype = None
-                for prototype in Prototype:
-                    if prototype.value[0] == entity_data["name"].replace("_", "-"):
-                        matching_prototype = prototype
-                        break
-
-                if matching_prototype is None:
-                    print(
-                        f"Warning: No matching Prototype found for {entity_data['name']}"
-                    )
-                    continue
-
-                if matching_prototype not in entities and entities:
-                    continue
-                metaclass = matching_prototype.value[1]
-                while isinstance(metaclass, tuple):
-                    metaclass = metaclass[1]
-
-                # Process nested dictionaries (like inventories)
-                for key, value in entity_data.items():
-                    if isinstance(value, dict):
-                        entity_data[key] = self.process_nested_dict(value)
-
-                entity_data["prototype"] = prototype
-
-                # remove all empty values from the entity_data dictionary
-                entity_data = {
-                    k: v for k, v in entity_data.items() if v or isinstance(v, int)
-                }
-
-                try:
-                    entity = metaclass(**entity_data)
-                    entities_list.append(entity)
-                except Exception as e1:
-                    print(f"Could not create {entity_data['name']} object: {e1}")
-
-            # get all pipes into a list
-            pipes = [
-                entity
-                for entity in entities_list
-                if hasattr(entity, "prototype")
-                and entity.prototype in (Prototype.Pipe, Prototype.UndergroundPipe)
-            ]
-            group = agglomerate_groupable_entities(pipes)
-            [entities_list.remove(pipe) for pipe in pipes]
-            entities_list.extend(group)
-
-            poles = [
-                entity
-                for entity in entities_list
-                if hasattr(entity, "prototype")
-                and entity.prototype
-                in (
-                    Prototype.SmallElectricPole,
-                    Prototype.BigElectricPole,
-                    Prototype.MediumElectricPole,
-                )
-            ]
-            group = agglomerate_groupable_entities(poles)
-            [entities_list.remove(pole) for pole in poles]
-            entities_list.extend(group)
-
-            walls = [
-                entity
-                for entity in entities_list
-                if hasattr(entity, "prototype")
-                and entity.prototype == Prototype.StoneWall
-            ]
-            group = agglomerate_groupable_entities(walls)
-            [entities_list.remove(wall) for wall in walls]
-            entities_list.extend(group)
-
-            belt_types = (
-                Prototype.TransportBelt,
-                Prototype.FastTransportBelt,
-                Prototype.ExpressTransportBelt,
-                Prototype.UndergroundBelt,
-                Prototype.FastUndergroundBelt,
-                Prototype.ExpressUndergroundBelt,
-            )
-            belts = [
-                entity
-                for entity in entities_list
-                if hasattr(entity, "prototype") and entity.prototype in belt_types
-            ]
-            group = agglomerate_groupable_entities(belts)
-            [entities_list.remove(belt) for belt in belts]
-            entities_list.extend(group)
-
-            return entities_list
+            return self._deserialize_entities(response, entities)
 
         except Exception as e:
             raise Exception(f"Error in GetEntities: {e}")
 
+    def _deserialize_entities(
+        self, response: List[Dict], entities: Set[Prototype]
+    ) -> List[Union[Entity, EntityGroup]]:
+        """Turn the raw entities returned by the server into Entity objects, grouping pipes, poles, walls and belts"""
+        entities_list = []
+        for raw_entity_data in response:
+            if isinstance(raw_entity_data, list):
+                continue
+
+            entity_data = self.clean_response(raw_entity_data)
+            matching_prototype = prototype_by_name.get(
+                entity_data["name"].replace("_", "-")
+            )
+            if matching_prototype is None:
+                print(f"Warning: No matching Prototype found for {entity_data['name']}")
+                continue
+
+            if matching_prototype not in entities and entities:
+                continue
+            metaclass = matching_prototype.value[1]
+            while isinstance(metaclass, tuple):
+                metaclass = metaclass[1]
+
+            # Process nested dictionaries (like inventories)
+            for key, value in entity_data.items():
+                if isinstance(value, dict):
+                    entity_data[key] = self.process_nested_dict(value)
+
+            entity_data["prototype"] = matching_prototype
+
+            # remove all empty values from the entity_data dictionary
+            entity_data = {
+                k: v for k, v in entity_data.items() if v or isinstance(v, int)
+            }
+
+            try:
+                entity = metaclass(**entity_data)
+                entities_list.append(entity)
+            except Exception as e1:
+                print(f"Could not create {entity_data['name']} object: {e1}")
+
+        # get all pipes into a list
+        pipes = [
+            entity
+            for entity in entities_list
+            if hasattr(entity, "prototype")
+            and entity.prototype in (Prototype.Pipe, Prototype.UndergroundPipe)
+        ]
+        group = agglomerate_groupable_entities(pipes)
+        entities_list = _without(entities_list, pipes)
+        entities_list.extend(group)
+
+        poles = [
+            entity
+            for entity in entities_list
+            if hasattr(entity, "prototype")
+            and entity.prototype
+            in (
+                Prototype.SmallElectricPole,
+                Prototype.BigElectricPole,
+                Prototype.MediumElectricPole,
+            )
+        ]
+        group = agglomerate_groupable_entities(poles)
+        entities_list = _without(entities_list, poles)
+        entities_list.extend(group)
+
+        walls = [
+            entity
+            for entity in entities_list
+            if hasattr(entity, "prototype") and entity.prototype == Prototype.StoneWall
+        ]
+        group = agglomerate_groupable_entities(walls)
+        entities_list = _without(entities_list, walls)
+        entities_list.extend(group)
+
+        belt_types = (
+            Prototype.TransportBelt,
+            Prototype.FastTransportBelt,
+            Prototype.ExpressTransportBelt,
+            Prototype.UndergroundBelt,
+            Prototype.FastUndergroundBelt,
+            Prototype.ExpressUndergroundBelt,
+        )
+        belts = [
+            entity
+            for entity in entities_list
+            if hasattr(entity, "prototype") and entity.prototype in belt_types
+        ]
+        group = agglomerate_groupable_entities(belts)
+        entities_list = _without(entities_list, belts)
+        entities_list.extend(group)
+
+        return entities_list
+
+    def _get_version(self) -> Optional[Dict]:
+        """Get the current tick, entity change count and player position, to validate the entity index"""
+        response = self.connection.rcon_client.send_command(
+            f"/sc rcon.print(game.table_to_json(global.actions.get_entities_version({self.player_index})))"
+        )
+        try:
+            return self._version_key(json.loads(response))
+        except (TypeError, ValueError):
+            return None
+
+    def _version_key(self, version: Dict) -> Dict:
+        # Tools that change the game without raising events bump the instance's state version instead
+        version["key"] = (self.game_state.instance._state_version, version["changes"])
+        return version
+
+    @staticmethod
+    def _search_area(version: Dict, position: Optional[Position], radius: float):
+        """The area searched around `position`, or around the player if there is none"""
+        center = position or Position(x=version["x"], y=version["y"])
+        return (
+            center.x - radius,
+            center.y - radius,
+            center.x + radius,
+            center.y + radius,
+        )
+
     def process_nested_dict(self, nested_dict):
         """Helper method to process nested dictionaries"""
         if isinstance(nested_dict, dict):
@@ -173,3 +233,9 @@ class GetEntities(Tool):
                     for key, value in nested_dict.items()
                 }
         return nested_dict
+
+
+def _without(entities_list: List, grouped: List) -> List:
+    """Remove the grouped entities from the list, by identity rather than (slow, field-by-field) equality"""
+    grouped_ids = {id(entity) for entity in grouped}
+    return [entity for entity in entities_list if id(entity) not in grouped_ids]
@@ -1,4 +1,5 @@
-global.actions.get_entities = function(player_index, radius, entity_names_json, position_x, position_y)
+-- With `with_version`, the result also carries `get_entities_version`, so the client can cache it without asking again
+global.actions.get_entities = function(player_index, radius, entity_names_json, position_x, position_y, with_version)
     local player = global.agent_characters[player_index]
     local position
     if position_x and position_y then
@@ -33,5 +34,19 @@ global.actions.get_entities = function(player_index, radius, entity_names_json,
             table.insert(result, serialized)
         end
     end
-    return dump(result)
-end
\ No newline at end of file
+    if with_version then
+        return {entities = result, version = global.actions.get_entities_version(player_index)}
+    end
+    return result
+end
+
+-- Everything the client needs to decide whether its cached entity search is still valid
+global.actions.get_entities_version = function(player_index)
+    local player = global.agent_characters[player_index]
+    return {
+        tick = game.tick,
+        changes = global.entity_change_counter or 0,
+        x = player.position.x,
+        y = player.position.y
+    }
+end
@@ -8,6 +8,8 @@ from fle.env.tools import Tool
 
 
 class GetEntity(Tool):
+    read_only = True
+
     def __init__(self, connection, game_state):
         super().__init__(connection, game_state)
         self.get_entities = GetEntities(connection, game_state)
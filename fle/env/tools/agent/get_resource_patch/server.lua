@@ -68,36 +68,16 @@ global.actions.get_resource_patch = function(player_index, resource, x, y, radiu
         render_box(bounding_box)
         return {bounding_box = bounding_box, size = total_wood}
     else
-        local resource_entities = surface.find_entities_filtered{position = position, name = resource, radius = radius}
-        if #resource_entities == 0 then
+        -- The patch is walked through the resource index, rather than searching around every tile of it
+        local patch = resource_index.patch(surface, position, resource, radius)
+        if not patch then
             error("\"No resource of type " .. resource .. " at the specified location.\"")
         end
 
-        -- Recursive function to explore all connected resource entities
-        local function explore_resource_patch(entity, visited)
-            local key = entity.position.x .. "," .. entity.position.y
-            if visited[key] then
-                return 0
-            end
-            visited[key] = true
-            expand_bounding_box(bounding_box, entity.position)
-            local resource_count = entity.amount
-
-            local neighbors = surface.find_entities_filtered{
-                area = {{entity.position.x - 1, entity.position.y - 1}, {entity.position.x + 1, entity.position.y + 1}},
-                type = "resource",
-                name = resource
-            }
-            for _, neighbor in pairs(neighbors) do
-                if neighbor ~= entity then
-                    resource_count = resource_count + explore_resource_patch(neighbor, visited)
-                end
-            end
-            return resource_count
+        for _, tile in pairs(patch.tiles) do
+            expand_bounding_box(bounding_box, tile)
         end
-
-        local visited = {}
-        local total_resource = explore_resource_patch(resource_entities[1], visited)
+        local total_resource = patch.amount
 
         render_box(bounding_box)
         return {bounding_box = bounding_box, size = total_resource}
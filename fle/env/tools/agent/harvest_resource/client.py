@@ -1,7 +1,6 @@
-from time import sleep
-
 from fle.env.entities import Position
 from fle.env.game_types import Resource
+from fle.env.tools.admin.await_action.client import AwaitAction
 from fle.env.tools.agent.get_entity.client import GetEntity
 from fle.env.tools.agent.move_to.client import MoveTo
 from fle.env.tools.agent.nearest.client import Nearest
@@ -14,6 +13,7 @@ class HarvestResource(Tool):
         self.move_to = MoveTo(connection, game_state)
         self.nearest = Nearest(connection, game_state)
         self.get_entity = GetEntity(connection, game_state)
+        self.await_action = AwaitAction(connection, game_state)
 
     def __call__(self, position: Position, quantity=1, radius=10) -> int:
         """
@@ -44,18 +44,9 @@ class HarvestResource(Tool):
             msg = response.split(":")[-1].strip()
             raise Exception(f"Could not harvest. {msg}")
 
-        # If `fast` is turned off - we need to long poll the game state to ensure the player has moved
+        # If `fast` is turned off - we need to wait for any queued mining to finish
         if not self.game_state.instance.fast:
-            remaining_steps = self.connection.rcon_client.send_command(
-                f"/silent-command rcon.print(global.actions.get_harvest_queue_length({self.player_index}))"
-            )
-            attempt = 0
-            max_attempts = 10
-            while remaining_steps != "0" and attempt < max_attempts:
-                sleep(0.5)
-                remaining_steps = self.connection.rcon_client.send_command(
-                    f"/silent-command rcon.print(global.actions.get_harvest_queue_length({self.player_index}))"
-                )
+            self.await_action("harvest")
 
             max_attempts = 50
             attempt = 0
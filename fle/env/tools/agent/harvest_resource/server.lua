@@ -115,6 +115,7 @@ script.on_nth_tick(15, function(event)
         if queue.total_yield >= queue.target_yield then
             -- Remove this player's queue
             global.harvest_queues[player_index] = nil
+            pending_actions.finish(queue.action_id, "done")
             goto continue
         end
 
@@ -134,6 +135,7 @@ script.on_nth_tick(15, function(event)
             if not next_entity then
                 -- No more entities left
                 global.harvest_queues[player_index] = nil
+                pending_actions.finish(queue.action_id, "done")
                 goto continue
             end
 
@@ -301,6 +303,9 @@ local function initialize_harvest_queue(player_index, position, target_yield)
    if not global.harvest_queues then
        global.harvest_queues = {}
    end
+   if global.harvest_queues[player_index] then
+       pending_actions.finish(global.harvest_queues[player_index].action_id, "cancelled")
+   end
 
    global.harvest_queues[player_index] = {
        entities = {},
@@ -308,7 +313,8 @@ local function initialize_harvest_queue(player_index, position, target_yield)
        total_mined = 0,
        total_yield = 0,
        current_mining = nil,
-       target_yield = target_yield
+       target_yield = target_yield,
+       action_id = pending_actions.start(player_index, "harvest")
    }
 
    return global.harvest_queues[player_index]
@@ -588,6 +594,7 @@ end
 
 global.actions.clear_harvest_queue = function(player_index)
     if global.harvest_queues and global.harvest_queues[player_index] then
+        pending_actions.finish(global.harvest_queues[player_index].action_id, "cancelled")
         global.harvest_queues[player_index] = nil
     end
 end
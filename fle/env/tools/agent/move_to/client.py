@@ -1,9 +1,9 @@
 import math
-from time import sleep
 
 from fle.env.entities import Position
 from fle.env.instance import NONE
 from fle.env.game_types import Prototype
+from fle.env.tools.admin.await_action.client import AwaitAction
 from fle.env.tools.admin.get_path.client import GetPath
 from fle.env.tools.admin.request_path.client import RequestPath
 from fle.env.tools import Tool
@@ -16,6 +16,7 @@ class MoveTo(Tool):
         # self.observe = ObserveAll(connection, game_state)
         self.request_path = RequestPath(connection, game_state)
         self.get_path = GetPath(connection, game_state)
+        self.await_action = AwaitAction(connection, game_state)
 
     def __call__(
         self, position: Position, laying: Prototype = None, leading: Prototype = None
@@ -42,7 +43,7 @@ class MoveTo(Tool):
             allow_paths_through_own_entities=True,
             resolution=-1,
         )
-        sleep(0.05)  # Let the pathing complete in the game.
+        self.get_path.wait_for(path_handle)  # Let the pathing complete in the game.
         try:
             if laying is not None:
                 entity_name = laying.value[0]
@@ -70,16 +71,11 @@ class MoveTo(Tool):
                     x=response["x"], y=response["y"]
                 )
 
-            # If `fast` is turned off - we need to long poll the game state to ensure the player has moved
+            # If `fast` is turned off - we need to wait for the player to finish walking the path
             if not self.game_state.instance.fast:
-                remaining_steps = self.connection.rcon_client.send_command(
-                    f"/silent-command rcon.print(global.actions.get_walking_queue_length({self.player_index}))"
-                )
-                while remaining_steps != "0":
-                    sleep(0.5)
-                    remaining_steps = self.connection.rcon_client.send_command(
-                        f"/silent-command rcon.print(global.actions.get_walking_queue_length({self.player_index}))"
-                    )
+                walk = self.await_action("walk", timeout=None)
+                if walk["status"] != "done":
+                    raise Exception(f"Walking was {walk['status']}.")
                 self.game_state.player_location = Position(x=position.x, y=position.y)
 
             return Position(x=response["x"], y=response["y"])  # , execution_time
@@ -53,7 +53,9 @@ global.actions.move_to = function(player_index, path_handle, trailing_entity, is
             global.walking_queues[player_index].current_target = nil
             global.walking_queues[player_index].trailing_entity = trailing_entity
             global.walking_queues[player_index].is_trailing = is_trailing
+            pending_actions.finish(global.walking_queues[player_index].action_id, "cancelled")
         end
+        global.walking_queues[player_index].action_id = pending_actions.start(player_index, "walk")
 
         -- Add all path positions to the queue
         for _, point in ipairs(path) do
@@ -68,6 +70,8 @@ global.actions.move_to = function(player_index, path_handle, trailing_entity, is
                 walking = true,
                 direction = global.utils.get_direction(player.position, target)
             }
+        else
+            pending_actions.finish(global.walking_queues[player_index].action_id, "done")
         end
 
         return player.position
@@ -238,6 +242,7 @@ global.actions.update_walking_queues = function()
                 -- Queue is empty, stop walking
                 player.walking_state = {walking = false}
                 queue.current_target = nil
+                pending_actions.finish(queue.action_id, "done")
             end
         else
             -- Update walking direction to current target
@@ -253,6 +258,7 @@ end
 
 global.actions.clear_walking_queue = function(player_index)
     if global.walking_queues and global.walking_queues[player_index] then
+        pending_actions.finish(global.walking_queues[player_index].action_id, "cancelled")
         global.walking_queues[player_index] = nil
     end
 end
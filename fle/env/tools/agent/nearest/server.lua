@@ -16,41 +16,19 @@ global.actions.nearest = function(player_index, resource)
     local normalized_resource = normalize_resource_name(resource)
 
     local function find_nearest(player, resource)
-        local surface = player.surface
+        local prototype = game.entity_prototypes[resource]
+        if resource == "wood" or resource == "water" or (prototype and prototype.type == "resource") then
+            -- Answered from the resource index, rather than scanning the 1000x1000 tiles around the player each time
+            return resource_index.nearest(player.surface, player.position, resource, 500)
+        end
+
         local position = player.position
         local closest_distance = math.huge
         local closest = nil
-        local entities
-
-        if resource == "wood" then
-            entities = surface.find_entities_filtered{
-                area = {{position.x - 500, position.y - 500}, {position.x + 500, position.y + 500}},
-                type = "tree"
-            }
-        elseif resource == "water" then
-            local water_positions = surface.find_tiles_filtered{
-                area = {{position.x - 500, position.y - 500}, {position.x + 500, position.y + 500}},
-                name = "water"
-            }
-            for _, water_tile in ipairs(water_positions) do
-                local distance = ((position.x - water_tile.position.x) ^ 2 + (position.y - water_tile.position.y) ^ 2) ^ 0.5
-                if distance < closest_distance then
-                    closest_distance = distance
-                    closest = water_tile.position
-                end
-            end
-            if closest == nil then
-                error("\"Could not find an entity called "..resource.."\"")
-            end
-            --return { x = position.x - closest.x, y = position.y - closest.y }
-            return {x = closest.x, y = closest.y}
-        else
-            entities = surface.find_entities_filtered{
-                area = {{position.x - 500, position.y - 500}, {position.x + 500, position.y + 500}},
-                name = resource
-            }
-        end
-
+        local entities = player.surface.find_entities_filtered{
+            area = {{position.x - 500, position.y - 500}, {position.x + 500, position.y + 500}},
+            name = resource
+        }
         for _, entity in ipairs(entities) do
             local distance = ((position.x - entity.position.x) ^ 2 + (position.y - entity.position.y) ^ 2) ^ 0.5
             if distance < closest_distance then
@@ -58,14 +36,12 @@ global.actions.nearest = function(player_index, resource)
                 closest = entity.position
             end
         end
-
-        if closest == nil then
-            error("\"Could not find an entity called "..resource.."\"")
-        end
-        -- game.print("Distance to "..resource.." is "..closest_distance)
-        return {x= closest.x, y = closest.y}
-        --return { x = position.x - closest.x, y = position.y - closest.y }
+        return closest
     end
 
-    return find_nearest(player, normalized_resource)
+    local closest = find_nearest(player, normalized_resource)
+    if closest == nil then
+        error("\"Could not find an entity called "..normalized_resource.."\"")
+    end
+    return {x = closest.x, y = closest.y}
 end
@@ -12,19 +12,13 @@ global.actions.nearest_buildable = function(player_index, entity_name, bounding_
     local start_pos = center_position or player.position
     local needs_oil = entity_name == "pumpjack"
 
-    -- Cache for chunk resources
+    -- Cache for chunk resources, which come from the resource index
     local chunk_cache = {}
 
     local function get_chunk_resources(chunk_x, chunk_y)
         local cache_key = chunk_x .. "," .. chunk_y
         if not chunk_cache[cache_key] then
-            chunk_cache[cache_key] = surface.find_entities_filtered{
-                area = {
-                    {chunk_x * 32, chunk_y * 32},
-                    {(chunk_x + 1) * 32, (chunk_y + 1) * 32}
-                },
-                collision_mask = "resource-layer"
-            }
+            chunk_cache[cache_key] = resource_index.resources_in_chunk(surface, chunk_x, chunk_y)
         end
         return chunk_cache[cache_key]
     end
@@ -71,8 +65,8 @@ global.actions.nearest_buildable = function(player_index, entity_name, bounding_
             for chunk_y = chunk_min_y, chunk_max_y do
                 local resources = get_chunk_resources(chunk_x, chunk_y)
                 for _, resource in pairs(resources) do
-                    local x = floor(resource.position.x)
-                    local y = floor(resource.position.y)
+                    local x = floor(resource.x)
+                    local y = floor(resource.y)
                     if x >= min_x and x <= max_x and
                        y >= min_y and y <= max_y then
                         positions[x] = positions[x] or {}
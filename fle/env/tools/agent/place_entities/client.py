@@ -0,0 +1,137 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+from fle.env import DirectionInternal, Direction
+from fle.env.entities import Entity, Position
+from fle.env.game_types import Prototype
+from fle.env.tools import Tool
+from fle.env.tools.agent.pickup_entity.client import PickupEntity
+from fle.env.tools.agent.place_entity.client import PlaceObject
+
+PlacementSpec = Union[Tuple[Prototype, Position], Tuple[Prototype, Position, Direction]]
+
+
+class PlaceEntities(Tool):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.place_entity = PlaceObject(*args)
+        self.pickup_entity = PickupEntity(*args)
+
+    def __call__(
+        self,
+        entities: Sequence[PlacementSpec],
+        exact: bool = True,
+        atomic: bool = True,
+    ) -> List[Optional[Entity]]:
+        """
+        Places a list of entities in one go, in order, if you have them in inventory.
+        :param entities: (prototype, position) or (prototype, position, direction) of each entity to place
+        :param exact: If True, place entities at exact positions, else at the nearest possible positions
+        :param atomic: If True, place all of the entities or none of them, else place as many as possible
+        :example place_entities([(Prototype.WoodenChest, Position(x=0, y=0)), (Prototype.BurnerInserter, Position(x=1, y=0), Direction.RIGHT)])
+        :return: The placed entities, in the same order. If not atomic, entities that couldn't be placed are None.
+        """
+        specs = [self._parse_spec(spec) for spec in entities]
+        if not specs:
+            return []
+
+        if not self.game_state.instance.fast:
+            # Slow placement finishes on a later tick, so place them one at a time
+            return self._place_each(specs, exact, atomic)
+
+        response, elapsed = self.execute(
+            self.player_index,
+            [
+                {
+                    "name": name,
+                    "direction": DirectionInternal.to_factorio_direction(direction),
+                    "x": x,
+                    "y": y,
+                }
+                for (name, _, direction, x, y) in specs
+            ],
+            exact,
+            atomic,
+        )
+        if isinstance(response, str) or not response:
+            raise Exception(
+                f"Could not place entities, {self.get_error_message(str(response))}"
+            )
+
+        if isinstance(response, dict) and "failed" in response:
+            name, _, _, x, y = specs[int(response["failed"]) - 1]
+            msg = self.get_error_message(str(response["error"]))
+            raise Exception(
+                f"Could not place {name} at ({x}, {y}), {msg}. None of the entities were placed."
+            )
+
+        if isinstance(response, dict):
+            # A Lua list, keyed by index
+            response = [response[key] for key in sorted(response, key=int)]
+
+        placed = []
+        for (name, prototype, _, x, y), result in zip(specs, response):
+            if not result.get("ok"):
+                msg = self.get_error_message(str(result.get("error")))
+                print(f"Warning: Could not place {name} at ({x}, {y}), {msg}")
+                placed.append(None)
+                continue
+            placed.append(self._to_entity(prototype, result["entity"]))
+        return placed
+
+    def _parse_spec(self, spec: PlacementSpec):
+        if len(spec) == 2:
+            prototype, position = spec
+            direction = Direction.UP
+        elif len(spec) == 3:
+            prototype, position, direction = spec
+        else:
+            raise ValueError(
+                "Each entity must be a (prototype, position) or (prototype, position, direction) tuple"
+            )
+
+        if not isinstance(prototype, Prototype):
+            raise ValueError(f"{prototype} is not a Prototype object")
+        if isinstance(position, tuple):
+            position = Position(x=position[0], y=position[1])
+        if not isinstance(position, Position):
+            raise ValueError(f"{position} is not a Position object")
+        if not isinstance(direction, (DirectionInternal, Direction)):
+            raise ValueError(f"{direction} is not a Direction object")
+
+        name, _ = prototype.value
+        x, y = self.get_position(position)
+        return name, prototype, direction, x, y
+
+    def _to_entity(self, prototype: Prototype, response) -> Entity:
+        metaclass = prototype.value[1]
+        while isinstance(metaclass, tuple):
+            metaclass = metaclass[1]
+
+        cleaned_response = self.clean_response(response)
+        try:
+            return metaclass(
+                prototype=prototype.name, game=self.connection, **cleaned_response
+            )
+        except Exception as e:
+            raise Exception(
+                f"Could not create {prototype.value[0]} object from response (place entities): {cleaned_response}",
+                e,
+            )
+
+    def _place_each(self, specs, exact: bool, atomic: bool) -> List[Optional[Entity]]:
+        placed = []
+        for _, prototype, direction, x, y in specs:
+            try:
+                placed.append(
+                    self.place_entity(
+                        prototype, direction, Position(x=x, y=y), exact=exact
+                    )
+                )
+            except Exception as e:
+                if atomic:
+                    for entity in placed:
+                        self.pickup_entity(entity)
+                    raise Exception(f"{e}. None of the entities were placed.") from e
+                print(f"Warning: {e}")
+                placed.append(None)
+        return placed
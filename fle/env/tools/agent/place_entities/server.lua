@@ -0,0 +1,48 @@
+-- Remove entities placed earlier in a batch, returning their items to the player
+local function undo_placements(player, placed)
+    for i = #placed, 1, -1 do
+        local placement = placed[i]
+        local candidates = player.surface.find_entities_filtered{
+            name = placement.name,
+            position = placement.position,
+            radius = 2
+        }
+        for _, entity in ipairs(candidates) do
+            if entity.valid and (not placement.id or entity.unit_number == placement.id) then
+                entity.destroy({raise_destroy = true})
+                player.insert{name = placement.name, count = 1}
+                break
+            end
+        end
+    end
+end
+
+-- Place a list of entities in one call. Each spec is {name, direction, x, y}, and is placed in order with the same
+-- checks as place_entity, so later entities see the ones placed before them.
+-- Returns a result per spec: {ok = true, entity = <serialized entity>} or {ok = false, error = <message>}.
+-- If `atomic`, the first failure removes everything placed so far, the rest aren't attempted, and only
+-- {failed = <index of the spec>, error = <message>} is returned.
+global.actions.place_entities = function(player_index, specs, exact, atomic)
+    local player = global.agent_characters[player_index]
+    if not global.fast then
+        -- Slow placement is scheduled for a later tick, one entity at a time
+        error("\"Placing entities in bulk is only supported in fast mode\"")
+    end
+
+    local results = {}
+    local placed = {}
+    for i, spec in ipairs(specs) do
+        local ok, result = pcall(global.actions.place_entity, player_index, spec.name, spec.direction, spec.x, spec.y, exact)
+        if ok and type(result) == "table" then
+            results[i] = {ok = true, entity = result}
+            table.insert(placed, {name = spec.name, position = result.position or {x = spec.x, y = spec.y}, id = result.id})
+        else
+            results[i] = {ok = false, error = ok and "Could not place " .. spec.name or tostring(result)}
+            if atomic then
+                undo_placements(player, placed)
+                return {failed = i, error = results[i].error}
+            end
+        end
+    end
+    return results
+end
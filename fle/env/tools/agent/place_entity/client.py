@@ -1,8 +1,7 @@
-from time import sleep
-
 from fle.env.entities import Position, Entity
 from fle.env import DirectionInternal, Direction
 from fle.env.game_types import Prototype
+from fle.env.tools.admin.await_action.client import AwaitAction
 from fle.env.tools.agent.get_entity.client import GetEntity
 from fle.env.tools.agent.pickup_entity.client import PickupEntity
 from fle.env.tools import Tool
@@ -15,6 +14,7 @@ class PlaceObject(Tool):
         self.load()
         self.get_entity = GetEntity(*args)
         self.pickup_entity = PickupEntity(*args)
+        self.await_action = AwaitAction(*args)
 
     def __call__(
         self,
@@ -70,7 +70,10 @@ class PlaceObject(Tool):
 
         # If we are in `slow` mode, there is a delay between placing the entity and the entity being created
         if not self.game_state.instance.fast:
-            sleep(1)
+            placement = self.await_action("place")
+            if placement["status"] == "failed":
+                msg = self.get_error_message(str(placement.get("message")))
+                raise Exception(f"Could not place {name} at ({x}, {y}), {msg}")
             return self.get_entity(entity, position)
         else:
             if not isinstance(response, dict):
@@ -141,10 +141,7 @@ global.actions.place_entity = function(player_index, entity, direction, x, y, ex
         -- Select the target position
         player.update_selected_entity(position)
 
-        -- Schedule the actual placement after delay
-        script.on_nth_tick(60, function(event)  -- 30 ticks = 0.5 seconds
-            script.on_nth_tick(60, nil)  -- Clear the scheduled event
- 
+        local function place_after_delay()
             -- Verify conditions are still valid
             validate_distance()
             validate_inventory()
@@ -163,10 +160,22 @@ global.actions.place_entity = function(player_index, entity, direction, x, y, ex
             if placed_entity then
                 player.remove_item{name = entity, count = 1}
                 player.cursor_ghost = nil  -- Clear the ghost
-                return global.utils.serialize_entity(placed_entity)
             else
                 error("\"Failed to place entity after delay\"")
             end
+        end
+
+        -- Schedule the actual placement after delay, recording how it went for the client waiting on it
+        local action_id = pending_actions.start(player_index, "place")
+        script.on_nth_tick(60, function(event)  -- 60 ticks = 1 second
+            script.on_nth_tick(60, nil)  -- Clear the scheduled event
+
+            local ok, err = pcall(place_after_delay)
+            if ok then
+                pending_actions.finish(action_id, "done")
+            else
+                pending_actions.finish(action_id, "failed", err)
+            end
         end)
 
         return { pending = true }
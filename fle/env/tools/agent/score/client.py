@@ -1,11 +1,18 @@
+import json
+from typing import Dict, Optional
+
 from fle.env.tools import Tool
 
 
 class Reward(Tool):
+    read_only = True
+
     def __init__(self, connection, game_state):
         super().__init__(connection, game_state)
         self.name = "score"
         self.game_state = game_state
+        # Prices only change with the game/mod configuration, so we fetch them at most once
+        self._price_list: Optional[Dict[str, float]] = None
         self.load()
 
     def __call__(self, *args, **kwargs):
@@ -23,6 +30,30 @@ class Reward(Tool):
 
         return response["player"], goal
 
+    def get_price_list(self) -> Dict[str, float]:
+        """
+        Get the price of every item and fluid, as used to calculate the production score.
+        The list is generated once on the server and cached on both sides.
+        """
+        if self._price_list is None:
+            response = self.connection.rcon_client.send_command(
+                "/sc rcon.print(game.table_to_json(production_score.get_price_list()))"
+            )
+            if not response:
+                raise Exception("Could not get price list")
+            self._price_list = json.loads(response)
+        return self._price_list
+
+    def invalidate_price_list(self):
+        """
+        Drop the cached price list, so that it is regenerated on the next score.
+        Only needed if prototypes are changed without the mod configuration changing.
+        """
+        self.connection.rcon_client.send_command(
+            "/sc production_score.invalidate_price_list()"
+        )
+        self._price_list = None
+
 
 # if __name__ == "__main__":
 #     score = Reward("connection", 0)
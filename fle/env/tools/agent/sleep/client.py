@@ -2,6 +2,9 @@ from time import sleep
 
 from fle.env.tools import Tool
 
+# Game speed used while advancing ticks. The server will run as fast as it can up to this multiplier.
+ACCELERATED_SPEED = 100
+
 
 class Sleep(Tool):
     def __init__(self, connection, game_state):
@@ -13,10 +16,15 @@ class Sleep(Tool):
         :param seconds: Number of seconds to sleep.
         :return: True if sleep was successful.
         """
+        target_ticks = seconds * 60  # Convert seconds to ticks (60 ticks = 1 second)
+
+        if getattr(self.game_state.instance, "accelerated", False):
+            self.advance_ticks(target_ticks)
+            return True
+
         # Get initial tick
         ticks_elapsed = 0
         start_tick, _ = self.execute(-1)
-        target_ticks = seconds * 60  # Convert seconds to ticks (60 ticks = 1 second)
 
         while True:
             current_tick, _ = self.execute(ticks_elapsed)
@@ -28,3 +36,23 @@ class Sleep(Tool):
             # Sleep for a small interval to prevent excessive polling
             # Using 0.05 seconds (50ms) as a reasonable polling interval
             sleep(0.05)
+
+    def advance_ticks(self, ticks: int, speed: float = ACCELERATED_SPEED) -> int:
+        """
+        Advance the game by exactly `ticks` ticks, running the server as fast as it allows,
+        and block until they have passed. The previous game speed is restored on the target tick.
+        :param ticks: Number of ticks to advance.
+        :param speed: Game speed to run at until the target tick is reached.
+        :return: The tick that was reached.
+        """
+        command = f"/sc rcon.print(global.actions.advance_ticks({int(ticks)}, {speed}))"
+        target_tick = int(self.connection.rcon_client.send_command(command))
+
+        while True:
+            current_tick, _ = self.execute(0)
+            remaining = target_tick - current_tick
+            if remaining <= 0:
+                return current_tick
+
+            # Wait about as long as the remaining ticks should take, so we only poll a handful of times
+            sleep(min(max(remaining / (60 * speed), 0.01), 0.5))
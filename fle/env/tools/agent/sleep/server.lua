@@ -3,4 +3,32 @@ global.actions.sleep = function(ticks_elapsed)
         global.elapsed_ticks = global.elapsed_ticks + ticks_elapsed
     end
     return game.tick
-end
\ No newline at end of file
+end
+
+-- Run the game as fast as possible until `ticks` more ticks have passed, then restore the previous speed.
+-- The client only needs to wait for game.tick to reach the returned target, instead of real time passing.
+global.actions.advance_ticks = function(ticks, speed)
+    ticks = math.max(0, math.floor(tonumber(ticks) or 0))
+    local target_tick = game.tick + ticks
+    if ticks == 0 then
+        return target_tick
+    end
+
+    -- If we are already advancing, keep the speed we started from rather than the accelerated one
+    if not global.tick_target then
+        global.tick_target_previous_speed = game.speed
+    end
+    global.tick_target = math.max(global.tick_target or 0, target_tick)
+    global.elapsed_ticks = (global.elapsed_ticks or 0) + ticks
+    game.speed = tonumber(speed) or 100
+
+    script.on_nth_tick(1, function(event)
+        if event.tick >= global.tick_target then
+            game.speed = global.tick_target_previous_speed or 1
+            global.tick_target = nil
+            global.tick_target_previous_speed = nil
+            script.on_nth_tick(1, nil)
+        end
+    end)
+    return target_tick
+end
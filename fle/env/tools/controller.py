@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import Future
 from timeit import default_timer as timer
 from typing import List, Tuple, Dict, Any
 
@@ -7,12 +8,19 @@ from slpp import slpp as lua, ParseError
 from fle.env.entities import Direction
 from fle.env.lua_manager import LuaScriptManager
 from fle.env.namespace import FactorioNamespace
-from fle.env.utils.rcon import _lua2python
+from fle.env.utils.rcon import _lua2python, _json2python
 
 COMMAND = "/silent-command"
 
 
 class Controller:
+    # Tools with large responses can opt into having them serialised with `game.table_to_json`
+    # on the server and decoded with `json` on the client, rather than `dump` and `slpp`.
+    json_response = False
+    # Tools that never change the game. Calling anything else means a snapshot of the game state
+    # can no longer be assumed to match the game (see `FactorioInstance.reset`).
+    read_only = False
+
     def __init__(
         self,
         lua_script_manager: "LuaScriptManager",
@@ -131,34 +139,89 @@ class Controller:
             script = command
         return script
 
+    def _get_invocation(self, *args) -> Tuple[str, str]:
+        parameters = [lua.encode(arg) for arg in args]
+        invocation = f"pcall(global.actions.{self.name}{(', ' if parameters else '') + ','.join(parameters)})"
+        if self.json_response:
+            # table_to_json can't serialise everything (e.g. LuaObjects), so fall back to dump
+            wrapped = (
+                f"{COMMAND} a, b = {invocation}; "
+                f"local ok, json = pcall(game.table_to_json, {{a=a, b=b}}); "
+                f"rcon.print(ok and json or dump({{a=a, b=b}}))"
+            )
+        else:
+            wrapped = f"{COMMAND} a, b = {invocation}; rcon.print(dump({{a=a, b=b}}))"
+        return invocation, wrapped
+
+    def _parse_response(self, invocation, lua_response, start) -> Tuple[Dict, Any]:
+        decode = _json2python if self.json_response else _lua2python
+        parsed, elapsed = decode(invocation, lua_response, start=start)
+        if parsed is None:
+            return {}, lua_response  # elapsed
+
+        if not parsed.get("a") and "b" in parsed and isinstance(parsed["b"], str):
+            if parsed["b"] == "string":
+                error = (
+                    lua_response.split(":")[-1]
+                    .replace("}", "")
+                    .replace('"', "")
+                    .strip()
+                )
+                return error, lua_response  # elapsed
+            return parsed["b"], lua_response  # elapsed
+
+        return parsed.get("b", {}), lua_response  # elapsed
+
+    def _mark_state_changed(self):
+        """Invalidate anything cached about the game (e.g. the entity index) if this tool can change it"""
+        if not self.read_only:
+            instance = getattr(self.game_state, "instance", None)
+            if instance is not None:
+                instance._state_version += 1
+
     def execute(self, *args) -> Tuple[Dict, Any]:
+        self._mark_state_changed()
         try:
             start = time.time()
-            parameters = [lua.encode(arg) for arg in args]
-            invocation = f"pcall(global.actions.{self.name}{(', ' if parameters else '') + ','.join(parameters)})"
-            wrapped = f"{COMMAND} a, b = {invocation}; rcon.print(dump({{a=a, b=b}}))"
+            invocation, wrapped = self._get_invocation(*args)
             lua_response = self.connection.rcon_client.send_command(wrapped)
+            return self._parse_response(invocation, lua_response, start)
 
-            parsed, elapsed = _lua2python(invocation, lua_response, start=start)
-            if parsed is None:
-                return {}, lua_response  # elapsed
-
-            if not parsed.get("a") and "b" in parsed and isinstance(parsed["b"], str):
-                if parsed["b"] == "string":
-                    error = (
-                        lua_response.split(":")[-1]
-                        .replace("}", "")
-                        .replace('"', "")
-                        .strip()
-                    )
-                    return error, lua_response  # elapsed
-                return parsed["b"], lua_response  # elapsed
-
-            return parsed.get("b", {}), lua_response  # elapsed
-
+        except TimeoutError:
+            # The evaluation deadline passed - let it abort the program rather than the tool call
+            raise
         except Exception:
             return {}, -1
 
+    def submit(self, *args) -> Future:
+        """
+        Like `execute`, but returns immediately with a future instead of waiting for the reply.
+        Several independent calls can be submitted back-to-back and share one round trip.
+        """
+        self._mark_state_changed()
+        result = Future()
+        start = time.time()
+        invocation, wrapped = self._get_invocation(*args)
+        rcon_client = self.connection.rcon_client
+        if not hasattr(rcon_client, "submit"):
+            # Plain RCONClient - there is no pipelining to take advantage of
+            result.set_result(self.execute(*args))
+            return result
+
+        def on_reply(reply: Future):
+            try:
+                result.set_result(
+                    self._parse_response(invocation, reply.result(), start)
+                )
+            except Exception:
+                result.set_result(({}, -1))
+
+        try:
+            rcon_client.submit(wrapped).add_done_callback(on_reply)
+        except Exception:
+            result.set_result(({}, -1))
+        return result
+
     def execute2(self, *args) -> Tuple[Dict, Any]:
         lua_response = ""
         try:
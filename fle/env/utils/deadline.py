@@ -0,0 +1,83 @@
+import builtins
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute `time.monotonic()` by which the current evaluation must finish.
+# Context variables are local to each thread and asyncio task, unlike SIGALRM which only works on the main thread.
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+# Set once whoever is waiting for the evaluation has given up on it (see `FactorioInstance.async_eval`)
+_abandoned: ContextVar[Optional[threading.Event]] = ContextVar(
+    "abandoned", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """
+    Set a deadline for everything run inside this block in the current thread / task.
+    Nested deadlines can only shorten the outer one.
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires = min(expires, outer)
+
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """Lift the current deadline inside this block, e.g. to wrap up an evaluation that has run out of time"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def abandonable(abandoned: threading.Event):
+    """
+    Treat the deadline as passed inside this block once `abandoned` is set, even where it was lifted with
+    `no_deadline`, so that an evaluation nobody waits for any more can't keep acting on the game.
+    """
+    token = _abandoned.set(abandoned)
+    try:
+        yield
+    finally:
+        _abandoned.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there isn't one"""
+    abandoned = _abandoned.get()
+    if abandoned is not None and abandoned.is_set():
+        return 0.0
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+
+def check_deadline():
+    """Raise a TimeoutError if the current deadline has passed"""
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise TimeoutError("Evaluation timed out")
+
+
+# Loops in agent programs check the deadline through this builtin, so that functions the agent defines can still
+# find it after they are persisted and rebuilt with different globals (see `SerializableFunction.reconstruct`)
+CHECK_DEADLINE_BUILTIN = "__fle_check_deadline__"
+setattr(builtins, CHECK_DEADLINE_BUILTIN, check_deadline)
@@ -0,0 +1,61 @@
+from typing import Any, Callable, Hashable
+
+
+class _Deferred:
+    __slots__ = ("compute",)
+
+    def __init__(self, compute: Callable[[], Any]):
+        self.compute = compute
+
+    def __repr__(self):
+        return "<deferred>"
+
+
+class LazyDict(dict):
+    """
+    A dict whose values can be computed on first access.
+
+    `defer(key, compute)` stores a function in place of the value. It is called the first time the key is read,
+    and its result is kept like any other value. Copying (`dict(d)`, `{**d}`, `copy()`, `copy.copy`) and pickling
+    the dict read, and so compute, every value, so copies never depend on state that may have changed since.
+    """
+
+    def defer(self, key: Hashable, compute: Callable[[], Any]):
+        super().__setitem__(key, _Deferred(compute))
+
+    def is_computed(self, key: Hashable) -> bool:
+        return not isinstance(super().__getitem__(key), _Deferred)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, _Deferred):
+            value = value.compute()
+            super().__setitem__(key, value)
+        return value
+
+    def __iter__(self):
+        # Overriding __iter__ makes dict(d) and {**d} read values through __getitem__
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key not in self:
+            return super().pop(key, *default)
+        value = self[key]
+        super().pop(key)
+        return value
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def copy(self) -> "LazyDict":
+        return LazyDict(self.items())
+
+    def __reduce__(self):
+        # Also used by `copy.copy` and `copy.deepcopy`
+        return LazyDict, (dict(self.items()),)
@@ -0,0 +1,187 @@
+import asyncio
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from factorio_rcon import RCONClient
+from factorio_rcon.factorio_rcon import (
+    CONN_CLOSED,
+    NOT_CONNECTED,
+    RCON_FAILED,
+    SEND_ERROR,
+    RCONClosed,
+    RCONNotConnected,
+    RCONReceiveError,
+    RCONSendError,
+)
+
+from fle.env.utils.deadline import time_remaining
+
+SERVERDATA_EXECCOMMAND = 2
+
+
+class PipelinedRCONClient(RCONClient):
+    """
+    RCON client that keeps many commands in flight on a single connection.
+
+    Commands are written to the socket as soon as they are submitted, and a background
+    reader thread matches each reply back to its request by packet id. This means that
+    independent commands (from one thread or many) no longer pay one full round trip each.
+
+    The blocking `send_command` / `send_commands` API of `factorio_rcon.RCONClient` is
+    preserved, so this can be used anywhere a regular client is expected.
+    """
+
+    def __init__(self, ip_address, port, password, timeout=None, connect_on_init=True):
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        super().__init__(
+            ip_address, port, password, timeout=timeout, connect_on_init=connect_on_init
+        )
+
+    def connect(self):
+        """Authenticate synchronously, then hand the socket over to the reader thread"""
+        super().connect()
+        # The reader blocks on recv indefinitely; deadlines are enforced per command instead
+        self.rcon_socket.settimeout(None)
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            args=(self.rcon_socket,),
+            name=f"rcon-reader-{self.port}",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def close(self):
+        sock = self.rcon_socket
+        if sock is not None:
+            try:
+                # Wake up the reader thread blocked in recv()
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        super().close()
+        self._fail_pending(RCONClosed(CONN_CLOSED))
+
+    def submit(self, command: str) -> Future:
+        """
+        Send a command without waiting for its reply.
+        :param command: The command to execute.
+        :return: A future resolving to the response body (or None if the body is empty).
+        """
+        if self.rcon_socket is None:
+            raise RCONNotConnected(NOT_CONNECTED)
+        if self.rcon_failure:
+            raise RCONNotConnected(RCON_FAILED)
+
+        future = Future()
+        with self._send_lock:
+            packet_id = self.get_id()
+            with self._pending_lock:
+                self._pending[packet_id] = future
+            packet = (
+                struct.pack("<ii", packet_id, SERVERDATA_EXECCOMMAND)
+                + command.encode("utf8")
+                + b"\x00\x00"
+            )
+            try:
+                self.rcon_socket.sendall(struct.pack("<i", len(packet)) + packet)
+            except Exception as exc:
+                with self._pending_lock:
+                    self._pending.pop(packet_id, None)
+                self.rcon_failure = True
+                raise RCONSendError(SEND_ERROR) from exc
+        return future
+
+    def submit_many(self, commands: List[str]) -> List[Future]:
+        """Send several commands back-to-back and return their futures in order"""
+        return [self.submit(command) for command in commands]
+
+    def send_command(self, command, timeout: Optional[float] = None):
+        """
+        Send a single command and block until its reply arrives.
+        Safe to call from several threads at once - the commands are pipelined.
+        """
+        timeout = self._get_timeout(timeout)
+        return self.submit(command).result(timeout=timeout)
+
+    def send_commands(self, commands, timeout: Optional[float] = None):
+        """Send a dict of commands at once and return a dict of key: response"""
+        timeout = self._get_timeout(timeout)
+        futures = {key: self.submit(value) for key, value in commands.items()}
+        return {key: future.result(timeout=timeout) for key, future in futures.items()}
+
+    async def async_send_command(self, command, timeout: Optional[float] = None):
+        """
+        Send a single command and await its reply without blocking the event loop.
+        Many coroutines can await commands on the same connection concurrently.
+        """
+        timeout = self._get_timeout(timeout)
+        return await asyncio.wait_for(
+            asyncio.wrap_future(self.submit(command)), timeout=timeout
+        )
+
+    def _get_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """Limit the timeout to the current evaluation deadline, if there is one"""
+        timeout = timeout if timeout is not None else self.timeout
+        remaining = time_remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise TimeoutError("Evaluation timed out")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of commands sent that have not been answered yet"""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                (length,) = struct.unpack("<i", self._recv_exactly(sock, 4))
+                payload = self._recv_exactly(sock, length)
+                packet_id, _ = struct.unpack("<ii", payload[:8])
+                body = payload[8:-2].decode("utf8")
+
+                with self._pending_lock:
+                    future = self._pending.pop(packet_id, None)
+                if future is not None and not future.done():
+                    future.set_result(body.rstrip() if body else None)
+        except Exception as exc:
+            if self.rcon_socket is not sock:
+                # The connection was closed or replaced deliberately - close() has already
+                # failed anything that was waiting on it.
+                return
+            self.rcon_failure = True
+            if isinstance(exc, RCONClosed):
+                self._fail_pending(exc)
+            else:
+                error = RCONReceiveError(str(exc))
+                error.__cause__ = exc
+                self._fail_pending(error)
+
+    @staticmethod
+    def _recv_exactly(sock, size: int) -> bytes:
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = sock.recv(min(remaining, 65536))
+            if not chunk:
+                raise RCONClosed(CONN_CLOSED)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def _fail_pending(self, exc: Exception):
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(exc)
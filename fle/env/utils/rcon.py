@@ -10,6 +10,7 @@ from timeit import default_timer as timer
 from slpp import slpp as lua
 
 import io
+import json
 import contextlib
 
 
@@ -161,6 +162,34 @@ def _lua2python(command, response, *parameters, trace=False, start=0):
             return None, (timer() - start)
 
 
+# Lua tools quote string values by hand (`'"' .. name .. '"'`) so that `dump` emits valid table
+# literals. `game.table_to_json` escapes those quotes instead, so we strip one layer back off.
+_QUOTED_JSON_STRING = re.compile(r'"\\"((?:[^"\\]|\\.)*?)\\""')
+
+
+def _json2python(command, response, *parameters, trace=False, start=0):
+    """
+    Decode a response printed with `game.table_to_json`, as an alternative to `_lua2python`.
+    Sequential Lua tables arrive as lists already, so no `_remove_numerical_keys` pass is needed.
+    Falls back to `_lua2python` if the server had to print the response with `dump` instead.
+    """
+    if not response:
+        return None, (timer() - start)
+
+    try:
+        output = json.loads(_QUOTED_JSON_STRING.sub(r'"\1"', response))
+    except ValueError:
+        return _lua2python(command, response, *parameters, trace=trace, start=start)
+
+    if isinstance(output, dict) and isinstance(output.get("b"), dict):
+        # Sparse Lua arrays are encoded as objects with string keys
+        b = output["b"]
+        if b and all(key.isdigit() for key in b):
+            output["b"] = [b[key] for key in sorted(b, key=int)]
+
+    return output, (timer() - start)
+
+
 @deprecated("Doesn't handle nested structures that well")
 def _lua2python_old(command, response, *parameters, trace=False, start=0):
     # Capture stdout using StringIO
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+Area = Tuple[float, float, float, float]  # left, top, right, bottom
+
+CHUNK_SIZE = 32
+
+
+class SpatialEntityIndex:
+    """
+    Client-side cache of serialised entities, bucketed by map chunk.
+
+    It holds the result of one server-side entity search over a square area, and answers area / name
+    queries inside that area locally for as long as the game hasn't changed. The caller decides what
+    "changed" means by passing a version key; the index is also dropped once it is `max_age` ticks old.
+    """
+
+    def __init__(self, max_age: int = 60):
+        self.max_age = max_age
+        self.clear()
+
+    def clear(self):
+        self._chunks: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+        self._area: Optional[Area] = None
+        self._tick = 0
+        self._version: Hashable = None
+
+    @property
+    def version(self) -> Hashable:
+        """The version key the index was filled at, or None if it is empty"""
+        return self._version if self._area is not None else None
+
+    def update(
+        self, entities: List[Dict[str, Any]], area: Area, tick: int, version: Hashable
+    ):
+        """Replace the contents of the index with the entities found in `area`"""
+        self.clear()
+        for entity in entities:
+            position = entity.get("position")
+            if not isinstance(position, dict):
+                continue
+            self._chunks[self._chunk(position["x"], position["y"])].append(entity)
+        self._area = area
+        self._tick = tick
+        self._version = version
+
+    def query(
+        self, area: Area, names: Set[str], tick: int, version: Hashable
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the entities intersecting `area`, optionally limited to those named in `names`.
+        :return: The matching entities, or None if the index can't answer the query.
+        """
+        if (
+            self._area is None
+            or version != self._version
+            or tick - self._tick > self.max_age
+            or not self._covers(area)
+        ):
+            return None
+
+        left, top, right, bottom = area
+        # Entities can overlap the area from a neighbouring chunk, so search one chunk wider
+        min_cx, min_cy = self._chunk(left - CHUNK_SIZE, top - CHUNK_SIZE)
+        max_cx, max_cy = self._chunk(right + CHUNK_SIZE, bottom + CHUNK_SIZE)
+
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for entity in self._chunks.get((cx, cy), ()):
+                    if names and entity.get("name", "").replace("_", "-") not in names:
+                        continue
+                    if self._intersects(entity, area):
+                        found.append(entity)
+        return found
+
+    def _covers(self, area: Area) -> bool:
+        left, top, right, bottom = self._area
+        return (
+            area[0] >= left
+            and area[1] >= top
+            and area[2] <= right
+            and area[3] <= bottom
+        )
+
+    @staticmethod
+    def _chunk(x: float, y: float) -> Tuple[int, int]:
+        return int(x // CHUNK_SIZE), int(y // CHUNK_SIZE)
+
+    @staticmethod
+    def _intersects(entity: Dict[str, Any], area: Area) -> bool:
+        position = entity["position"]
+        dimensions = entity.get("dimensions") or {}
+        half_width = (dimensions.get("width") or 0) / 2
+        half_height = (dimensions.get("height") or 0) / 2
+        return (
+            area[0] <= position["x"] + half_width
+            and position["x"] - half_width <= area[2]
+            and area[1] <= position["y"] + half_height
+            and position["y"] - half_height <= area[3]
+        )
@@ -19,6 +19,7 @@ from fle.commons.models.generation_parameters import GenerationParameters
 from fle.commons.models.message import Message
 from fle.commons.models.program import Program
 from fle.env import FactorioInstance
+from fle.eval.algorithms.evaluation_cache import create_evaluation_cache
 from fle.eval.evaluator import Evaluator
 
 from ..mcts import MCTS, GroupedFactorioLogger, InstanceGroup
@@ -316,6 +317,9 @@ class ParallelBeamSearch:
         self._monitor_task = None
         self._monitoring_active = True
 
+        # Shared by every group, as they all search from the same states
+        self.evaluation_cache = create_evaluation_cache()
+
         # Create beam groups
         self.beam_groups = self._create_beam_groups(instances)
 
@@ -380,6 +384,7 @@ class ParallelBeamSearch:
                 value_accrual_time=3,
                 logger=self.logger,
                 error_penalty=self.config.beam_kwargs.get("error_penalty", 0),
+                cache=self.evaluation_cache,
             )
 
             # Create beam search instance
@@ -433,8 +438,9 @@ class ParallelBeamSearch:
         try:
             if iteration == 0 and not self.resume_version:
                 state = self.config.initial_state
-                group.evaluator.instances[0].reset(state)
-                entities = group.evaluator.instances[0].namespace.get_entities()
+                instance = group.evaluator.instances[0]
+                await instance.async_reset(state)
+                entities = await instance.namespace._async_call("get_entities")
                 conversation = Conversation(
                     messages=[
                         Message(role="system", content=self.config.system_prompt),
@@ -0,0 +1,155 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fle.commons.models.game_state import GameState
+
+
+class EvaluationCache:
+    """
+    Results of evaluating programs, keyed by the state they ran from, their code and the environment's code.
+
+    A program sampled again from the same state (duplicate samples, retries, resumed runs) can reuse the earlier
+    result instead of resetting the instance, running the program and accruing value all over again.
+    Evaluation isn't fully deterministic - value accrues in real time, so flows and rewards vary a little between
+    runs - so a cached result stands in for a fresh evaluation rather than reproducing it exactly. Errors and
+    timeouts are never cached (see `cacheable`), as they may well be transient.
+
+    Results are pickled into a local SQLite file, which can be shared by several processes. Once it holds more
+    than `max_entries` results, the least recently used are evicted.
+    """
+
+    def __init__(self, path: str = ".fle/eval_cache.db", max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS evaluations (
+                key TEXT PRIMARY KEY,
+                result BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(state: GameState, code: str, **params) -> str:
+        """
+        The key of evaluating `code` from `state`, with any other `params` the result depends on
+        (e.g. the agent running it, or how long value is accrued for).
+        """
+        parts = [environment_version(), state.content_hash(), normalize_code(code)]
+        parts += [f"{name}={params[name]!r}" for name in sorted(params)]
+        return sha256("\0".join(parts).encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(output: str, error_occurred: bool = False) -> bool:
+        """
+        Whether an evaluation's result should be cached. Errors and timeouts can come from the server rather than
+        the program (e.g. a dropped RCON connection, or a slow tick), so they are evaluated again next time.
+        """
+        return not error_occurred and "timed out" not in str(output).lower()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM evaluations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE evaluations SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        try:
+            result = pickle.loads(row[0])
+        except Exception as e:
+            # Written by an incompatible version of the models, so evaluate again
+            print(f"Discarding unreadable cached evaluation: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        try:
+            blob = pickle.dumps(result)
+        except Exception as e:
+            print(f"Could not cache evaluation: {e}")
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluations (key, result, last_used) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    """
+                    DELETE FROM evaluations WHERE key IN (
+                        SELECT key FROM evaluations ORDER BY last_used LIMIT ?
+                    )
+                    """,
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalize a program so that trivially different copies share a cache key.
+    Only trailing whitespace is dropped: leading lines and comments shift the line numbers in the output.
+    """
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).rstrip("\n")
+
+
+@lru_cache(maxsize=None)
+def environment_version() -> str:
+    """
+    A hash of the environment's code (tools, Lua mods and the rest of `fle.env`), so that results are not
+    reused once the code that produced them changes.
+    """
+    root = Path(__file__).resolve().parents[2] / "env"
+    digest = sha256()
+    for path in sorted(root.rglob("*")):
+        if path.suffix in (".py", ".lua") and path.is_file():
+            digest.update(str(path.relative_to(root)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def create_evaluation_cache() -> Optional[EvaluationCache]:
+    """The evaluation cache in the SQLite file set by FLE_EVAL_CACHE_FILE, or None (the default) if that isn't set"""
+    path = os.getenv("FLE_EVAL_CACHE_FILE")
+    if not path:
+        return None
+    return EvaluationCache(path)
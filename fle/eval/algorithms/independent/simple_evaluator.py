@@ -1,6 +1,6 @@
 import asyncio
 import copy
-from typing import List, Tuple, Union, Dict
+from typing import Callable, List, Optional, Tuple, Union, Dict
 
 from fle.commons.db_client import DBClient
 from fle.commons.models.achievements import ProductionFlows
@@ -9,6 +9,7 @@ from fle.commons.models.program import Program
 from fle.env.entities import Entity, EntityGroup
 from fle.env import FactorioInstance
 from fle.env.utils.profits import get_achievements
+from fle.eval.algorithms.evaluation_cache import EvaluationCache
 
 
 class SimpleFactorioEvaluator:
@@ -19,6 +20,7 @@ class SimpleFactorioEvaluator:
         value_accrual_time=10,
         error_penalty=10,
         logger=None,
+        cache: Optional[EvaluationCache] = None,
     ):
         self.db = db_client
         self.instance = instance  # Main instance
@@ -27,6 +29,7 @@ class SimpleFactorioEvaluator:
             value_accrual_time  # Time to accrue value before evaluating
         )
         self.error_penalty = error_penalty  # Penalty for errors during evaluation
+        self.cache = cache  # Results of programs already evaluated from the same state
 
         if logger:
             self.port_to_group = logger.port_to_group
@@ -38,29 +41,86 @@ class SimpleFactorioEvaluator:
         task,
         agent_idx: int,
         step_statistics: dict = {},
+        on_result: Optional[Callable[[str, str, bool], None]] = None,
     ) -> Program:
+        """
+        Evaluate a program from `start_state`, accruing value and verifying the task afterwards.
+        `on_result(code, result, error_occurred)` is called as soon as the program's output is final, before its
+        value has accrued, so the next step can start on it.
+        """
         try:
-            self.instance.reset(start_state)
-            (
-                raw_reward,
-                state,
-                response,
-                entities,
-                achievements,
-                flows,
-                ticks,
-                error_occurred,
-            ) = await self._evaluate_single(program, agent_idx)
+            cache_key = cached = None
+            if self.cache:
+                cache_key = EvaluationCache.key(
+                    start_state,
+                    program.code,
+                    agent_idx=agent_idx,
+                    value_accrual_time=self.value_accrual_time,
+                    task=task.task_key,
+                )
+                cached = self.cache.get(cache_key)
+
+            if cached:
+                # The program's code also gets the hints added when it was evaluated
+                program.code = cached["code"]
+                raw_reward = cached["raw_reward"]
+                state = cached["state"]
+                response = cached["response"]
+                achievements = cached["achievements"]
+                flows = cached["flows"]
+                ticks = cached["ticks"]
+                error_occurred = cached["error_occurred"]
+            else:
+                await self.instance.async_reset(start_state)
+                (
+                    raw_reward,
+                    state,
+                    response,
+                    entities,
+                    achievements,
+                    flows,
+                    ticks,
+                    error_occurred,
+                ) = await self._evaluate_single(program, agent_idx, on_result)
             # enchance step statistics with the flows
             if not isinstance(flows, dict):
                 step_statistics.update(flows.to_dict())
             else:
                 step_statistics.update(flows)
-            task_response = task.verify(
-                score=raw_reward,
-                instance=self.instance,
-                step_statistics=step_statistics,
-            )
+
+            if cached and cached["step_statistics"] == step_statistics:
+                task_response = cached["task_response"]
+            else:
+                if cached:
+                    # Verification can depend on the step, so verify against the game as the program left it
+                    await self.instance.async_reset(state)
+                task_response = task.verify(
+                    score=raw_reward,
+                    instance=self.instance,
+                    step_statistics=step_statistics,
+                )
+
+            if (
+                self.cache
+                and not cached
+                and self.cache.cacheable(response, error_occurred)
+            ):
+                self.cache.put(
+                    cache_key,
+                    {
+                        "code": program.code,
+                        "raw_reward": raw_reward,
+                        "state": state,
+                        "response": response,
+                        "achievements": achievements,
+                        "flows": flows,
+                        "ticks": ticks,
+                        "error_occurred": error_occurred,
+                        "step_statistics": dict(step_statistics),
+                        "task_response": task_response,
+                    },
+                )
+
             relative_reward = raw_reward  # - holdout_value
 
             program.value = relative_reward
@@ -95,7 +155,10 @@ class SimpleFactorioEvaluator:
             raise e
 
     async def _evaluate_single(
-        self, program: Program, agent_idx: int
+        self,
+        program: Program,
+        agent_idx: int,
+        on_result: Optional[Callable[[str, str, bool], None]] = None,
     ) -> Tuple[
         float,
         GameState,
@@ -109,23 +172,24 @@ class SimpleFactorioEvaluator:
 
         try:
             # Get initial state information
-            start_entities = self.instance.namespaces[agent_idx].get_entities()
-            start_inventory = self.instance.namespaces[agent_idx].inspect_inventory()
+            namespace = self.instance.namespaces[agent_idx]
+            start_entities = await namespace._async_call("get_entities")
+            start_inventory = await namespace._async_call("inspect_inventory")
             # start_production_flows = instance.namespace._get_production_stats()
             start_production_flows = ProductionFlows.from_dict(
-                self.instance.namespaces[agent_idx]._get_production_stats()
+                await namespace._async_call("_get_production_stats")
             )
 
-            initial_value, start_time = self.instance.namespaces[agent_idx].score()
-            reward, time, result = self.instance.eval(
+            initial_value, start_time = await namespace._async_call("score")
+            reward, time, result = await self.instance.async_eval(
                 program.code, agent_idx=agent_idx, timeout=60
             )
             # Check if there was an error in the program execution
             error_occurred = (
                 "error" in result.lower() or "exception: " in result.lower()
             )
-            entities = self.instance.namespaces[agent_idx].get_entities()
-            final_inventory = self.instance.namespaces[agent_idx].inspect_inventory()
+            entities = await namespace._async_call("get_entities")
+            final_inventory = await namespace._async_call("inspect_inventory")
 
             # Check to see if the inventories are different
             # If so, we manually put a hint in the generated code and result from the game
@@ -165,15 +229,21 @@ class SimpleFactorioEvaluator:
                 result += f"final: ('Current inventory: {final_inventory}',)\n"
                 result += f"final: ('Entities on the map after the current step: {entities}',)"
 
+            if on_result:
+                on_result(program.code, result, error_occurred)
+
             # Sleep for 3 seconds to get output flows
-            await asyncio.sleep(self.value_accrual_time)
-            state = GameState.from_instance(self.instance)
-            score, _ = self.instance.first_namespace.score()
+            if self.instance.accelerated:
+                await asyncio.to_thread(self.instance.wait, self.value_accrual_time)
+            else:
+                await asyncio.sleep(self.value_accrual_time)
+            state = await asyncio.to_thread(GameState.from_instance, self.instance)
+            score, _ = await self.instance.first_namespace._async_call("score")
             final_reward = score - initial_value
-            ticks = self.instance.get_elapsed_ticks()
+            ticks = await self.instance.async_get_elapsed_ticks()
 
             post_production_flows = ProductionFlows.from_dict(
-                self.instance.first_namespace._get_production_stats()
+                await self.instance.first_namespace._async_call("_get_production_stats")
             )
 
             achievements = get_achievements(
@@ -1,4 +1,6 @@
 import asyncio
+from datetime import datetime
+from functools import partial
 from itertools import product
 import copy
 import time
@@ -8,9 +10,11 @@ import multiprocessing
 from fle.env.a2a_instance import A2AFactorioInstance
 from dotenv import load_dotenv
 
-from fle.agents import CompletionResult, CompletionReason
+from fle.agents import CompletionResult, CompletionReason, TaskResponse
 from fle.agents.agent_abc import AgentABC
 from fle.commons.db_client import DBClient, create_db_client
+from fle.commons.models.achievements import ProductionFlows
+from fle.eval.algorithms.evaluation_cache import create_evaluation_cache
 from fle.eval.algorithms.independent.simple_evaluator import SimpleFactorioEvaluator
 from fle.commons.models.conversation import Conversation
 from fle.commons.models.message import Message
@@ -42,10 +46,45 @@ class EvalConfig:
     exit_on_task_success: bool
     task: Optional[TaskABC] = None
     agent_cards: Optional[List[AgentCard]] = None
+    # Start generating each program from the previous program's output, while its value is still accruing.
+    # The agent is prompted before the score, flows and achievements of the previous step are known (they are
+    # left empty in its response), so only use this with agents that prompt from the conversation alone.
+    # Tasks that add their verification output to the response (e.g. throughput tasks) are never speculated on,
+    # as the next prompt can't be known before verification finishes.
+    speculative_generation: bool = False
 
     def __post_init__(self):
         if self.task is None and hasattr(self.agents[0], "task"):
             self.task = self.agents[0].task
+        if self.speculative_generation and len(self.agents) > 1:
+            raise ValueError(
+                "Speculative generation only supports single agent runs, "
+                "as messages from other agents change the next prompt"
+            )
+        if (
+            self.speculative_generation
+            and self.task is not None
+            and self.task.enhances_responses
+        ):
+            print(
+                f"Speculative generation is disabled: {type(self.task).__name__} "
+                "adds its verification output to every response"
+            )
+            self.speculative_generation = False
+
+
+@dataclass
+class Speculation:
+    """The next program, being generated while the previous one is still being evaluated"""
+
+    conversation: Conversation  # The conversation the program is generated from
+    program: asyncio.Task
+
+    def matches(self, conversation: Conversation) -> bool:
+        """Whether the program was generated from the same prompt as `conversation`"""
+        return [(m.role, m.content) for m in self.conversation.messages] == [
+            (m.role, m.content) for m in conversation.messages
+        ]
 
 
 class TrajectoryRunner:
@@ -74,6 +113,7 @@ class TrajectoryRunner:
         self.last_message_timestamps: Dict[int, float] = {
             i: 0.0 for i in range(len(agents))
         }
+        self.speculation: Optional[Speculation] = None
 
     def _is_model_compatible_with_n_samples(self, model):
         """Check if model supports batch sampling"""
@@ -141,6 +181,46 @@ class TrajectoryRunner:
             print(f"Program generation failed: {str(e)}")
             return []
 
+    def _speculate(
+        self,
+        conversation: Conversation,
+        step: int,
+        instance_param: int,
+        code: str,
+        result: str,
+        error_occurred: bool,
+    ):
+        """Start generating the next program from a program's output, before its value has accrued"""
+        conversation = copy.deepcopy(conversation)
+        conversation.add_result(f"```python\n{code}\n```", result)
+        response = Response(
+            code=f"```python\n{code}\n```",
+            created_at=datetime.now(),
+            score=0,
+            achievements={},
+            step=step,
+            ticks=0,
+            flows=ProductionFlows(input={}, output={}, crafted=[], harvested={}),
+            response=result,
+            task=TaskResponse(success=False),
+            error=error_occurred,
+        )
+        agent_idx = 0 if instance_param == -1 else instance_param
+        program = asyncio.create_task(
+            self._generate_program(
+                conversation,
+                response,
+                self.evaluator.instance.namespaces[agent_idx],
+                instance_param=instance_param,
+            )
+        )
+        self.speculation = Speculation(conversation=conversation, program=program)
+
+    def _cancel_speculation(self):
+        if self.speculation:
+            self.speculation.program.cancel()
+            self.speculation = None
+
     def get_eta(self, current_iteration):
         """Calculate estimated time remaining"""
         if not self.iteration_times:
@@ -206,6 +286,7 @@ class TrajectoryRunner:
         current_conversations = [None] * len(self.agents)
         last_responses = [None] * len(self.agents)
         agent_step_counter = [0] * len(self.agents)
+        saving = None  # The last program's response, and the future of saving it
         if self.config.version:
             for agent_idx in range(len(self.agents)):
                 (
@@ -256,7 +337,7 @@ class TrajectoryRunner:
                 print(f"Agent {agent_idx} has no steps left. Skipping.")
                 continue
             iteration_start = time.time()
-            time.sleep(COURTESY_SLEEP)  # courtesy sleep
+            await asyncio.sleep(COURTESY_SLEEP)  # courtesy sleep
             agent_completed = False
             try:
                 # Collect new messages for this agent
@@ -282,12 +363,23 @@ class TrajectoryRunner:
                     and agent_step_counter[agent_idx]
                     < self.config.task.trajectory_length
                 ):
-                    program = await self._generate_program(
-                        current_conversations[agent_idx],
-                        last_responses[agent_idx],
-                        self.evaluator.instance.namespaces[agent_idx],
-                        instance_param=instance_param,
-                    )
+                    if saving:
+                        saved_response, saved_program = saving[0], await saving[1]
+                        saving = None
+                        parent_id = saved_program.id
+                        saved_response.program_id = saved_program.id
+
+                    if self.speculation:
+                        # Already generated from this prompt while the last program was evaluated
+                        program = await self.speculation.program
+                        self.speculation = None
+                    else:
+                        program = await self._generate_program(
+                            current_conversations[agent_idx],
+                            last_responses[agent_idx],
+                            self.evaluator.instance.namespaces[agent_idx],
+                            instance_param=instance_param,
+                        )
                     agent_step_counter[agent_idx] += 1
                     print(
                         f"Generated program {multiprocessing.current_process().name} - "
@@ -304,6 +396,20 @@ class TrajectoryRunner:
                     if not program.parent_id:
                         program.parent_id = parent_id
 
+                    # Generate the next program while this one's value accrues
+                    on_result = None
+                    if (
+                        self.config.speculative_generation
+                        and agent_step_counter[agent_idx]
+                        < self.config.task.trajectory_length
+                    ):
+                        on_result = partial(
+                            self._speculate,
+                            current_conversations[agent_idx],
+                            depth,
+                            instance_param,
+                        )
+
                     # Evaluate program
                     if current_state.is_multiagent:
                         update_messages = [
@@ -326,6 +432,7 @@ class TrajectoryRunner:
                         step_statistics={
                             "current_step_id": agent_step_counter[agent_idx]
                         },
+                        on_result=on_result,
                     )
                     print(program.code + "\n" + "=" * 50)
                     print(
@@ -353,6 +460,7 @@ class TrajectoryRunner:
                         print(
                             f"Evaluation failed for agent {agent_idx} at iteration {agent_step_counter[agent_idx]}"
                         )
+                        self._cancel_speculation()
                         break
 
                     # Record iteration time
@@ -404,16 +512,14 @@ class TrajectoryRunner:
                     program = evaluated_program
                     program.meta["task_key"] = self.config.task.task_key
 
-                    # Save program
-                    saved_program = await self.db.create_program(program)
+                    # Save program in the background, its id isn't needed until the next program is generated
+                    saving = (last_responses[agent_idx], self.db.queue_program(program))
                     print(
-                        f"Saved program {multiprocessing.current_process().name} - "
+                        f"Saving program {multiprocessing.current_process().name} - "
                         f"Model: {self.config.agents[agent_idx].model} - "
                         f"Iteration {agent_step_counter[agent_idx]}/{self.config.task.trajectory_length}"
                     )
 
-                    parent_id = saved_program.id
-                    last_responses[agent_idx].program_id = saved_program.id
                     # Update state for next iteration
                     if program.state:
                         # add the last 2 messages from program.conversation to the current conversation
@@ -421,6 +527,14 @@ class TrajectoryRunner:
                             program.conversation.messages[-2:]
                         )
 
+                    # The next program was generated without knowing how the task verification went,
+                    # so it can only be used if that didn't change what the agent is prompted with
+                    if self.speculation and not (
+                        update_state
+                        and self.speculation.matches(current_conversations[agent_idx])
+                    ):
+                        self._cancel_speculation()
+
                     if (
                         task_verification_response.success
                         and self.config.exit_on_task_success
@@ -432,15 +546,20 @@ class TrajectoryRunner:
                             step=agent_step_counter[agent_idx],
                             reason=CompletionReason.SUCCESS,
                         )
+                        self._cancel_speculation()
+                        await self.db.flush()
                         for agent in self.agents:
                             await agent.end(program.conversation, completion_result)
                         # exit the loop
                         return
             except Exception as e:
+                self._cancel_speculation()
                 print(f"Error in iteration {agent_step_counter[agent_idx]}: {e}")
                 raise e
                 continue
 
+        await self.db.flush()
+
 
 async def create_factorio_instance(
     instance_id: int, num_agents: int = 1, agent_cards: Optional[List[AgentCard]] = None
@@ -477,7 +596,11 @@ async def run_trajectory(process_id: int, config: EvalConfig):
         process_id, len(config.agents), config.agent_cards
     )
     evaluator = SimpleFactorioEvaluator(
-        db_client=db_client, instance=instance, value_accrual_time=1, error_penalty=0
+        db_client=db_client,
+        instance=instance,
+        value_accrual_time=1,
+        error_penalty=0,
+        cache=create_evaluation_cache(),
     )
     task = config.task
     task.setup(instance)
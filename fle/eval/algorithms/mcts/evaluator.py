@@ -1,6 +1,6 @@
 import asyncio
 import copy
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from fle.env.utils.profits import get_achievements
 
@@ -10,6 +10,7 @@ from fle.commons.models.program import Program
 from fle.env.entities import Entity, EntityGroup
 from fle.env.instance import FactorioInstance
 
+from fle.eval.algorithms.evaluation_cache import EvaluationCache
 from fle.eval.algorithms.mcts.logger import FactorioLogger
 
 
@@ -21,9 +22,11 @@ class Evaluator:
         value_accrual_time=10,
         error_penalty=10,
         logger=None,
+        cache: Optional[EvaluationCache] = None,
     ):
         self.db = db_client
         self.instances = instances  # Main instances
+        self.cache = cache  # Results of programs already evaluated from the same state
         # self.holdout = instances[-1]  # Holdout instance
         self.value_accrual_time = (
             value_accrual_time  # Time to accrue value before evaluating
@@ -74,38 +77,82 @@ class Evaluator:
         self, programs: List[Program], start_state: GameState
     ) -> List[Program]:
         try:
+            # Programs already evaluated from this state reuse their results, and copies within the batch
+            # are only evaluated once
+            keys = list(range(len(programs)))
+            cached = {}
+            if self.cache:
+                keys = [
+                    EvaluationCache.key(
+                        start_state,
+                        program.code,
+                        value_accrual_time=self.value_accrual_time,
+                    )
+                    for program in programs
+                ]
+                for key in dict.fromkeys(keys):
+                    result = self.cache.get(key)
+                    if result:
+                        cached[key] = result
+            to_evaluate = {}
+            for program, key in zip(programs, keys):
+                if key not in cached and key not in to_evaluate:
+                    to_evaluate[key] = program
+            evaluated = list(zip(to_evaluate.items(), self.instances))
+
             # Evaluate programs in parallel
             eval_futures = []
-            for i, (prog, inst) in enumerate(zip(programs, self.instances)):
-                inst.reset(start_state)
+            for (key, prog), inst in evaluated:
                 if self.logger:
                     self.logger.update_instance(
                         inst.tcp_port, program_id=prog.id, status="resetting"
                     )
+            await asyncio.gather(
+                *[inst.async_reset(start_state) for _, inst in evaluated]
+            )
+            for (key, prog), inst in evaluated:
                 eval_futures.append(self._evaluate_single(inst.tcp_port, prog, inst))
 
             # Wait for all evaluations and holdout
             eval_results = await asyncio.gather(*eval_futures)
             # holdout_value = await holdout_future
 
+            results = dict(cached)
+            instances = {}
+            for ((key, prog), inst), eval_result in zip(evaluated, eval_results):
+                # Evaluating adds hints to the code, which copies of the program get too
+                results[key] = {"code": prog.code, "result": eval_result}
+                instances[key] = inst
+                output = eval_result[2]
+                if self.cache and self.cache.cacheable(
+                    output, "error" in output.lower()
+                ):
+                    self.cache.put(key, results[key])
+
             # Update program results
-            for i, (
-                program,
-                (raw_reward, state, response, entities, achievements, ticks),
-            ) in enumerate(zip(programs, eval_results)):
+            for program, key in zip(programs, keys):
+                if key not in results:
+                    # More programs than instances to evaluate them on
+                    continue
+                program.code = results[key]["code"]
+                raw_reward, state, response, entities, achievements, ticks = results[
+                    key
+                ]["result"]
                 relative_reward = raw_reward  # - holdout_value
 
-                if self.logger:
+                # Only the instance each program was evaluated on has anything new to log
+                instance = instances.pop(key, None)
+                if self.logger and instance:
                     self.logger.update_instance(
-                        self.instances[i].tcp_port,
+                        instance.tcp_port,
                         status="completed",
                         raw_reward=raw_reward,
                         holdout_value=raw_reward,
                         relative_reward=relative_reward,
                         total_programs=self.logger.groups[
-                            self.port_to_group[self.instances[i].tcp_port]
+                            self.port_to_group[instance.tcp_port]
                         ]
-                        .instances[self.instances[i].tcp_port]
+                        .instances[instance.tcp_port]
                         .total_programs
                         + 1,
                     )
@@ -187,26 +234,32 @@ class Evaluator:
         try:
             # Get initial state information
             self.logger.update_instance(tcp_port, status="starting value")
-            start_entities = instance.namespace.get_entities()
-            start_inventory = instance.namespace.inspect_inventory()
-            start_production_flows = instance.namespace._get_production_stats()
-            initial_value, start_time = instance.namespace.score()
+            namespace = instance.namespace
+            start_entities = await namespace._async_call("get_entities")
+            start_inventory = await namespace._async_call("inspect_inventory")
+            start_production_flows = await namespace._async_call(
+                "_get_production_stats"
+            )
+            initial_value, start_time = await namespace._async_call("score")
 
             # Executing code
             self.logger.update_instance(tcp_port, status="executing")
-            reward, time, result = instance.eval(program.code, timeout=60)
+            reward, time, result = await instance.async_eval(program.code, timeout=60)
 
             # Capturing immediate resulting state
             self.logger.update_instance(tcp_port, status="capturing state")
-            state = GameState.from_instance(instance)
+            state = await asyncio.to_thread(GameState.from_instance, instance)
 
             self.logger.update_instance(
                 tcp_port, status=f"accruing value ({self.value_accrual_time}s)"
             )
-            await asyncio.sleep(self.value_accrual_time)
+            if instance.accelerated:
+                await asyncio.to_thread(instance.wait, self.value_accrual_time)
+            else:
+                await asyncio.sleep(self.value_accrual_time)
 
-            entities = instance.namespace.get_entities()
-            final_inventory = instance.namespace.inspect_inventory()
+            entities = await namespace._async_call("get_entities")
+            final_inventory = await namespace._async_call("inspect_inventory")
 
             # Check to see if the inventories are different
             # If so, we manually put a hint in the generated code and result from the game
@@ -246,11 +299,11 @@ class Evaluator:
                 result += f"('Current inventory: {final_inventory}',)\n"
                 result += f"('Entities on the map after the current step: {entities}',)"
 
-            score, _ = instance.namespace.score()
+            score, _ = await namespace._async_call("score")
             final_reward = score - initial_value
-            ticks = instance.get_elapsed_ticks()
+            ticks = await instance.async_get_elapsed_ticks()
 
-            post_production_flows = instance.namespace._get_production_stats()
+            post_production_flows = await namespace._async_call("_get_production_stats")
             achievements = get_achievements(
                 start_production_flows, post_production_flows
             )
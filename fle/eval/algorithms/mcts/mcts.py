@@ -12,6 +12,7 @@ from fle.agents.formatters.conversation_formatter_abc import (
     DefaultFormatter,
 )
 from fle.agents.llm.parsing import PythonParser
+from fle.agents.llm.rate_limiter import get_rate_limiter
 from tenacity import retry, retry_if_exception_type, wait_exponential
 
 from fle.commons.db_client import DBClient
@@ -201,14 +202,13 @@ class MCTS:
                     presence_penalty=self.presence_penalty,
                     frequency_penalty=self.frequency_penalty,
                 )
-                if (
+                if not get_rate_limiter(generation_params.model) and (
                     "sonnet" in generation_params.model
                     or "gemini" in generation_params.model
                     and len(formatted_messages) > 32
                 ):
-                    await sleep(
-                        2 + random() * 2
-                    )  # Sleep with jitter to avoid rate limiting issues
+                    # Without a configured rate limit, sleep with jitter to avoid rate limiting issues
+                    await sleep(2 + random() * 2)
                 return response
             except Exception as e:
                 print(f"Single generation failed: {str(e)}")
@@ -406,7 +406,7 @@ class MCTS:
                 programs, start_state
             )
 
-            # Use a connection pool or new connections for parallel saves
+            # Saved together, the DB client commits them in a single transaction
             save_tasks = []
             for program in evaluated_programs:
                 if program.state is not None:
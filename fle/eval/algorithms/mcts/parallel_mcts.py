@@ -3,6 +3,7 @@ import logging
 from math import floor
 from typing import Any, Dict, List
 
+from fle.eval.algorithms.evaluation_cache import create_evaluation_cache
 from fle.eval.algorithms.mcts.grouped_logger import GroupedFactorioLogger
 from fle.eval.algorithms.mcts.instance_group import InstanceGroup
 from fle.eval.algorithms.mcts.parallel_mcts_config import ParallelMCTSConfig
@@ -57,6 +58,9 @@ class ParallelMCTS:
         )
         self.logger.start()
 
+        # Shared by every group, as they all search from the same states
+        self.evaluation_cache = create_evaluation_cache()
+
         # Create instance groups
         self.instance_groups = self._create_instance_groups(instances)
 
@@ -101,6 +105,7 @@ class ParallelMCTS:
                 value_accrual_time=3,
                 logger=self.logger,
                 error_penalty=self.config.mcts_kwargs["error_penalty"],
+                cache=self.evaluation_cache,
             )
 
             # Create MCTS instance
@@ -25,6 +25,7 @@ class RunConfig:
     version: int = None
     num_agents: int = 1
     exit_on_task_success: bool = True
+    speculative_generation: bool = False
 
 
 async def main():
@@ -88,6 +89,7 @@ async def main():
             version=version,
             version_description=f"model:{run_config.model}\ntype:{task.task_key}\nnum_agents:{run_config.num_agents}",
             exit_on_task_success=run_config.exit_on_task_success,
+            speculative_generation=run_config.speculative_generation,
         )
 
         p = multiprocessing.Process(target=run_process, args=(run_idx, config))
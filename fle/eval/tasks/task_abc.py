@@ -1,3 +1,5 @@
+import hashlib
+import json
 from typing import Dict, List, Optional
 from fle.env import Inventory
 from fle.env import FactorioInstance
@@ -58,10 +60,36 @@ class TaskABC:
         """Add task specific information to the environment response"""
         return response
 
+    @property
+    def enhances_responses(self) -> bool:
+        """Whether `enhance_response_with_task_output` adds anything to the environment response"""
+        return (
+            type(self).enhance_response_with_task_output
+            is not TaskABC.enhance_response_with_task_output
+        )
+
     def setup(self, instance):
-        """setup function"""
+        """
+        setup function
+        The set up start state is kept as a snapshot in the server, so setting up the same task on it again
+        (and every later reset to the start) restores it in one command, without running `setup_instance` again.
+        """
         instance.initial_inventory = self.starting_inventory
         instance.all_technologies_researched = self.all_technology_reserached
-        instance.reset()
-        self.setup_instance(instance)
-        self.starting_game_state = GameState.from_instance(instance)
+
+        snapshot_name = self.snapshot_name(instance)
+        starting_game_state = instance.snapshots.get(snapshot_name)
+        if starting_game_state is not None:
+            instance.reset(starting_game_state)
+        else:
+            instance.reset()
+            self.setup_instance(instance)
+            starting_game_state = GameState.from_instance(instance)
+            instance.add_snapshot(snapshot_name, starting_game_state)
+        self.starting_game_state = starting_game_state
+
+    def snapshot_name(self, instance) -> str:
+        """Name of the snapshot of this task's start state, which depends on the task and how it starts"""
+        inventory = json.dumps(dict(self.starting_inventory.items()), sort_keys=True)
+        start = f"{inventory}:{self.all_technology_reserached}:{instance.num_agents}"
+        return f"{self.task_key}:{hashlib.sha1(start.encode()).hexdigest()[:12]}"
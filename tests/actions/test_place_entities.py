@@ -0,0 +1,69 @@
+import pytest
+
+from fle.env.entities import Position, Direction
+from fle.env.game_types import Prototype
+
+
+@pytest.fixture()
+def game(instance):
+    instance.initial_inventory = {
+        "wooden-chest": 2,
+        "burner-inserter": 5,
+        "transport-belt": 10,
+    }
+
+    instance.reset()
+    yield instance.namespace
+    instance.reset()
+
+
+def test_place_entities(game):
+    """
+    Place a chest, an inserter and a belt in one call
+    :param game:
+    :return:
+    """
+    chest, inserter, belt = game.place_entities(
+        [
+            (Prototype.WoodenChest, Position(x=0, y=0)),
+            (Prototype.BurnerInserter, Position(x=1, y=0), Direction.RIGHT),
+            (Prototype.TransportBelt, Position(x=2, y=0), Direction.RIGHT),
+        ]
+    )
+    assert chest.position.is_close(Position(x=0.5, y=0.5), 1)
+    assert inserter.direction.value == Direction.RIGHT.value
+    assert belt.name == Prototype.TransportBelt.value[0]
+    assert game.inspect_inventory()[Prototype.WoodenChest] == 1
+    assert game.inspect_inventory()[Prototype.BurnerInserter] == 4
+
+
+def test_place_entities_atomically_places_nothing_on_failure(game):
+    """
+    The second chest overlaps the first, so neither should be left in the world
+    :param game:
+    :return:
+    """
+    with pytest.raises(Exception):
+        game.place_entities(
+            [
+                (Prototype.WoodenChest, Position(x=0, y=0)),
+                (Prototype.WoodenChest, Position(x=0, y=0)),
+            ]
+        )
+    assert game.inspect_inventory()[Prototype.WoodenChest] == 2
+    assert not game.get_entities({Prototype.WoodenChest})
+
+
+def test_place_entities_best_effort(game):
+    placed = game.place_entities(
+        [
+            (Prototype.WoodenChest, Position(x=0, y=0)),
+            (Prototype.WoodenChest, Position(x=0, y=0)),
+            (Prototype.BurnerInserter, Position(x=1, y=0), Direction.RIGHT),
+        ],
+        atomic=False,
+    )
+    assert placed[0] is not None
+    assert placed[1] is None
+    assert placed[2] is not None
+    assert game.inspect_inventory()[Prototype.WoodenChest] == 1
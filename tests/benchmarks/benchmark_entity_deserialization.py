@@ -0,0 +1,101 @@
+import time
+
+from fle.env.game_types import Prototype
+from fle.env.tools.agent.get_entities.client import GetEntities
+
+
+def make_raw_entities(count: int):
+    """Entities as `get_entities` receives them from the server: a row of furnaces, inserters and belts"""
+    raw_entities = []
+    for i in range(count):
+        kind = i % 3
+        x = float(i)
+        if kind == 0:
+            raw_entities.append(
+                {
+                    "name": "stone-furnace",
+                    "position": {"x": x, "y": 0.0},
+                    "direction": 0,
+                    "energy": 0,
+                    "health": 200,
+                    "status": "working",
+                    "dimensions": {"width": 2, "height": 2},
+                    "tile_dimensions": {"tile_width": 2, "tile_height": 2},
+                    "fuel": {"coal": 5},
+                    "furnace_source": {"iron-ore": 10},
+                    "furnace_result": {"iron-plate": 3},
+                    "warnings": [],
+                }
+            )
+        elif kind == 1:
+            raw_entities.append(
+                {
+                    "name": "burner-inserter",
+                    "position": {"x": x + 0.5, "y": 2.5},
+                    "direction": 0,
+                    "energy": 0,
+                    "health": 100,
+                    "status": "waiting_for_source_items",
+                    "dimensions": {"width": 1, "height": 1},
+                    "tile_dimensions": {"tile_width": 1, "tile_height": 1},
+                    "fuel": {"coal": 1},
+                    "pickup_position": {"x": x + 0.5, "y": 3.5},
+                    "drop_position": {"x": x + 0.5, "y": 1.5},
+                    "warnings": [],
+                }
+            )
+        else:
+            raw_entities.append(
+                {
+                    "name": "transport-belt",
+                    "position": {"x": x + 0.5, "y": 4.5},
+                    "direction": 2,
+                    "energy": 0,
+                    "health": 150,
+                    "status": "working",
+                    "dimensions": {"width": 1, "height": 1},
+                    "tile_dimensions": {"tile_width": 1, "tile_height": 1},
+                    "input_position": {"x": x - 0.5, "y": 4.5},
+                    "output_position": {"x": x + 1.5, "y": 4.5},
+                    "inventory": {"left": {}, "right": {}},
+                    "warnings": [],
+                }
+            )
+    return raw_entities
+
+
+def run_benchmark(num_entities: int = 2000, num_iterations: int = 10):
+    # Deserialisation doesn't touch the server, so the tool doesn't need a connection
+    tool = GetEntities.__new__(GetEntities)
+    raw_entities = make_raw_entities(num_entities)
+
+    results = {}
+    for name, filter in {
+        "all": set(),
+        "filtered": {Prototype.StoneFurnace},
+    }.items():
+        start_time = time.time()
+        for _ in range(num_iterations):
+            tool._deserialize_entities(raw_entities, filter)
+        duration = time.time() - start_time
+
+        results[name] = {
+            "entities": num_entities * num_iterations,
+            "duration": duration,
+            "entities_per_second": num_entities * num_iterations / duration,
+        }
+
+    return results
+
+
+def print_results(results):
+    print(f"{'Benchmark':<20} {'Entities/s':<15} {'Duration':<10} {'Entities':<10}")
+    print("-" * 80)
+    for name, data in results.items():
+        print(
+            f"{name:<20} {data['entities_per_second']:<15.2f} {data['duration']:<10.2f}s {data['entities']:<10}"
+        )
+
+
+if __name__ == "__main__":
+    print_results(run_benchmark())
@@ -0,0 +1,62 @@
+from fle.commons.models.game_state import GameState
+from fle.eval.algorithms import evaluation_cache
+from fle.eval.algorithms.evaluation_cache import (
+    EvaluationCache,
+    create_evaluation_cache,
+)
+
+
+def make_state(entities="entities", timestamp=0.0):
+    return GameState(
+        entities=entities,
+        inventories=[{"iron-plate": 10}],
+        research=None,
+        timestamp=timestamp,
+    )
+
+
+def test_key_ignores_timestamp_and_trailing_whitespace():
+    key = EvaluationCache.key(make_state(), "print(1)\n", agent_idx=0)
+    assert key == EvaluationCache.key(
+        make_state(timestamp=1.0), "print(1)  \r\n\n", agent_idx=0
+    )
+    assert key != EvaluationCache.key(make_state("other"), "print(1)", agent_idx=0)
+    assert key != EvaluationCache.key(make_state(), "\nprint(1)", agent_idx=0)
+    assert key != EvaluationCache.key(make_state(), "print(1)", agent_idx=1)
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = EvaluationCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", {"raw_reward": 1.0, "state": make_state()})
+    cache.put("b", {"raw_reward": 2.0})
+    assert cache.get("a")["state"].entities == "entities"
+    cache.put("c", {"raw_reward": 3.0})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a")["raw_reward"] == 1.0
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Results outlive the process that stored them
+    cache.close()
+    assert EvaluationCache(str(tmp_path / "cache.db")).get("c")["raw_reward"] == 3.0
+
+
+def test_key_depends_on_environment_version(monkeypatch):
+    key = EvaluationCache.key(make_state(), "print(1)")
+    monkeypatch.setattr(evaluation_cache, "environment_version", lambda: "changed")
+    assert key != EvaluationCache.key(make_state(), "print(1)")
+
+
+def test_errors_and_timeouts_are_not_cacheable():
+    assert EvaluationCache.cacheable("1: ('done',)")
+    assert not EvaluationCache.cacheable("1: ('done',)", error_occurred=True)
+    assert not EvaluationCache.cacheable("Error: Evaluation timed out")
+
+
+def test_cache_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.delenv("FLE_EVAL_CACHE_FILE", raising=False)
+    assert create_evaluation_cache() is None
+
+    monkeypatch.setenv("FLE_EVAL_CACHE_FILE", str(tmp_path / "cache.db"))
+    assert isinstance(create_evaluation_cache(), EvaluationCache)
@@ -1,6 +1,12 @@
+import json
+
+import pytest
 from pydantic import BaseModel
 from fle.env import FactorioInstance
-from fle.commons.models.game_state import GameState
+from fle.env.entities import Inventory, Position
+from fle.env.game_types import Prototype
+from fle.commons.models.game_state import GameState, encode_entities
+from fle.env.utils.rcon import _json2python
 
 
 def test_game_state():
@@ -55,3 +61,86 @@ def test_game_state_reserach():
     zero_state = GameState.from_instance(instance)
     # this tests for validation errors in the original zero states
     new_object = DummyObject(game_state=zero_state)  # noqa
+
+
+def saved_entities(*entities):
+    """Entities as `save_entity_state` prints them, decoded the way the tool client decodes them"""
+    quoted = [{**entity, "name": f'"{entity["name"]}"'} for entity in entities]
+    response, _ = _json2python(
+        "save_entity_state", json.dumps({"a": True, "b": quoted})
+    )
+    return response["b"]
+
+
+def test_entity_index_diff():
+    chest, belt = saved_entities(
+        {
+            "name": "iron-chest",
+            "position": {"x": 0.5, "y": 0.5},
+            "entity_number": 12,
+            "inventories": {"chest": {"coal": 5}},
+        },
+        {"name": "transport-belt", "position": {"x": 2.5, "y": 0.5}},
+    )
+    previous = GameState(
+        entities=encode_entities([chest, belt]),
+        inventories=[Inventory()],
+        research=None,
+    )
+
+    # The chest was recreated (new unit number) but holds the same items, and the belt was removed
+    rebuilt_chest = {**chest, "entity_number": 40}
+    current = GameState(
+        entities=encode_entities([rebuilt_chest]),
+        inventories=[Inventory(**{"coal": 2})],
+        research=None,
+    )
+
+    previous_index, current_index = previous.entity_index(), current.entity_index()
+    assert set(current_index) < set(previous_index)
+    assert [previous_index[k] for k in set(previous_index) - set(current_index)] == [
+        belt
+    ]
+    assert not current.same_as(previous)
+    assert current.same_as(GameState.parse_raw(current.to_raw()))
+
+
+@pytest.mark.parametrize("quoted", [False, True])
+def test_entity_changes_reload_characters(quoted):
+    (character,) = saved_entities(
+        {"name": "character", "position": {"x": 0.5, "y": 0.5}}
+    )
+    if quoted:
+        # States saved before tools answered in JSON
+        character = {**character, "name": '"character"'}
+    (chest,) = saved_entities({"name": "iron-chest", "position": {"x": 3.5, "y": 0.5}})
+    target = GameState(
+        entities=encode_entities([character]), inventories=[Inventory()], research=None
+    )
+    current = GameState(
+        entities=encode_entities([character, chest]),
+        inventories=[Inventory()],
+        research=None,
+    )
+
+    stale, missing = target.entity_changes(current)
+    assert stale == [chest]
+    assert missing == [character]
+
+
+def test_reset_to_snapshot(instance):
+    instance.reset()
+    instance.namespace.place_entity(Prototype.IronChest, position=Position(x=0, y=0))
+    start = GameState.from_instance(instance)
+    instance.add_snapshot("test-start", start)
+
+    instance.namespace.place_entity(Prototype.IronChest, position=Position(x=3, y=0))
+    instance.reset(start)
+    assert len(instance.namespace.get_entities()) == 1
+    assert GameState.from_instance(instance).same_as(start)
+
+    # A server that has lost the snapshot is given it again
+    instance.rcon_client.send_command("/sc global.snapshots = {}")
+    instance.namespace.pickup_entity(instance.namespace.get_entities()[0])
+    instance.reset(start)
+    assert len(instance.namespace.get_entities()) == 1
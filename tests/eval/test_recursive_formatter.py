@@ -1,7 +1,9 @@
+import asyncio
+import os
 import unittest
 import tempfile
 import shutil
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from fle.agents.formatters.recursive_formatter import RecursiveFormatter
 from fle.commons.models.conversation import Conversation
@@ -141,6 +143,56 @@ class TestRecursiveFormatter(unittest.TestCase):
             loaded = self.formatter._load_cached_summary(chunk_hash)
             self.assertIsNone(loaded)
 
+    def test_prefix_hashes_match_chunk_hash(self):
+        """Test that hashing messages as they are appended matches hashing them all at once."""
+        messages = self.create_test_conversation(6).messages
+
+        for length in range(1, len(messages) + 1):
+            self.formatter.prefix_hashes.update(messages[:length])
+            self.assertEqual(
+                self.formatter.prefix_hashes.prefix(length),
+                self.formatter._get_chunk_hash(messages[:length]),
+            )
+
+        # A different conversation is hashed from scratch
+        other = [Message(role="user", content="Something else")]
+        self.assertEqual(
+            self.formatter.prefix_hashes.hash(other),
+            self.formatter._get_chunk_hash(other),
+        )
+
+    def test_summaries_shared_through_cache_db(self):
+        """Test that a formatter picks up summaries another one stored in the same SQLite file."""
+        mock_response = Mock(spec=["content"])
+        mock_response.content = [Mock(text="Summarized content")]
+        self.mock_llm.acall = AsyncMock(return_value=mock_response)
+
+        cache_db = os.path.join(self.temp_dir, "summaries.db")
+        conversation = self.create_test_conversation(8)
+
+        first = RecursiveFormatter(
+            chunk_size=4,
+            api_factory=self.mock_llm,
+            cache_dir=self.temp_dir,
+            cache_db=cache_db,
+        )
+        formatted = asyncio.run(first.format_conversation(conversation))
+        calls = self.mock_llm.acall.await_count
+        self.assertGreater(calls, 0)
+        self.assertFalse(any(f.endswith(".json") for f in os.listdir(self.temp_dir)))
+
+        second = RecursiveFormatter(
+            chunk_size=4,
+            api_factory=self.mock_llm,
+            cache_dir=self.temp_dir,
+            cache_db=cache_db,
+        )
+        reformatted = asyncio.run(second.format_conversation(conversation))
+        self.assertEqual(
+            [msg.content for msg in reformatted], [msg.content for msg in formatted]
+        )
+        self.assertEqual(self.mock_llm.acall.await_count, calls)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,5 @@
+import pytest
+
 from fle.env.gym_env.environment import FactorioGymEnv
 from fle.env.gym_env.action import Action
 
@@ -186,3 +188,8 @@ def test_messages_observation(instance):
             or "Test message" in m.get("message", "")
             for m in observation["messages"]
         )
+
+
+def test_unknown_lazy_fields_are_rejected():
+    with pytest.raises(ValueError, match="entites"):
+        FactorioGymEnv(None, lazy_fields=("entites",))
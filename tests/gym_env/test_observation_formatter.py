@@ -1,5 +1,19 @@
 from fle.env.gym_env.observation_formatter import BasicObservationFormatter
-from fle.env.gym_env.observation import Observation, GameInfo, AgentMessage
+from fle.env.gym_env.observation import (
+    Observation,
+    GameInfo,
+    AgentMessage,
+    EntityObservation,
+)
+from fle.env.entities import (
+    Chest,
+    Dimensions,
+    Direction,
+    Inventory,
+    Position,
+    TileDimensions,
+)
+from fle.env.game_types import Prototype
 from fle.commons.models.achievements import ProductionFlows
 from fle.commons.models.research_state import ResearchState
 from fle.commons.models.technology_state import TechnologyState
@@ -80,6 +94,29 @@ def test_entities_formatting():
     assert formatted.startswith("### Entities")
 
 
+def test_entities_formatting_from_fields():
+    chest = Chest(
+        name="iron-chest",
+        position=Position(x=-1.5, y=2.5),
+        direction=Direction.UP,
+        energy=0,
+        dimensions=Dimensions(width=1, height=1),
+        tile_dimensions=TileDimensions(tile_width=1, tile_height=1),
+        health=100,
+        inventory=Inventory(coal=5),
+        prototype=Prototype.IronChest,
+    )
+    entity = EntityObservation(chest)
+    assert entity == str(chest)
+
+    formatter = BasicObservationFormatter()
+    formatted = formatter.format_entities([entity, entity])
+    assert "- iron-chest: 2" in formatted
+    assert "position=(-1.5, 2.5)" in formatted
+    assert "prototype=Prototype.IronChest," in formatted
+    assert "inventory=Inventory({'coal': 5})" in formatted
+
+
 def test_flows_formatting():
     obs = make_minimal_observation()
     formatter = BasicObservationFormatter()
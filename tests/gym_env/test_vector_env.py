@@ -0,0 +1,94 @@
+import threading
+import time
+
+import gym
+import pytest
+from gym import spaces
+
+from fle.env.gym_env.action import Action
+from fle.env.gym_env.vector_env import FactorioVecEnv
+from fle.env.utils.lazy_dict import LazyDict
+
+
+class CountingEnv(gym.Env):
+    """Stands in for a FactorioGymEnv: each step takes a while, and the episode ends after `length` steps"""
+
+    observation_space = spaces.Dict({"raw_text": spaces.Text(max_length=100)})
+    action_space = spaces.Dict({"code": spaces.Text(max_length=100)})
+
+    def __init__(self, length: int):
+        self.length = length
+        self.steps = 0
+        self.resets = 0
+        self.threads = set()
+
+    def reset(self, options=None, seed=None):
+        self.steps = 0
+        self.resets += 1
+        return {"raw_text": "reset"}, {}
+
+    def step(self, action: Action):
+        time.sleep(0.1)
+        self.threads.add(threading.get_ident())
+        self.steps += 1
+        info = LazyDict(ticks=self.steps)
+        info.defer("output_game_state", lambda steps=self.steps: f"state {steps}")
+        observation = {"raw_text": action.code}
+        return observation, float(self.steps), self.steps >= self.length, False, info
+
+
+def make_actions(count):
+    return [
+        Action(agent_idx=0, code=f"print({i})", game_state=None) for i in range(count)
+    ]
+
+
+def test_steps_run_concurrently():
+    envs = [CountingEnv(length=10) for _ in range(4)]
+    vec_env = FactorioVecEnv(envs)
+    vec_env.reset()
+
+    start = time.time()
+    observations, rewards, terminated, truncated, infos = vec_env.step(make_actions(4))
+    assert time.time() - start < 0.3
+
+    assert observations["raw_text"] == ("print(0)", "print(1)", "print(2)", "print(3)")
+    assert list(rewards) == [1.0] * 4
+    assert not terminated.any() and not truncated.any()
+    assert list(infos["ticks"]) == [1] * 4
+    assert infos["_ticks"].all()
+    assert len({thread for env in envs for thread in env.threads}) == 4
+    vec_env.close()
+
+
+def test_finished_envs_reset_automatically():
+    envs = [CountingEnv(length=1), CountingEnv(length=2)]
+    vec_env = FactorioVecEnv(envs)
+    vec_env.reset()
+
+    observations, _, terminated, _, infos = vec_env.step(make_actions(2))
+
+    assert list(terminated) == [True, False]
+    assert observations["raw_text"] == ("reset", "print(1)")
+    assert list(infos["_final_observation"]) == [True, False]
+    assert infos["final_observation"][0] == {"raw_text": "print(0)"}
+    # The finished env's lazy fields were read before it was reset
+    assert infos["final_info"][0]["output_game_state"] == "state 1"
+    assert [env.resets for env in envs] == [2, 1]
+    vec_env.close()
+
+
+def test_wait_times_out_on_stuck_env():
+    vec_env = FactorioVecEnv([CountingEnv(length=10) for _ in range(2)])
+    vec_env.reset()
+
+    vec_env.step_async(make_actions(2))
+    with pytest.raises(TimeoutError):
+        vec_env.step_wait(timeout=0.01)
+    # The steps still running have to finish first
+    with pytest.raises(RuntimeError):
+        vec_env.step_async(make_actions(2))
+
+    observations, *_ = vec_env.step_wait()
+    assert observations["raw_text"] == ("print(0)", "print(1)")
+    vec_env.close()
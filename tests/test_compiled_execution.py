@@ -0,0 +1,102 @@
+import pickle
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from fle.env.namespace import FactorioNamespace
+from fle.env.utils.deadline import deadline
+from fle.env.utils.pipelined_rcon import PipelinedRCONClient
+from tests.test_pipelined_rcon import FakeRCONServer
+
+
+@pytest.fixture(params=[True, False], ids=["compiled", "interpreted"])
+def namespace(request):
+    # Programs that don't call any tools can run without a game
+    namespace = FactorioNamespace(SimpleNamespace(tcp_port=0), 0)
+    namespace.score = lambda: (0, None)
+    namespace.compiled_execution = request.param
+    return namespace
+
+
+def test_loop_print_lines(namespace):
+    _, _, result = namespace.eval_with_timeout("for i in range(3):\n\tprint(i)")
+    assert result == "2: (0,)\n2: (1,)\n2: (2,)"
+
+
+def test_variables_and_functions_persist(namespace):
+    namespace.eval_with_timeout(
+        "def double(x: int) -> int:\n    return x * factor\nfactor = 2\nvalues = [double(i) for i in range(3)]"
+    )
+    assert namespace.persistent_vars["values"] == [0, 2, 4]
+
+    _, _, result = namespace.eval_with_timeout("print(double(5), values)")
+    assert result == "1: (10, [0, 2, 4])"
+
+
+def test_error_stops_program(namespace):
+    _, _, result = namespace.eval_with_timeout(
+        "before = 1\nfor i in range(2):\n    missing_variable\nafter = 1"
+    )
+    assert "Line 3: missing_variable" in result
+    assert "NameError" in result
+    assert namespace.persistent_vars["before"] == 1
+    assert "after" not in namespace.persistent_vars
+
+
+def test_deadline_stops_loop(namespace):
+    with deadline(0.1):
+        _, _, result = namespace.eval_with_timeout("n = 0\nwhile True:\n    n += 1")
+    assert "TimeoutError" in result
+
+
+@pytest.mark.parametrize(
+    "program",
+    [
+        "def spin():\n    n = 0\n    while True:\n        n += 1\nspin()",
+        "def spin():\n    return [i for i in iter(int, 1)]\nspin()",
+        "values = [i for i in iter(int, 1)]",
+    ],
+    ids=["function", "function_comprehension", "comprehension"],
+)
+def test_deadline_stops_native_loops(namespace, program):
+    errors = []
+
+    def worker():
+        with deadline(0.5):
+            errors.append(namespace.eval_with_timeout(program)[2])
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert "TimeoutError" in errors[0]
+
+
+def test_deadline_checked_in_persisted_function(namespace):
+    namespace.eval_with_timeout(
+        "def spin():\n    n = 0\n    while True:\n        n += 1"
+    )
+    function = pickle.loads(pickle.dumps(namespace.persistent_vars["spin"]))
+    function.bind(namespace)
+    with deadline(0.1):
+        with pytest.raises(TimeoutError):
+            function()
+
+
+def test_output_kept_when_deadline_passes(namespace):
+    # Score over a real RCON client, which refuses to send commands once the deadline has passed
+    server = FakeRCONServer()
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    namespace.score = lambda: (float(client.send_command("echo 3")), None)
+    try:
+        with deadline(0.1):
+            score, _, result = namespace.eval_with_timeout(
+                "print('started')\nn = 0\nwhile True:\n    n += 1"
+            )
+    finally:
+        client.close()
+        server.server.close()
+    assert score == 3
+    assert "started" in result
+    assert "TimeoutError" in result
@@ -0,0 +1,70 @@
+import asyncio
+
+from fle.commons.db_client import SQLliteDBClient, create_default_sqlite_db
+from fle.commons.models.conversation import Conversation
+from fle.commons.models.program import Program
+
+
+def make_program(code: str, version: int = 1) -> Program:
+    return Program(code=code, conversation=Conversation(), version=version)
+
+
+def test_queued_programs_are_written_in_batches(tmp_path):
+    database_file = str(tmp_path / "data.db")
+    create_default_sqlite_db(database_file)
+
+    async def run():
+        db = SQLliteDBClient(database_file=database_file)
+        committed = []
+        commit_writes = db._commit_writes
+
+        def record_commit(writes):
+            committed.append(len(writes))
+            return commit_writes(writes)
+
+        db._commit_writes = record_commit
+
+        # Queued from the event loop faster than they are written, so they share transactions
+        futures = [db.queue_program(make_program(f"print({i})")) for i in range(10)]
+        programs = await asyncio.gather(*futures)
+        assert [program.code for program in programs] == [
+            f"print({i})" for i in range(10)
+        ]
+        assert len({program.id for program in programs}) == 10
+        assert all(program.created_at for program in programs)
+        assert len(committed) < 10
+
+        updated = await db.update_program(programs[0].id, {"value": 5.0})
+        assert updated.value == 5.0 and updated.code == "print(0)"
+
+        db.queue_program(make_program("print('last')", version=2))
+        await db.cleanup()
+
+    asyncio.run(run())
+
+    async def read_back():
+        db = SQLliteDBClient(database_file=database_file)
+        version = await db.get_largest_version()
+        await db.cleanup()
+        return version
+
+    # Writes queued before cleanup were committed, and survive the client
+    assert asyncio.run(read_back()) == 2
+
+
+def test_a_failing_write_only_fails_itself(tmp_path):
+    database_file = str(tmp_path / "data.db")
+    create_default_sqlite_db(database_file)
+
+    async def run():
+        db = SQLliteDBClient(database_file=database_file)
+        good = db.queue_program(make_program("print(1)"))
+        bad = db.queue_update(1, {"no_such_column": 1})
+        other = db.queue_program(make_program("print(2)"))
+        results = await asyncio.gather(good, bad, other, return_exceptions=True)
+        await db.cleanup()
+        return results
+
+    good, bad, other = asyncio.run(run())
+    assert isinstance(bad, Exception)
+    assert good.id and other.id
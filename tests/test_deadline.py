@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fle.env import FactorioInstance
+from fle.env.utils.deadline import (
+    check_deadline,
+    deadline,
+    no_deadline,
+    time_remaining,
+)
+
+
+def test_deadline_expires():
+    assert time_remaining() is None
+    with deadline(0.01):
+        check_deadline()
+        time.sleep(0.02)
+        with pytest.raises(TimeoutError):
+            check_deadline()
+    check_deadline()
+
+
+def test_nested_deadline_cannot_extend_outer():
+    with deadline(1):
+        with deadline(60):
+            assert time_remaining() <= 1
+
+
+def test_deadline_is_local_to_thread():
+    errors = []
+
+    def worker():
+        try:
+            with deadline(0):
+                check_deadline()
+        except TimeoutError as e:
+            errors.append(e)
+
+    with deadline(60):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        check_deadline()
+
+    assert len(errors) == 1
+
+
+def test_async_eval_gives_up_on_blocked_program():
+    # A program stuck where no deadline is checked, e.g. in a blocking C call
+    instance = FactorioInstance.__new__(FactorioInstance)
+    instance.eval = lambda *args: time.sleep(10)
+    instance.eval_grace_period = 0.1
+
+    start = time.monotonic()
+    result = asyncio.run(instance.async_eval("", timeout=0))
+    assert result == (-1, "", "Error: Evaluation timed out")
+    assert time.monotonic() - start < 5
+
+
+def test_abandoned_program_cannot_act_afterwards():
+    # The program wakes up after it was given up on, and tries to carry on (even without a deadline)
+    release, finished = threading.Event(), threading.Event()
+    errors = []
+
+    def stuck_eval(*args):
+        release.wait(5)
+        with no_deadline():
+            try:
+                check_deadline()
+            except TimeoutError as e:
+                errors.append(e)
+        finished.set()
+
+    instance = FactorioInstance.__new__(FactorioInstance)
+    instance.eval = stuck_eval
+    instance.eval_grace_period = 0.1
+
+    assert asyncio.run(instance.async_eval("", timeout=0))[0] == -1
+    release.set()
+    assert finished.wait(5)
+    assert len(errors) == 1
@@ -0,0 +1,54 @@
+import copy
+import json
+import pickle
+
+from fle.env.utils.lazy_dict import LazyDict
+
+
+def test_deferred_value_computed_once_on_access():
+    calls = []
+    info = LazyDict(reward=1.0)
+    info.defer("state", lambda: calls.append(1) or "snapshot")
+
+    assert "state" in info
+    assert not info.is_computed("state")
+    assert calls == []
+
+    assert info["state"] == "snapshot"
+    assert info.get("state") == "snapshot"
+    assert info.is_computed("state")
+    assert calls == [1]
+
+
+def test_unread_values_are_never_computed():
+    info = LazyDict(reward=1.0)
+    info.defer("state", lambda: 1 / 0)
+
+    assert info["reward"] == 1.0
+    assert len(info) == 2
+
+
+def test_copies_and_views_compute_values():
+    info = LazyDict(reward=1.0)
+    info.defer("state", lambda: "snapshot")
+
+    assert dict(info) == {"reward": 1.0, "state": "snapshot"}
+    assert {**info} == {"reward": 1.0, "state": "snapshot"}
+    assert list(info.values()) == [1.0, "snapshot"]
+    assert info.pop("state") == "snapshot"
+    assert "state" not in info
+
+
+def test_copying_and_pickling_compute_values():
+    info = LazyDict(reward=1.0)
+    info.defer("state", lambda: "snapshot")
+    expected = {"reward": 1.0, "state": "snapshot"}
+
+    assert info.copy().is_computed("state")
+    assert copy.copy(info) == expected
+    assert copy.deepcopy(info) == expected
+
+    unpickled = pickle.loads(pickle.dumps(info))
+    assert isinstance(unpickled, LazyDict)
+    assert unpickled == expected
+    assert json.loads(json.dumps(info)) == expected
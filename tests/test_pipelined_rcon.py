@@ -0,0 +1,146 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from fle.env.utils.deadline import deadline
+from fle.env.utils.pipelined_rcon import PipelinedRCONClient
+
+
+class FakeRCONServer:
+    """Minimal RCON server that answers `echo <text>` commands, holding replies back in batches"""
+
+    def __init__(self, batch_size=1):
+        self.batch_size = batch_size
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.received = []
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _recv_exactly(self, conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError()
+            data += chunk
+        return data
+
+    def _read_packet(self, conn):
+        (length,) = struct.unpack("<i", self._recv_exactly(conn, 4))
+        payload = self._recv_exactly(conn, length)
+        packet_id, packet_type = struct.unpack("<ii", payload[:8])
+        return packet_id, packet_type, payload[8:-2].decode("utf8")
+
+    def _write_packet(self, conn, packet_id, packet_type, body):
+        payload = (
+            struct.pack("<ii", packet_id, packet_type) + body.encode() + b"\x00\x00"
+        )
+        conn.sendall(struct.pack("<i", len(payload)) + payload)
+
+    def _serve(self):
+        conn, _ = self.server.accept()
+        try:
+            packet_id, _, _ = self._read_packet(conn)
+            self._write_packet(conn, packet_id, 2, "")  # auth ok
+            batch = []
+            while True:
+                packet_id, _, body = self._read_packet(conn)
+                self.received.append(body)
+                batch.append((packet_id, body))
+                if len(batch) >= self.batch_size:
+                    # Reply in reverse order to make sure ids are what matches replies up
+                    for reply_id, reply_body in reversed(batch):
+                        self._write_packet(
+                            conn, reply_id, 0, reply_body.replace("echo ", "", 1)
+                        )
+                    batch = []
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+
+
+@pytest.fixture()
+def server():
+    fake = FakeRCONServer(batch_size=3)
+    yield fake
+    fake.server.close()
+
+
+def test_pipelined_commands_are_matched_by_id(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    try:
+        futures = client.submit_many(["echo a", "echo b", "echo c"])
+        assert [f.result(timeout=5) for f in futures] == ["a", "b", "c"]
+        assert client.in_flight == 0
+    finally:
+        client.close()
+
+
+def test_send_commands_keeps_blocking_api(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    try:
+        results = client.send_commands({"x": "echo 1", "y": "echo 2", "z": "echo "})
+        assert results == {"x": "1", "y": "2", "z": None}
+    finally:
+        client.close()
+
+
+def test_concurrent_threads_share_connection(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    results = {}
+
+    def worker(i):
+        results[i] = client.send_command(f"echo {i}")
+
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        assert results == {i: str(i) for i in range(6)}
+    finally:
+        client.close()
+
+
+def test_close_fails_outstanding_commands(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    future = client.submit("echo never-answered")  # batch of 3 never fills
+    client.close()
+    with pytest.raises(Exception):
+        future.result(timeout=5)
+
+
+def test_send_command_respects_deadline(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+    try:
+        start = time.monotonic()
+        with deadline(0.1):
+            with pytest.raises(TimeoutError):
+                client.send_command("echo never-answered")
+        assert time.monotonic() - start < 1
+    finally:
+        client.close()
+
+
+def test_async_send_command_overlaps(server):
+    client = PipelinedRCONClient("127.0.0.1", server.port, "factorio", timeout=5)
+
+    async def main():
+        # None of these would return if they were sent one after another
+        return await asyncio.gather(
+            *[client.async_send_command(f"echo {i}") for i in range(3)]
+        )
+
+    try:
+        assert asyncio.run(main()) == ["0", "1", "2"]
+    finally:
+        client.close()
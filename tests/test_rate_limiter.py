@@ -0,0 +1,71 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fle.agents.llm import APIFactory, rate_limiter
+from fle.agents.llm.rate_limiter import RateLimiter, get_rate_limiter, set_rate_limit
+
+
+def test_requests_beyond_the_allowance_wait():
+    # 600 requests per minute refill one request every 0.1s
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._state["levels"]["requests"] = 2
+
+    async def run():
+        start = time.time()
+        await asyncio.gather(*[limiter.acquire() for _ in range(4)])
+        return time.time() - start
+
+    assert 0.15 < asyncio.run(run()) < 0.5
+
+
+def test_tokens_are_settled_after_the_response():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter._try_take(800) == 0
+    assert limiter._try_take(800) > 0
+    # The request only used 100 of the 800 tokens reserved for it
+    limiter.settle(800, 100)
+    assert limiter._try_take(800) == 0
+
+
+def test_limits_are_shared_between_processes_through_a_file(tmp_path):
+    path = str(tmp_path / "limits.json")
+    first = RateLimiter(requests_per_minute=60, shared_path=path)
+    second = RateLimiter(requests_per_minute=60, shared_path=path)
+    first._try_take(0)
+    second._try_take(0)
+    with first._locked_state() as state:
+        assert 57.9 < state["levels"]["requests"] < 58.1
+
+
+def test_model_names_match_the_most_specific_limit(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_rate_limiters", {})
+    general = set_rate_limit("claude", requests_per_minute=10)
+    sonnet = set_rate_limit("claude-3-5-sonnet", requests_per_minute=5)
+    assert get_rate_limiter("claude-3-5-sonnet-20241022") is sonnet
+    assert get_rate_limiter("claude-3-opus") is general
+    assert get_rate_limiter("gpt-4o") is None
+
+
+def test_limits_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_rate_limiters", {})
+    monkeypatch.setattr(rate_limiter, "_env_limits_loaded", False)
+    monkeypatch.setenv(
+        "FLE_RATE_LIMITS",
+        '{"claude": {"requests_per_minute": 10}, "gpt-4o": {"tokens_per_minute": 500}}',
+    )
+    explicit = set_rate_limit("claude", requests_per_minute=5)
+    assert get_rate_limiter("claude-3-opus") is explicit
+    assert get_rate_limiter("gpt-4o-mini").capacity == {"tokens": 500}
+
+
+def test_sync_calls_settle_their_tokens(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_rate_limiters", {})
+    limiter = set_rate_limit("gpt-4o", tokens_per_minute=1000)
+    usage = SimpleNamespace(total_tokens=100)
+    monkeypatch.setattr(
+        APIFactory, "_call", lambda self, **kwargs: SimpleNamespace(usage=usage)
+    )
+
+    APIFactory("gpt-4o").call(messages=[], max_tokens=800)
+    assert 899 < limiter._state["levels"]["tokens"] < 901
@@ -1,6 +1,6 @@
 import pytest
 
-from fle.env.utils.rcon import _lua2python
+from fle.env.utils.rcon import _json2python, _lua2python
 
 
 @pytest.fixture()
@@ -15,3 +15,31 @@ def test_lua_2_python():
     response, timing = _lua2python(command, lua_response)
 
     assert response == {"a": False, "b": "string global", 2: "]"}
+
+
+def test_json_2_python():
+    json_response = (
+        '{"a":true,"b":[{"name":"\\"iron-chest\\"","warnings":["\\"no input\\""],'
+        '"position":{"x":0.5,"y":-1.5}}]}'
+    )
+    command = "pcall(global.actions.get_entities,1,10,[])"
+    response, timing = _json2python(command, json_response)
+
+    assert response == {
+        "a": True,
+        "b": [
+            {
+                "name": "iron-chest",
+                "warnings": ["no input"],
+                "position": {"x": 0.5, "y": -1.5},
+            }
+        ],
+    }
+
+
+def test_json_2_python_falls_back_to_lua():
+    lua_response = '{ ["a"] = true,["b"] = { [1] = 2,[2] = 3,},}'
+    command = "pcall(global.actions.get_entities,1,10,[])"
+    response, timing = _json2python(command, lua_response)
+
+    assert response == {"a": True, "b": [2, 3]}
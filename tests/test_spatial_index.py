@@ -0,0 +1,41 @@
+from fle.env.utils.spatial_index import SpatialEntityIndex
+
+
+def entity(name, x, y, size=1):
+    return {
+        "name": name,
+        "position": {"x": x, "y": y},
+        "dimensions": {"width": size, "height": size},
+    }
+
+
+def test_query_inside_cached_area():
+    index = SpatialEntityIndex(max_age=60)
+    chest = entity("iron-chest", 0.5, 0.5)
+    drill = entity("burner-mining-drill", 40, -3, size=2)
+    index.update([chest, drill], (-100, -100, 100, 100), tick=10, version=1)
+
+    assert index.query((-1, -1, 1, 1), set(), tick=20, version=1) == [chest]
+    # The drill's centre is outside the area, but its collision box overlaps it
+    assert index.query((41, -3, 45, 0), set(), tick=20, version=1) == [drill]
+    assert index.query((-100, -100, 100, 100), {"iron-chest"}, tick=20, version=1) == [
+        chest
+    ]
+
+
+def test_query_misses_when_stale():
+    index = SpatialEntityIndex(max_age=60)
+    index.update([entity("iron-chest", 0, 0)], (-10, -10, 10, 10), tick=0, version=1)
+
+    assert index.query((-20, -20, 20, 20), set(), tick=0, version=1) is None
+    assert index.query((-1, -1, 1, 1), set(), tick=0, version=2) is None
+    assert index.query((-1, -1, 1, 1), set(), tick=61, version=1) is None
+
+
+def test_version_is_kept_until_cleared():
+    index = SpatialEntityIndex()
+    assert index.version is None
+    index.update([], (-10, -10, 10, 10), tick=0, version=(3, 7))
+    assert index.version == (3, 7)
+    index.clear()
+    assert index.version is None